@@ -0,0 +1,201 @@
+"""
+Server HTTP lokal yang meniru fashion-studio untuk benchmark tanpa menyentuh BASE_URL asli.
+
+Setiap halaman berisi kartu `collection-card` sintetis yang deterministik (berdasarkan seed dan
+nomor halaman), mencakup kedua layout harga, judul "Unknown Product", rating "Not Rated"/"Invalid Rating",
+dan harga "Price Unavailable". Latensi dan tingkat error (HTTP 503) bisa diatur.
+
+Contoh:
+    python -m benchmarks.fake_server --pages 50 --latency 0.05 --port 8000
+"""
+import argparse
+import html
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PRODUCTS = ["T-shirt", "Hoodie", "Pants", "Outerwear", "Jacket", "Dress", "Shirt", "Crewneck"]
+SIZES = ["S", "M", "L", "XL", "XXL"]
+GENDERS = ["Men", "Women", "Unisex"]
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>Fashion Studio</title>
+</head>
+<body>
+<div class="container">
+<div id="collectionList" class="collection-grid">
+{cards}
+</div>
+<ul class="pagination">
+{pagination}
+</ul>
+</div>
+</body>
+</html>
+"""
+
+_CARD_TEMPLATE = """    <div class="collection-card">
+        <div style="position: relative;">
+            <img src="https://picsum.photos/280/350?random=1" class="collection-image" alt="{title}">
+        </div>
+        <div class="product-details">
+            <h3 class="product-title">{title}</h3>
+            {price}
+            <p style="font-size: 14px; color: #777;">{rating}</p>
+            <p style="font-size: 14px; color: #777;">{colors} Colors</p>
+            <p style="font-size: 14px; color: #777;">Size: {size}</p>
+            <p style="font-size: 14px; color: #777;">Gender: {gender}</p>
+        </div>
+    </div>"""
+
+def render_card(rng: random.Random, product_num: int) -> str:
+    """Membuat HTML satu kartu produk sintetis dengan proporsi data tidak valid seperti situs aslinya."""
+    roll = rng.random()
+    title = "Unknown Product" if roll < 0.05 else f"{rng.choice(PRODUCTS)} {product_num}"
+    if roll < 0.08:
+        # Layout kedua: harga kosong ditulis di <p class="price"> tanpa price-container
+        price = '<p class="price">Price Unavailable</p>'
+    else:
+        price = f'<div class="price-container"><span class="price">${rng.uniform(10, 500):,.2f}</span></div>'
+    if roll > 0.97:
+        rating = "Rating: Not Rated"
+    elif roll > 0.94:
+        rating = "Rating: ⭐ Invalid Rating / 5"
+    else:
+        rating = f"Rating: ⭐ {rng.randint(10, 50) / 10} / 5"
+    return _CARD_TEMPLATE.format(
+        title=html.escape(title),
+        price=price,
+        rating=rating,
+        colors=rng.randint(1, 8),
+        size=rng.choice(SIZES),
+        gender=rng.choice(GENDERS),
+    )
+
+def render_page(page_num: int, pages: int, products_per_page: int = 20, seed: int = 42) -> str:
+    """Membuat HTML satu halaman katalog beserta navigasi paginasinya. Hasilnya sama untuk argumen yang sama."""
+    rng = random.Random(seed * 1_000_003 + page_num)
+    first_product = (page_num - 1) * products_per_page
+    cards = "\n".join(render_card(rng, first_product + i) for i in range(products_per_page))
+    pagination = []
+    if page_num > 1:
+        previous = "/" if page_num == 2 else f"/page{page_num - 1}"
+        pagination.append(f'    <li class="page-item previous"><a class="page-link" href="{previous}">Previous</a></li>')
+    pagination.append(f'    <li class="page-item current"><span class="page-link">Page {page_num} of {pages}</span></li>')
+    if page_num < pages:
+        pagination.append(f'    <li class="page-item next"><a class="page-link" href="/page{page_num + 1}">Next</a></li>')
+    return _PAGE_TEMPLATE.format(cards=cards, pagination="\n".join(pagination))
+
+
+class FakeFashionStudio:
+    """
+    Server katalog palsu di 127.0.0.1 yang berjalan di thread latar belakang.
+    Bisa dipakai sebagai context manager; `base_url` siap dipakai sebagai config.BASE_URL.
+    """
+
+    def __init__(self, pages: int, products_per_page: int = 20, latency: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 42, port: int = 0):
+        self.pages = pages
+        self.products_per_page = products_per_page
+        self.latency = latency
+        self.error_rate = error_rate
+        self.seed = seed
+        self.requests_served = 0
+        self.errors_served = 0
+        self._lock = threading.Lock()
+        self._error_rng = random.Random(seed)
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _page_number(self, path: str):
+        """Nomor halaman dari path ('/' untuk halaman 1, '/page{n}' untuk berikutnya), atau None jika tidak dikenal."""
+        path = path.split("?", 1)[0].rstrip("/")
+        if path == "":
+            return 1
+        if path.startswith("/page") and path[5:].isdigit():
+            page_num = int(path[5:])
+            return page_num if 1 <= page_num <= self.pages else None
+        return None
+
+    def _handler_class(self):
+        studio = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Header dan body dikirim terpisah; tanpa TCP_NODELAY keep-alive tertahan delayed ACK (~40 ms)
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if studio.latency:
+                    time.sleep(studio.latency)
+                with studio._lock:
+                    studio.requests_served += 1
+                    failed = studio._error_rng.random() < studio.error_rate
+                    studio.errors_served += failed
+                page_num = studio._page_number(self.path)
+                if failed:
+                    self._send(503, b"Service Unavailable")
+                elif page_num is None:
+                    self._send(404, b"Not Found")
+                else:
+                    body = render_page(page_num, studio.pages, studio.products_per_page, studio.seed).encode("utf-8")
+                    self._send(200, body, "text/html; charset=utf-8")
+
+            def _send(self, status: int, body: bytes, content_type: str = "text/plain"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Log akses dimatikan agar tidak membanjiri output benchmark
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeFashionStudio":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-fashion-studio", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=50, help="jumlah halaman katalog")
+    parser.add_argument("--products-per-page", type=int, default=20, help="jumlah kartu produk per halaman")
+    parser.add_argument("--latency", type=float, default=0.0, help="jeda per request (detik)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="proporsi request yang dijawab HTTP 503")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    studio = FakeFashionStudio(args.pages, args.products_per_page, args.latency, args.error_rate, port=args.port)
+    print(f"Server katalog palsu berjalan di {studio.base_url} (Ctrl+C untuk berhenti)")
+    try:
+        studio._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        studio._server.server_close()
+
+if __name__ == "__main__":
+    main()
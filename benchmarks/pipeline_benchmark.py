@@ -0,0 +1,243 @@
+"""
+Benchmark end-to-end pipeline ETL terhadap server fashion-studio palsu di localhost.
+
+Untuk setiap skala (jumlah produk), benchmark menjalankan server palsu di proses terpisah
+lalu menjalankan scrape_all_products, transformasi, dan setiap loader (CSV, Parquet,
+PostgreSQL dengan SQLite sebagai pengganti) di proses baru. Dengan begitu, peak RSS tiap skala
+tidak tercampur skala lain. Yang dilaporkan: throughput per tahap, latensi halaman p50/p99,
+dan peak RSS. Hasil bisa disimpan sebagai baseline JSON dan dibandingkan pada run berikutnya.
+
+Contoh:
+    python -m benchmarks.pipeline_benchmark --scales 1000,100000 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.pipeline_benchmark --scales 1000,100000 --compare benchmarks/baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.fake_server import FakeFashionStudio
+
+DEFAULT_SCALES = "1000,100000,1000000"
+
+def _serve(pages: int, products_per_page: int, latency: float, error_rate: float, connection):
+    """Menjalankan server palsu di proses ini dan mengirim base URL-nya lewat pipe."""
+    studio = FakeFashionStudio(pages, products_per_page, latency, error_rate)
+    connection.send(studio.base_url)
+    studio._server.serve_forever()
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size proses ini dalam MB (ru_maxrss dalam KB di Linux, byte di macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def _rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds > 0 else 0.0
+
+def run_scale(base_url: str, pages: int, settings: dict) -> dict:
+    """
+    Menjalankan seluruh tahap pipeline untuk satu skala dan mengembalikan metriknya.
+    Dipanggil di proses anak yang baru sehingga config dan peak RSS dimulai dari awal.
+    """
+    from unittest.mock import patch
+
+    import utils.config as config
+    import utils.extract as extract
+    import utils.load as load
+    import utils.transform as transform
+
+    latencies = []
+    original_get = extract.cached_get
+
+    def timed_get(*args, **kwargs):
+        # Latensi per request halaman, termasuk request yang gagal
+        start = time.perf_counter()
+        try:
+            return original_get(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as workdir, contextlib.ExitStack() as stack:
+        overrides = {
+            "BASE_URL": base_url,
+            "PAGE_COUNT": pages,
+            "CACHE_MODE": "off",
+            "SCRAPE_RATE_LIMIT": 0,
+            "CSV_OUTPUT_PATH": os.path.join(workdir, "products.csv"),
+            "PARQUET_OUTPUT_PATH": os.path.join(workdir, "products_parquet"),
+            "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'products.db')}",
+        }
+        for name, value in overrides.items():
+            stack.enter_context(patch.object(config, name, value))
+        stack.enter_context(patch.object(extract, "cached_get", timed_get))
+        # Output progres pipeline (satu baris per halaman) tidak ikut diukur di terminal
+        stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+
+        raw, scrape_seconds = _timed(extract.scrape_all_products, settings["mode"])
+        df, transform_seconds = _timed(transform.run_transform, raw)
+        raw_count = len(raw)
+        del raw
+
+        loaders = {
+            "csv": load.save_to_csv,
+            "parquet": load.save_to_parquet,
+            "postgres": load.save_to_postgres,
+            "postgres_upsert": load.save_to_postgres_bulk,
+        }
+        load_results = {}
+        for name, loader in loaders.items():
+            ok, seconds = _timed(loader, df)
+            load_results[name] = {"ok": bool(ok), "seconds": seconds, "rows_per_sec": _rate(len(df), seconds)}
+
+    latency_ms = np.asarray(latencies) * 1000
+    return {
+        "pages": pages,
+        "scrape": {
+            "products": raw_count,
+            "requests": len(latencies),
+            "seconds": scrape_seconds,
+            "products_per_sec": _rate(raw_count, scrape_seconds),
+            "pages_per_sec": _rate(pages, scrape_seconds),
+            "latency_p50_ms": float(np.percentile(latency_ms, 50)) if len(latency_ms) else None,
+            "latency_p99_ms": float(np.percentile(latency_ms, 99)) if len(latency_ms) else None,
+        },
+        "transform": {
+            "rows_out": len(df),
+            "seconds": transform_seconds,
+            "rows_per_sec": _rate(raw_count, transform_seconds),
+        },
+        "load": load_results,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+def benchmark_scale(products: int, settings: dict) -> dict:
+    """Menjalankan server palsu dan satu skala benchmark, masing-masing di proses terpisah."""
+    pages = max(1, math.ceil(products / settings["products_per_page"]))
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    server = context.Process(
+        target=_serve,
+        args=(pages, settings["products_per_page"], settings["latency"], settings["error_rate"], sender),
+        daemon=True,
+    )
+    server.start()
+    try:
+        base_url = receiver.recv()
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            return executor.submit(run_scale, base_url, pages, settings).result()
+    finally:
+        server.terminate()
+        server.join()
+
+def _flatten(metrics: dict, prefix: str = "") -> dict:
+    """Meratakan dict bersarang menjadi {'scrape.seconds': ...} agar mudah dibandingkan."""
+    flat = {}
+    for key, value in metrics.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def compare_to_baseline(baseline: dict, results: dict, tolerance: float) -> list:
+    """
+    Membandingkan hasil dengan baseline dan mengembalikan daftar regresi (pesan).
+    Metrik *_per_sec dianggap regresi jika turun lebih dari `tolerance`; *_ms dan *_mb jika naik lebih dari itu.
+    """
+    regressions = []
+    for scale, metrics in results.items():
+        if scale not in baseline.get("results", {}):
+            continue
+        old = _flatten(baseline["results"][scale])
+        for name, value in _flatten(metrics).items():
+            previous = old.get(name)
+            if not previous:
+                continue
+            change = (value - previous) / previous
+            if name.endswith("_per_sec") and change < -tolerance:
+                regressions.append(f"{scale} {name}: {previous:,.1f} -> {value:,.1f} ({change:+.0%})")
+            elif name.endswith(("_ms", "_mb")) and change > tolerance:
+                regressions.append(f"{scale} {name}: {previous:,.1f} -> {value:,.1f} ({change:+.0%})")
+    return regressions
+
+def print_report(results: dict):
+    """Mencetak ringkasan hasil benchmark per skala."""
+    print(f"\n{'produk':>9}{'hal/dtk':>9}{'p50 ms':>8}{'p99 ms':>8}{'scrape/dtk':>12}{'transform/dtk':>15}"
+          f"{'csv/dtk':>10}{'parquet/dtk':>13}{'pg/dtk':>9}{'upsert/dtk':>12}{'RSS MB':>9}")
+    for scale, result in results.items():
+        scrape, load = result["scrape"], result["load"]
+        print(
+            f"{scale:>9}{scrape['pages_per_sec']:>9.0f}{scrape['latency_p50_ms'] or 0:>8.1f}"
+            f"{scrape['latency_p99_ms'] or 0:>8.1f}{scrape['products_per_sec']:>12,.0f}"
+            f"{result['transform']['rows_per_sec']:>15,.0f}{load['csv']['rows_per_sec']:>10,.0f}"
+            f"{load['parquet']['rows_per_sec']:>13,.0f}{load['postgres']['rows_per_sec']:>9,.0f}"
+            f"{load['postgres_upsert']['rows_per_sec']:>12,.0f}{result['peak_rss_mb']:>9.0f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="daftar jumlah produk, dipisah koma")
+    parser.add_argument("--products-per-page", type=int, default=20, help="jumlah kartu produk per halaman")
+    parser.add_argument("--latency", type=float, default=0.0, help="jeda server per request (detik)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="proporsi request yang dijawab HTTP 503")
+    parser.add_argument("--mode", choices=["sequential", "threaded"], default=None, help="mode scraping (default config.SCRAPE_MODE)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="simpan hasil sebagai baseline JSON")
+    parser.add_argument("--compare", metavar="PATH", help="bandingkan hasil dengan baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="batas perubahan sebelum dianggap regresi")
+    args = parser.parse_args()
+
+    settings = {
+        "products_per_page": args.products_per_page,
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "mode": args.mode,
+    }
+    results = {}
+    for products in (int(scale) for scale in args.scales.split(",")):
+        print(f"Menjalankan benchmark untuk {products:,} produk...")
+        results[str(products)] = benchmark_scale(products, settings)
+    print_report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "settings": settings,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nBaseline disimpan ke {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(baseline, results, args.tolerance)
+        if regressions:
+            print(f"\nRegresi dibanding baseline {args.compare}:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print(f"\nTidak ada regresi dibanding baseline {args.compare} (toleransi {args.tolerance:.0%}).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
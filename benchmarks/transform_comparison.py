@@ -0,0 +1,110 @@
+"""
+Perbandingan waktu dan memori antara transform_and_clean_data (standar)
+dan transform_and_clean_data_fast (jalur cepat) pada data mentah sintetis.
+Dengan --validate, waktu tahap validasi (utils.validate) atas hasil setiap jalur juga diukur.
+
+Contoh:
+    python -m benchmarks.transform_comparison --rows 100000
+    python -m benchmarks.transform_comparison --rows 1000000 --validate
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+from utils.transform import transform_and_clean_data, transform_and_clean_data_fast
+from utils.validate import validate
+
+SIZES = ["S", "M", "L", "XL", "XXL"]
+GENDERS = ["Men", "Women", "Unisex"]
+PRODUCTS = ["T-shirt", "Hoodie", "Pants", "Outerwear", "Jacket", "Dress", "Shirt", "Crewneck"]
+
+def generate_raw_products(rows: int, seed: int = 42, with_source_page: bool = False) -> list:
+    """
+    Membuat daftar produk mentah sintetis dengan proporsi data tidak valid dan duplikat seperti situs aslinya.
+    Jika `with_source_page`, setiap produk membawa nomor halaman asal (20 produk per halaman).
+    """
+    rng = random.Random(seed)
+    raw = []
+    for i in range(rows):
+        roll = rng.random()
+        product = {
+            "title": "Unknown Product" if roll < 0.05 else f"{rng.choice(PRODUCTS)} {i % (rows // 2 + 1)}",
+            "price": "Price Unavailable" if roll < 0.08 else f"${rng.uniform(10, 500):,.2f}",
+            "rating": "Not Rated" if roll > 0.95 else f"Rating: ⭐ {rng.randint(10, 50) / 10} / 5",
+            "colors": f"{rng.randint(0, 8)} Colors",
+            "size": f"Size: {rng.choice(SIZES)}",
+            "gender": f"Gender: {rng.choice(GENDERS)}",
+        }
+        if with_source_page:
+            product["source_page"] = i // 20 + 1
+        raw.append(product)
+    return raw
+
+def measure(transform_fn, raw: list, run_timestamp: datetime) -> dict:
+    """
+    Menjalankan satu fungsi transformasi dan mencatat waktu, puncak alokasi, dan ukuran DataFrame hasil.
+    Waktu diukur pada run terpisah tanpa tracemalloc agar tidak terdistorsi oleh overhead pelacakan memori.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        df = transform_fn(raw, run_timestamp=run_timestamp)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        transform_fn(raw, run_timestamp=run_timestamp)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "rows_out": len(df),
+        "seconds": elapsed,
+        "peak_alloc_mb": peak / 1024 ** 2,
+        "result_mb": df.memory_usage(deep=True).sum() / 1024 ** 2,
+        "df": df,
+    }
+
+def measure_validation(df) -> dict:
+    """Mengukur waktu validasi (semua aturan bawaan) atas hasil transformasi."""
+    start = time.perf_counter()
+    result = validate(df)
+    return {"seconds": time.perf_counter() - start, "rejected": len(result.quarantine)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="jumlah produk mentah sintetis")
+    parser.add_argument("--validate", action="store_true", help="ukur juga waktu tahap validasi atas hasil transformasi")
+    args = parser.parse_args()
+
+    raw = generate_raw_products(args.rows, with_source_page=args.validate)
+    run_timestamp = datetime.now()
+    results = {
+        "standard": measure(transform_and_clean_data, raw, run_timestamp),
+        "fast": measure(transform_and_clean_data_fast, raw, run_timestamp),
+    }
+
+    print(f"{'jalur':<10}{'baris':>10}{'detik':>10}{'puncak MB':>12}{'hasil MB':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<10}{result['rows_out']:>10}{result['seconds']:>10.3f}"
+            f"{result['peak_alloc_mb']:>12.1f}{result['result_mb']:>10.1f}"
+        )
+    standard, fast = results["standard"], results["fast"]
+    print(
+        f"\nPercepatan: {standard['seconds'] / fast['seconds']:.1f}x, "
+        f"hasil {standard['result_mb'] / fast['result_mb']:.1f}x lebih kecil"
+    )
+
+    if args.validate:
+        print(f"\n{'validasi':<10}{'ditolak':>10}{'detik':>10}{'vs transform':>14}")
+        for name, result in results.items():
+            validation = measure_validation(result["df"])
+            print(
+                f"{name:<10}{validation['rejected']:>10}{validation['seconds']:>10.3f}"
+                f"{validation['seconds'] / result['seconds']:>13.1%}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""
+Command line pipeline ETL produk fashion.
+
+Contoh:
+    python -m etl run
+    python -m etl run --stages extract --raw raw/products.json
+    python -m etl run --stages transform,load --raw raw/products.json --sinks csv
+    python -m etl run --stages load --snapshot products.csv --sinks postgres
+    python -m etl run --stages transform,load --raw-run latest
+    python -m etl run --validate
+    python -m etl schedule --interval 900 --sinks csv,postgres
+    python -m etl run --execution multiprocess --concurrency 16 --profile
+"""
@@ -0,0 +1,281 @@
+import argparse
+import cProfile
+import io
+import logging
+import os
+import pstats
+from datetime import datetime
+from typing import List, Optional
+
+import utils.config as config
+
+logger = logging.getLogger(__name__)
+
+# Tahap dan tujuan yang bisa dipilih; harus sama dengan etl.pipeline.STAGES dan sink di orchestrator.
+# Disalin di sini agar `--help` dan validasi argumen tidak perlu mengimpor pandas dan modul pipeline.
+STAGES = ("extract", "transform", "load")
+SINKS = ("csv", "parquet", "gsheet", "postgres")
+
+# Profil eksekusi: nilai config yang ditimpa untuk setiap profil
+EXECUTION_PROFILES = {
+    "sequential": {"SCRAPE_MODE": "sequential", "PARSE_MODE": "sequential"},
+    "threaded": {"SCRAPE_MODE": "threaded", "PARSE_MODE": "sequential"},
+    # Fetch konkuren di thread, parsing di proses terpisah
+    "multiprocess": {"SCRAPE_MODE": "threaded", "PARSE_MODE": "process"},
+}
+
+DEFAULT_PROFILE_PATH = "metrics/profile.pstats"
+
+
+def _csv_list(value: str, choices: tuple, kind: str) -> List[str]:
+    """Mengubah argumen 'a,b,c' menjadi list dan memastikan setiap nilainya dikenal."""
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in items if item not in choices]
+    if unknown or not items:
+        raise argparse.ArgumentTypeError(
+            f"{kind} tidak dikenal: {', '.join(unknown) or '(kosong)'} (pilihan: {', '.join(choices)})"
+        )
+    return items
+
+
+def _add_shared_options(command: argparse.ArgumentParser) -> dict:
+    """Opsi yang sama untuk `run` dan `schedule`; mengembalikan grup argumen agar perintah bisa menambah opsinya sendiri."""
+    selection = command.add_argument_group("tahap dan tujuan")
+    selection.add_argument(
+        "--sinks", type=lambda value: _csv_list(value, SINKS, "Tujuan"),
+        help="tujuan pemuatan, dipisah koma (default: LOAD_SINKS)",
+    )
+    selection.add_argument(
+        "--record-raw", action="store_true",
+        help="simpan data mentah run ini ke snapshot Arrow IPC (RAW_SNAPSHOT_ENABLED)",
+    )
+    selection.add_argument(
+        "--validate", action="store_true",
+        help="jalankan tahap validasi kualitas data; baris yang melanggar aturan dikarantina (VALIDATION_ENABLED)",
+    )
+    selection.add_argument("--load-mode", choices=("full", "incremental"), help="default: LOAD_MODE")
+
+    execution = command.add_argument_group("profil eksekusi")
+    execution.add_argument(
+        "--execution", choices=tuple(EXECUTION_PROFILES),
+        help="sequential, threaded (fetch konkuren), atau multiprocess (fetch konkuren + parsing multi-proses)",
+    )
+    execution.add_argument("--concurrency", type=int, metavar="N", help="jumlah request bersamaan (SCRAPE_CONCURRENCY)")
+    execution.add_argument("--parse-workers", type=int, metavar="N", help="jumlah proses parsing (PARSE_WORKERS)")
+    execution.add_argument("--pipeline-mode", choices=("batch", "stream"), help="default: PIPELINE_MODE")
+    execution.add_argument("--batch-size", type=int, metavar="N", help="jumlah halaman per batch pada mode stream")
+    execution.add_argument("--parser", choices=("bs4", "lxml"), help="backend parser HTML (PARSER_BACKEND)")
+    execution.add_argument("--transform-mode", choices=("standard", "fast"), help="default: TRANSFORM_MODE")
+    execution.add_argument("--lock", metavar="PATH", help="lock file pencegah run tumpang tindih antar proses (SCHEDULER_LOCK_PATH)")
+
+    diagnostics = command.add_argument_group("diagnostik")
+    diagnostics.add_argument("--metrics", action="store_true", help="aktifkan metrik dan tulis laporan run")
+    diagnostics.add_argument("--log-level", help="default: LOG_LEVEL")
+    diagnostics.add_argument("--log-format", choices=("text", "json"), help="default: LOG_FORMAT")
+    return {"selection": selection, "execution": execution, "diagnostics": diagnostics}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m etl", description="Pipeline ETL produk fashion.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="menjalankan pipeline (semua tahap atau sebagian)")
+    groups = _add_shared_options(run)
+    selection = groups["selection"]
+    selection.add_argument(
+        "--stages", type=lambda value: _csv_list(value, STAGES, "Tahap"), default=list(STAGES),
+        help="tahap yang dijalankan, dipisah koma (default: extract,transform,load)",
+    )
+    selection.add_argument(
+        "--raw", metavar="PATH",
+        help="file JSON data mentah: ditulis setelah extract, atau dibaca jika transform dijalankan tanpa extract",
+    )
+    selection.add_argument(
+        "--raw-run", metavar="RUN_ID",
+        help="transformasi ulang snapshot data mentah run tertentu ('latest' untuk run lengkap terbaru) tanpa scraping",
+    )
+    selection.add_argument(
+        "--snapshot", metavar="PATH",
+        help="snapshot data bersih (CSV, atau Parquet berupa direktori/.parquet) untuk load tanpa transform",
+    )
+    selection.add_argument("--resume", action="store_true", help="lanjutkan scraping dari jurnal checkpoint")
+    groups["diagnostics"].add_argument(
+        "--profile", nargs="?", const=DEFAULT_PROFILE_PATH, metavar="PATH",
+        help=f"jalankan di bawah cProfile dan simpan statistiknya (default: {DEFAULT_PROFILE_PATH}); "
+             "hanya mencakup proses utama",
+    )
+    groups["diagnostics"].add_argument(
+        "--profile-top", type=int, default=25, metavar="N", help="jumlah fungsi teratas yang dicatat di log",
+    )
+
+    schedule = commands.add_parser(
+        "schedule", help="mode daemon: menjalankan pipeline penuh berulang sesuai jadwal dengan koneksi yang tetap hangat",
+    )
+    _add_shared_options(schedule)
+    timing = schedule.add_argument_group("jadwal")
+    timing_choice = timing.add_mutually_exclusive_group()
+    timing_choice.add_argument("--interval", type=float, metavar="DETIK", help="jarak antar run (SCHEDULE_INTERVAL)")
+    timing_choice.add_argument("--cron", metavar="EKSPRESI", help="ekspresi cron 5 kolom, misal '*/30 * * * *' (SCHEDULE_CRON)")
+    timing.add_argument(
+        "--always-load", action="store_true",
+        help="tetap transform dan load walaupun hash katalog sama dengan load terakhir (SCHEDULE_SKIP_UNCHANGED=false)",
+    )
+    timing.add_argument("--wait-first", action="store_true", help="tunggu jadwal pertama alih-alih langsung menjalankan run")
+    timing.add_argument("--max-runs", type=int, metavar="N", help="berhenti setelah N run (default: tanpa batas)")
+
+    commands.add_parser("snapshots", help="menampilkan indeks snapshot data mentah")
+    return parser
+
+
+def config_overrides(args: argparse.Namespace) -> dict:
+    """Menerjemahkan argumen `run`/`schedule` menjadi nilai config yang perlu ditimpa."""
+    overrides = dict(EXECUTION_PROFILES.get(args.execution, {}))
+    options = {
+        "LOAD_SINKS": ",".join(args.sinks) if args.sinks else None,
+        "LOAD_MODE": args.load_mode,
+        "SCRAPE_CONCURRENCY": args.concurrency,
+        "PARSE_WORKERS": args.parse_workers,
+        "PIPELINE_MODE": args.pipeline_mode,
+        "STREAM_BATCH_PAGES": args.batch_size,
+        "PARSER_BACKEND": args.parser,
+        "TRANSFORM_MODE": args.transform_mode,
+        "METRICS_ENABLED": True if args.metrics else None,
+        "RAW_SNAPSHOT_ENABLED": True if args.record_raw else None,
+        "VALIDATION_ENABLED": True if args.validate else None,
+        # Opsi khusus perintah `schedule`
+        "SCHEDULE_INTERVAL": getattr(args, "interval", None),
+        # --interval menggantikan SCHEDULE_CRON dari environment
+        "SCHEDULE_CRON": "" if getattr(args, "interval", None) is not None else getattr(args, "cron", None),
+        "SCHEDULER_LOCK_PATH": getattr(args, "lock", None),
+        "SCHEDULE_SKIP_UNCHANGED": False if getattr(args, "always_load", False) else None,
+    }
+    overrides.update({name: value for name, value in options.items() if value is not None})
+    return overrides
+
+
+def apply_overrides(overrides: dict):
+    """Menimpa nilai di utils.config untuk proses ini."""
+    for name, value in overrides.items():
+        setattr(config, name, value)
+
+
+def _validate(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """Memastikan setiap tahap punya sumber data ketika tahap sebelumnya tidak dijalankan."""
+    stages = set(args.stages)
+    if "transform" in stages and "extract" not in stages and not (args.raw or args.raw_run):
+        parser.error("--stages tanpa extract membutuhkan --raw atau --raw-run (data mentah untuk tahap transform)")
+    if args.raw_run and ("extract" in stages or args.raw):
+        parser.error("--raw-run hanya dipakai tanpa tahap extract dan tanpa --raw")
+    if "load" in stages and "transform" not in stages and not args.snapshot:
+        parser.error("--stages load tanpa transform membutuhkan --snapshot (data bersih untuk dimuat)")
+    if args.raw and "extract" not in stages and not os.path.exists(args.raw):
+        parser.error(f"file data mentah tidak ditemukan: {args.raw}")
+    if args.snapshot and "transform" not in stages and not os.path.exists(args.snapshot):
+        parser.error(f"snapshot tidak ditemukan: {args.snapshot}")
+    if "load" in stages and "parquet" in (args.sinks or ()) and not config.PARQUET_OUTPUT_PATH:
+        parser.error("tujuan parquet membutuhkan PARQUET_OUTPUT_PATH")
+
+
+def _run_profiled(func, path: str, top: int):
+    """Menjalankan `func` di bawah cProfile, menyimpan statistiknya ke `path`, dan mencatat fungsi teratas."""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(path)
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(top)
+        logger.info("Statistik cProfile disimpan ke %s (buka dengan `python -m pstats %s`)\n%s", path, path, buffer.getvalue())
+
+
+def run(args: argparse.Namespace) -> int:
+    """Menjalankan perintah `run` dengan argumen yang sudah divalidasi. Mengembalikan exit code."""
+    apply_overrides(config_overrides(args))
+
+    # Modul pipeline (pandas, requests, lxml) baru diimpor setelah config ditimpa
+    import utils.metrics as metrics
+    from etl.pipeline import run_stages
+    from etl.scheduler import run_exclusive
+
+    metrics.enable(config.METRICS_ENABLED)
+    metrics.configure_logging(args.log_level, args.log_format)
+
+    def run_pipeline():
+        with metrics.span("run"):
+            return run_stages(args.stages, resume=args.resume, raw_path=args.raw,
+                              snapshot_path=args.snapshot, raw_run=args.raw_run)
+
+    def run_locked():
+        # Lock yang sama dengan daemon, agar run manual tidak tumpang tindih dengan run terjadwal
+        return run_exclusive(run_pipeline)
+
+    try:
+        if args.profile:
+            exit_code = _run_profiled(run_locked, args.profile, args.profile_top)
+        else:
+            exit_code = run_locked()
+    finally:
+        metrics.export()
+    return exit_code or 0
+
+
+def schedule(args: argparse.Namespace) -> int:
+    """Menjalankan perintah `schedule`: pipeline penuh berulang sesuai jadwal hingga dihentikan. Mengembalikan exit code."""
+    apply_overrides(config_overrides(args))
+
+    import utils.metrics as metrics
+    from etl.pipeline import run_stages
+    from etl.scheduler import run_daemon
+
+    metrics.enable(config.METRICS_ENABLED)
+    metrics.configure_logging(args.log_level, args.log_format)
+
+    def run_once():
+        # Laporan metrik ditulis per run, sehingga registry dikosongkan di awal setiap run
+        metrics.reset()
+        try:
+            with metrics.span("run"):
+                return run_stages(STAGES, skip_unchanged=config.SCHEDULE_SKIP_UNCHANGED)
+        finally:
+            metrics.export()
+
+    return run_daemon(run_once, max_runs=args.max_runs, run_immediately=not args.wait_first)
+
+
+def list_snapshots() -> int:
+    """Mencetak indeks snapshot data mentah, dari run terbaru."""
+    from utils.snapshot import open_snapshot_store
+
+    store = open_snapshot_store()
+    try:
+        runs = store.runs()
+    finally:
+        store.close()
+    print(f"{'run_id':<24}{'status':<10}{'baris':>10}{'batch':>7}  {'selesai':<20}file")
+    for snapshot_run in runs:
+        finished = datetime.fromtimestamp(snapshot_run.finished_at).isoformat(sep=" ", timespec="seconds") if snapshot_run.finished_at else "-"
+        print(f"{snapshot_run.run_id:<24}{snapshot_run.status:<10}{snapshot_run.rows:>10}{snapshot_run.batches:>7}  {finished:<20}{snapshot_run.path}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "snapshots":
+        return list_snapshots()
+    if args.command == "schedule":
+        cron = args.cron or (config.SCHEDULE_CRON if args.interval is None else "")
+        if cron:
+            from etl.scheduler import parse_cron
+            try:
+                parse_cron(cron)
+            except ValueError as e:
+                parser.error(str(e))
+        if args.interval is not None and args.interval <= 0:
+            parser.error("--interval harus lebih dari 0 detik")
+        return schedule(args)
+    _validate(parser, args)
+    return run(args)
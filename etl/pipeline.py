@@ -0,0 +1,275 @@
+import functools
+import io
+import json
+import logging
+import os
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+import pandas as pd
+import utils.config as config
+import utils.extract as extract
+import utils.incremental as incremental
+import utils.load as load
+import utils.metrics as metrics
+import utils.orchestrator as orchestrator
+import utils.transform as transform
+import utils.validate as validate
+from utils.fields import RAW_FIELDS, SOURCE_PAGE_FIELD
+from utils.snapshot import open_snapshot_store
+
+logger = logging.getLogger(__name__)
+
+# Urutan tahap pipeline; subset mana pun boleh dijalankan
+STAGES = ("extract", "transform", "load")
+
+
+def write_raw_dump(raw_products: List[dict], path: str):
+    """Menyimpan data mentah hasil ekstraksi sebagai file JSON agar tahap transformasi bisa dijalankan ulang tanpa scraping."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(raw_products, f, ensure_ascii=False)
+    logger.info("%s produk mentah disimpan ke %s", len(raw_products), path)
+
+
+def read_raw_dump(path: str) -> List[dict]:
+    """Membaca data mentah yang disimpan oleh write_raw_dump()."""
+    with open(path, encoding="utf-8") as f:
+        raw_products = json.load(f)
+    logger.info("%s produk mentah dibaca dari %s", len(raw_products), path)
+    return raw_products
+
+
+def transform_snapshot(run_id: Optional[str] = None) -> pd.DataFrame:
+    """
+    Menjalankan ulang transformasi atas snapshot data mentah run `run_id` (default run lengkap terbaru).
+    Snapshot dibaca lewat memory-map dan ditransformasi per batch, sehingga memori tidak perlu menampung
+    seluruh data mentah sekaligus; hasilnya sama dengan mentransformasi seluruh data sekaligus.
+    Timestamp hasil (dan kurs yang dipakai) mengikuti waktu run snapshot dibuat, bukan waktu transformasi ulang.
+    """
+    store = open_snapshot_store()
+    try:
+        run = store.resolve(run_id)
+        logger.info("Transformasi ulang snapshot data mentah %s (%s baris, %s)", run.run_id, run.rows, run.status)
+        batches = store.iter_batches(run.run_id, columns=RAW_FIELDS + (SOURCE_PAGE_FIELD,))
+        frames = list(transform.transform_batches(batches, run_timestamp=datetime.fromtimestamp(run.created_at)))
+    finally:
+        store.close()
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def run_stages(stages: Sequence[str] = STAGES, resume: bool = False, raw_path: Optional[str] = None,
+               snapshot_path: Optional[str] = None, raw_run: Optional[str] = None,
+               skip_unchanged: bool = False) -> Optional[int]:
+    """
+    Menjalankan subset tahap ETL sesuai urutan STAGES.
+    - extract: scraping website; jika `raw_path` diberikan, data mentah juga disimpan ke sana.
+    - transform: membersihkan data mentah; tanpa tahap extract, data mentah dibaca dari `raw_path`,
+      atau dari snapshot data mentah run `raw_run` ("latest" untuk run lengkap terbaru).
+    - load: memuat ke tujuan di LOAD_SINKS; tanpa tahap transform, data bersih dibaca dari
+      snapshot CSV/Parquet di `snapshot_path`.
+    Jika `skip_unchanged` dan extract serta load dijalankan, transform dan load dilewati ketika hash katalog
+    hasil extract beserta kurs dan config transformasi/validasi sama dengan load terakhir yang berhasil
+    (tidak berlaku pada mode streaming).
+    Mengembalikan exit code sesuai config.LOAD_FAILURE_POLICY jika tahap load dijalankan.
+    """
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Tahap tidak dikenal: {', '.join(sorted(unknown))}")
+    if "transform" in stages and "extract" not in stages and not (raw_path or raw_run):
+        raise ValueError("Tahap transform tanpa extract membutuhkan data mentah (raw_path atau raw_run).")
+    if "load" in stages and "transform" not in stages and not snapshot_path:
+        raise ValueError("Tahap load tanpa transform membutuhkan path snapshot (snapshot_path).")
+
+    logger.info("===== MEMULAI PIPELINE ETL PRODUK FASHION (%s) =====", ", ".join(s for s in STAGES if s in stages))
+
+    # Mode streaming memproses data per batch halaman, sehingga hanya berlaku jika semua tahap dijalankan
+    if config.PIPELINE_MODE == "stream":
+        unsupported = stream_unsupported_settings()
+        if set(stages) != set(STAGES) or raw_path:
+            logger.warning("PIPELINE_MODE=stream hanya berlaku untuk run penuh; tahap dijalankan dalam mode batch.")
+        elif unsupported:
+            logger.warning("PIPELINE_MODE=stream tidak mendukung %s; tahap dijalankan dalam mode batch.", ", ".join(unsupported))
+        else:
+            if skip_unchanged:
+                logger.warning("Pemeriksaan hash katalog tidak berlaku pada PIPELINE_MODE=stream; data selalu dimuat.")
+            return run_streaming_pipeline(resume=resume)
+
+    # 1. Tahap Ekstrak
+    # ------------------
+    raw_products_data = None
+    if "extract" in stages:
+        with metrics.span("stage.extract"):
+            raw_products_data = extract.scrape_all_products(resume=resume, with_source_page=config.VALIDATION_ENABLED)
+        if raw_path:
+            write_raw_dump(raw_products_data, raw_path)
+    elif "transform" in stages and raw_path:
+        raw_products_data = read_raw_dump(raw_path)
+
+    # Katalog yang sama persis dengan load terakhir yang berhasil, dengan kurs dan config transformasi yang sama,
+    # tidak perlu ditransformasi dan dimuat ulang
+    run_timestamp = datetime.now()
+    catalogue_hash = None
+    if skip_unchanged and "extract" in stages and "load" in stages and raw_products_data:
+        fingerprint = incremental.transform_fingerprint(run_timestamp)
+        catalogue_hash = incremental.compute_catalogue_hash(raw_products_data, fingerprint)
+        if catalogue_hash == incremental.load_catalogue_hash():
+            logger.info("Katalog tidak berubah sejak load terakhir (hash %s); transform dan load dilewati.", catalogue_hash[:12])
+            metrics.inc("runs_skipped", reason="unchanged_catalogue")
+            return 0
+
+    # 2. Tahap Transformasi
+    # ----------------------
+    if "transform" in stages:
+        if "extract" not in stages and not raw_path:
+            with metrics.span("stage.transform"):
+                cleaned_products_df = transform_snapshot(raw_run)
+        else:
+            # Hentikan proses jika tidak ada data yang berhasil diekstrak
+            if not raw_products_data:
+                logger.warning("Pipeline dihentikan: Tidak ada data mentah yang berhasil diekstrak.")
+                return
+
+            with metrics.span("stage.transform"):
+                cleaned_products_df = transform.run_transform(raw_products_data, run_timestamp=run_timestamp)
+
+        # Baris yang melanggar aturan kualitas data dikarantina (jika VALIDATION_ENABLED)
+        with metrics.span("stage.validate"):
+            cleaned_products_df = validate.run_validation(cleaned_products_df)
+
+        # Hentikan proses jika DataFrame kosong setelah dibersihkan
+        if cleaned_products_df.empty:
+            logger.warning("Pipeline dihentikan: Tidak ada data valid setelah proses transformasi.")
+            return
+
+        info_buffer = io.StringIO()
+        cleaned_products_df.info(buf=info_buffer)
+        logger.info("--- Data Bersih Siap Dimuat ---\n%s", cleaned_products_df.head())
+        logger.info("--- Info DataFrame ---\n%s", info_buffer.getvalue())
+    elif "load" in stages:
+        cleaned_products_df = load.read_snapshot(snapshot_path)
+        logger.info("%s baris data bersih dibaca dari snapshot %s", len(cleaned_products_df), snapshot_path)
+
+    if "load" not in stages:
+        logger.info("===== PIPELINE ETL SELESAI (tanpa tahap load) =====")
+        return
+
+    # 3. Tahap Memuat (Load)
+    # -------------------
+    # Memuat data ke semua tujuan yang ditentukan secara paralel
+    with metrics.span("stage.load"):
+        if config.LOAD_MODE == "incremental":
+            results = run_incremental_load(cleaned_products_df)
+        else:
+            results = orchestrator.run_sinks(cleaned_products_df, orchestrator.build_default_sinks())
+    orchestrator.print_results(results)
+    if catalogue_hash and all(result.success for result in results):
+        incremental.commit_catalogue_hash(catalogue_hash)
+
+    logger.info("===== PIPELINE ETL SELESAI =====")
+    return orchestrator.exit_code(results)
+
+
+def run_incremental_load(cleaned_products_df: pd.DataFrame) -> list:
+    """
+    Memuat hanya perubahan (insert, update, delete) dibanding run sebelumnya ke semua tujuan secara paralel.
+    State hash produk baru disimpan jika semua tujuan berhasil dimuat.
+    Mengembalikan daftar SinkResult.
+    """
+    changes = incremental.compute_changes(cleaned_products_df)
+    counts = changes.counts()
+    logger.info(
+        "Perubahan data: %s insert, %s update, %s delete, %s tidak berubah.",
+        counts['insert'], counts['update'], counts['delete'], counts['unchanged'],
+    )
+    if changes.is_empty:
+        logger.info("Tidak ada perubahan sejak run sebelumnya, tahap load dilewati.")
+        return []
+
+    results = orchestrator.run_sinks(changes, orchestrator.build_default_sinks(incremental=True))
+    if all(result.success for result in results):
+        incremental.commit_state(changes.current)
+    else:
+        logger.warning("Sebagian tujuan gagal dimuat; state tidak diperbarui sehingga perubahan akan dikirim ulang pada run berikutnya.")
+    return results
+
+
+def stream_unsupported_settings() -> List[str]:
+    """
+    Pengaturan load yang tidak bisa dijalankan per chunk oleh pipeline streaming (yang hanya menimpa
+    lalu menambahkan baris): load inkremental, upsert PostgreSQL, dan penulisan diff Google Sheets.
+    """
+    sinks = {name.strip() for name in config.LOAD_SINKS.split(",")}
+    unsupported = []
+    if config.LOAD_MODE == "incremental":
+        unsupported.append("LOAD_MODE=incremental")
+    if "postgres" in sinks and config.DB_LOAD_METHOD != "replace":
+        unsupported.append(f"DB_LOAD_METHOD={config.DB_LOAD_METHOD}")
+    if "gsheet" in sinks and config.GSHEET_WRITE_METHOD != "replace":
+        unsupported.append(f"GSHEET_WRITE_METHOD={config.GSHEET_WRITE_METHOD}")
+    return unsupported
+
+
+def run_streaming_pipeline(resume: bool = False) -> Optional[int]:
+    """
+    Menjalankan pipeline ETL dalam mode streaming.
+    Setiap batch halaman langsung diekstrak, ditransformasi, dan dimuat ke tujuan di LOAD_SINKS,
+    sehingga memori hanya sebesar satu batch dan data pertama segera tersedia di tujuan.
+    Setiap chunk ditulis lewat orchestrator dengan timeout dan retry per sink; sink yang gagal tidak menerima
+    chunk berikutnya. Mengembalikan exit code sesuai config.LOAD_FAILURE_POLICY.
+    Melempar ValueError jika pengaturan load tidak didukung (lihat stream_unsupported_settings).
+    """
+    unsupported = stream_unsupported_settings()
+    if unsupported:
+        raise ValueError(f"Pipeline streaming tidak mendukung {', '.join(unsupported)}.")
+
+    sinks = orchestrator.build_default_sinks()
+    names = {sink.name for sink in sinks}
+    raw_batches = extract.iter_product_batches(resume=resume, with_source_page=config.VALIDATION_ENABLED)
+    cleaned_batches = transform.transform_batches(raw_batches)
+
+    # Koneksi hanya dibuka untuk tujuan yang dipilih
+    worksheet = load.open_gsheet_worksheet() if "gsheet" in names else None
+    engine = load.open_postgres_engine() if "postgres" in names else None
+    writers = {
+        "csv": load.append_to_csv,
+        "parquet": lambda df, first_chunk: load.save_to_parquet(
+            df, overwrite=first_chunk and config.PARQUET_WRITE_MODE == "overwrite"
+        ),
+        "gsheet": lambda df, first_chunk: load.append_to_gsheet(df, worksheet, first_chunk),
+        "postgres": lambda df, first_chunk: load.append_to_postgres(df, engine, first_chunk),
+    }
+
+    chunk_results = {sink.name: [] for sink in sinks}
+    total_rows = 0
+    for chunk_df in cleaned_batches:
+        # Setiap chunk divalidasi sebelum dimuat; chunk yang seluruh barisnya dikarantina dilewati
+        chunk_df = validate.run_validation(chunk_df)
+        if chunk_df.empty:
+            continue
+        first_chunk = total_rows == 0
+        for sink in sinks:
+            previous = chunk_results[sink.name]
+            if previous and not previous[-1].success:
+                continue
+            write = functools.partial(writers[sink.name], first_chunk=first_chunk)
+            result = orchestrator.run_sink(sink._replace(write=write), chunk_df)
+            if not result.success:
+                logger.error("Sink '%s' gagal pada chunk streaming (%s); chunk berikutnya tidak dimuat ke sink ini.",
+                             sink.name, result.error)
+            previous.append(result)
+        metrics.inc("stream_chunks")
+        total_rows += len(chunk_df)
+
+    if total_rows == 0:
+        logger.warning("Pipeline dihentikan: Tidak ada data valid yang berhasil diproses.")
+        return
+
+    results = [orchestrator.merge_results(chunk_results[sink.name]) for sink in sinks]
+    orchestrator.print_results(results)
+    logger.info("===== PIPELINE ETL STREAMING SELESAI: %s baris diproses =====", total_rows)
+    return orchestrator.exit_code(results)
@@ -0,0 +1,259 @@
+"""
+Mode daemon: menjalankan pipeline ETL berulang sesuai jadwal (interval atau ekspresi cron) dalam satu proses,
+sehingga interpreter, modul, session HTTP, connection pool PostgreSQL, dan client Google Sheets tetap hangat antar run.
+"""
+import contextlib
+import fcntl
+import logging
+import os
+import signal
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, FrozenSet, Iterator, NamedTuple, Optional
+
+import utils.config as config
+import utils.extract as extract
+import utils.load as load
+
+logger = logging.getLogger(__name__)
+
+# Rentang nilai setiap kolom cron: menit, jam, tanggal, bulan, hari dalam minggu (0 = Minggu; 7 juga Minggu)
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+class CronExpression(NamedTuple):
+    """Ekspresi cron 5 kolom yang sudah di-parse menjadi himpunan nilai yang cocok per kolom."""
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]
+    # Seperti cron pada umumnya: jika tanggal dan hari sama-sama dibatasi, cukup salah satu yang cocok
+    days_restricted: bool
+    weekdays_restricted: bool
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> FrozenSet[int]:
+    """Mem-parse satu kolom cron: '*', 'a', 'a-b', dengan langkah opsional '/n', dipisah koma."""
+    values = set()
+    for part in field.split(","):
+        base, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start, end = (int(value) for value in base.split("-", 1))
+        else:
+            start = int(base)
+            end = high if step > 1 else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Kolom cron di luar rentang {low}-{high}: {part}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+def parse_cron(expression: str) -> CronExpression:
+    """Mem-parse ekspresi cron 5 kolom, misal '*/15 * * * *' atau '0 6-22 * * 1-5'. Melempar ValueError jika tidak valid."""
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Ekspresi cron harus terdiri dari 5 kolom: {expression!r}")
+    try:
+        minutes, hours, days, months, weekdays = (
+            _parse_cron_field(field, low, high) for field, (low, high) in zip(fields, _CRON_FIELDS)
+        )
+    except ValueError as e:
+        raise ValueError(f"Ekspresi cron tidak valid {expression!r}: {e}") from None
+    weekdays = frozenset(day % 7 for day in weekdays)
+    return CronExpression(minutes, hours, days, months, weekdays, fields[2] != "*", fields[4] != "*")
+
+
+def _day_matches(cron: CronExpression, moment: datetime) -> bool:
+    day_ok = moment.day in cron.days
+    # datetime.weekday(): Senin = 0; cron: Minggu = 0
+    weekday_ok = (moment.weekday() + 1) % 7 in cron.weekdays
+    if cron.days_restricted and cron.weekdays_restricted:
+        return day_ok or weekday_ok
+    return day_ok and weekday_ok
+
+
+def next_cron_time(cron: CronExpression, after: datetime) -> datetime:
+    """
+    Waktu (menit penuh) berikutnya setelah `after` yang cocok dengan ekspresi cron.
+    Pencarian melompat per bulan, hari, dan jam yang tidak cocok sehingga tidak perlu memeriksa setiap menit.
+    """
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = after.year + 5
+    while moment.year <= limit:
+        if moment.month not in cron.months:
+            moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+        elif not _day_matches(cron, moment):
+            moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+        elif moment.hour not in cron.hours:
+            moment = moment.replace(minute=0) + timedelta(hours=1)
+        elif moment.minute not in cron.minutes:
+            moment += timedelta(minutes=1)
+        else:
+            return moment
+    raise ValueError("Ekspresi cron tidak pernah cocok dalam 5 tahun ke depan.")
+
+
+def next_run_time(last_start: Optional[datetime], now: datetime) -> datetime:
+    """
+    Waktu run berikutnya: jika SCHEDULE_CRON diisi, menit berikutnya yang cocok setelah `now`;
+    selain itu `last_start` + SCHEDULE_INTERVAL. Run yang terlewat (karena run sebelumnya lebih lama
+    dari intervalnya) tidak menumpuk: run berikutnya langsung dijalankan satu kali.
+    """
+    if config.SCHEDULE_CRON:
+        return next_cron_time(parse_cron(config.SCHEDULE_CRON), now)
+    if last_start is None:
+        return now
+    return max(last_start + timedelta(seconds=config.SCHEDULE_INTERVAL), now)
+
+
+class RunLock:
+    """
+    Lock antar proses lewat fcntl.flock pada file persisten (default SCHEDULER_LOCK_PATH).
+    Kernel melepas lock saat pemegangnya berhenti (termasuk jika crash), sehingga tidak ada lock basi yang
+    perlu dideteksi atau dihapus. File tidak pernah dihapus; PID pemegang ditulis ke dalamnya hanya sebagai informasi.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.SCHEDULER_LOCK_PATH
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def holder(self) -> Optional[int]:
+        """PID yang tercatat di file lock (hanya informasi; bisa kosong atau sudah usang)."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+    def acquire(self) -> bool:
+        """Mengambil lock tanpa menunggu; mengembalikan False jika lock sedang dipegang proses lain."""
+        if self.held:
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        """Melepas lock jika dipegang oleh objek ini."""
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            try:
+                os.ftruncate(fd, 0)
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+
+
+def run_exclusive(run: Callable[[], Optional[int]]) -> int:
+    """
+    Menjalankan `run` sambil memegang RunLock, agar run manual (`python -m etl run`, main.py) tidak tumpang tindih
+    dengan run lain maupun daemon. Jika lock dipegang proses lain, run tidak dijalankan dan exit code 1 dikembalikan.
+    """
+    lock = RunLock()
+    if not lock.acquire():
+        logger.error("Run lain (PID %s) masih memegang lock %s; run ini dibatalkan.", lock.holder() or "?", lock.path)
+        return 1
+    try:
+        return run() or 0
+    finally:
+        lock.release()
+
+
+@contextlib.contextmanager
+def warm_resources() -> Iterator[None]:
+    """
+    Menyiapkan sumber daya yang dipakai ulang oleh semua run di dalam blok: session HTTP bersama untuk scraping,
+    serta engine PostgreSQL (connection pool) dan client Google Sheets yang hanya dibuat sekali.
+    Semuanya ditutup saat blok selesai.
+    """
+    session = extract.create_session()
+    extract.set_shared_session(session)
+    load.reuse_clients(True)
+    try:
+        yield
+    finally:
+        extract.set_shared_session(None)
+        session.close()
+        load.reuse_clients(False)
+        load.dispose_engines()
+
+
+def _install_stop_handlers(stop: threading.Event) -> dict:
+    """Menghentikan daemon dengan rapi (setelah run yang sedang berjalan selesai) saat menerima SIGINT/SIGTERM."""
+    if threading.current_thread() is not threading.main_thread():
+        return {}
+
+    def handle(signum, frame):
+        logger.info("Sinyal %s diterima; scheduler berhenti setelah run saat ini selesai.", signum)
+        stop.set()
+
+    previous = {}
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous[signum] = signal.signal(signum, handle)
+    return previous
+
+
+def run_daemon(run_once: Callable[[], Optional[int]], max_runs: Optional[int] = None, run_immediately: bool = True,
+               stop: Optional[threading.Event] = None) -> int:
+    """
+    Menjalankan `run_once` berulang sesuai jadwal hingga dihentikan (SIGINT/SIGTERM, `stop`, atau `max_runs`).
+    Setiap run memegang lock file; jika lock sedang dipegang proses lain, run tersebut dilewati.
+    Error pada satu run dicatat dan tidak menghentikan daemon.
+    Mengembalikan exit code run terakhir.
+    """
+    stop = stop or threading.Event()
+    previous_handlers = _install_stop_handlers(stop)
+    lock = RunLock()
+    runs, exit_code, last_start = 0, 0, None
+    schedule = f"cron '{config.SCHEDULE_CRON}'" if config.SCHEDULE_CRON else f"setiap {config.SCHEDULE_INTERVAL:g} detik"
+    logger.info("Scheduler ETL dimulai (%s).", schedule)
+    try:
+        with warm_resources():
+            now = datetime.now()
+            next_run = now if run_immediately else next_run_time(now, now)
+            while not stop.is_set() and (max_runs is None or runs < max_runs):
+                delay = (next_run - datetime.now()).total_seconds()
+                if delay > 0:
+                    logger.info("Run berikutnya pada %s.", next_run.isoformat(sep=" ", timespec="seconds"))
+                    if stop.wait(delay):
+                        break
+
+                last_start = datetime.now()
+                if lock.acquire():
+                    try:
+                        exit_code = run_once() or 0
+                    except Exception:
+                        logger.exception("Run terjadwal gagal.")
+                        exit_code = 1
+                    finally:
+                        lock.release()
+                    logger.info("Run terjadwal selesai dalam %.1f detik (exit code %s).",
+                                (datetime.now() - last_start).total_seconds(), exit_code)
+                else:
+                    logger.warning("Run lain (PID %s) masih memegang lock %s; run terjadwal ini dilewati.",
+                                   lock.holder() or "?", lock.path)
+                runs += 1
+                next_run = next_run_time(last_start, datetime.now())
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+    logger.info("Scheduler ETL berhenti setelah %s run.", runs)
+    return exit_code
@@ -1,52 +1,53 @@
 # Mengimpor modul dan fungsi yang diperlukan
-import utils.extract as extract
-import utils.transform as transform
-import utils.load as load
-import pandas as pd
+import utils.metrics as metrics
+# run_incremental_load dan run_streaming_pipeline tetap diekspor dari sini untuk kode lama yang mengimpor main
+from etl.pipeline import STAGES, run_incremental_load, run_stages, run_streaming_pipeline
+from etl.scheduler import run_exclusive
+import argparse
+import logging
+import sys
 
-def main():
+logger = logging.getLogger(__name__)
+
+def main(resume: bool = False):
+    """
+    Titik masuk pipeline: mengatur logging, menjalankan pipeline ETL dengan pengukuran waktu total,
+    lalu menulis laporan metrik (jika METRICS_ENABLED). Mengembalikan exit code dari run_pipeline(),
+    atau 1 jika run lain masih memegang lock SCHEDULER_LOCK_PATH.
+    Jika `resume`, scraping dilanjutkan dari jurnal checkpoint run sebelumnya.
+    Untuk memilih tahap, tujuan, atau profil eksekusi, gunakan CLI `python -m etl run`.
+    """
+    metrics.configure_logging()
+    try:
+        with metrics.span("run"):
+            # Memegang lock yang sama dengan `python -m etl`, agar run tidak tumpang tindih
+            return run_exclusive(lambda: run_pipeline(resume=resume))
+    finally:
+        metrics.export()
+
+
+def run_pipeline(resume: bool = False):
     """
     Fungsi utama untuk menjalankan seluruh pipeline ETL.
     1. Ekstrak data dari website.
     2. Transformasi dan bersihkan data.
-    3. Muat data ke semua repositori tujuan (CSV, G-Sheets, PostgreSQL).
+    3. Muat data ke semua repositori tujuan (CSV, G-Sheets, PostgreSQL) secara paralel.
+    Mengembalikan exit code sesuai config.LOAD_FAILURE_POLICY.
     """
-    print("===== MEMULAI PIPELINE ETL PRODUK FASHION =====")
-    
-    # 1. Tahap Ekstrak
-    # ------------------
-    raw_products_data = extract.scrape_all_products()
-    
-    # Hentikan proses jika tidak ada data yang berhasil diekstrak
-    if not raw_products_data:
-        print("Pipeline dihentikan: Tidak ada data mentah yang berhasil diekstrak.")
-        return
-        
-    # 2. Tahap Transformasi
-    # ----------------------
-    cleaned_products_df = transform.transform_and_clean_data(raw_products_data)
-    
-    # Hentikan proses jika DataFrame kosong setelah dibersihkan
-    if cleaned_products_df.empty:
-        print("Pipeline dihentikan: Tidak ada data valid setelah proses transformasi.")
-        return
-        
-    print("\n--- Data Bersih Siap Dimuat ---")
-    print(cleaned_products_df.head())
-    print("\n--- Info DataFrame ---")
-    cleaned_products_df.info()
-    print("--------------------------\n")
-
-    # 3. Tahap Memuat (Load)
-    # -------------------
-    # Memuat data ke semua tujuan yang ditentukan
-    load.save_to_csv(cleaned_products_df)
-    load.save_to_gsheet(cleaned_products_df)
-    load.save_to_postgres(cleaned_products_df)
-    
-    print("\n===== PIPELINE ETL SELESAI =====")
+    return run_stages(STAGES, resume=resume)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Membaca argumen command line."""
+    parser = argparse.ArgumentParser(description="Pipeline ETL produk fashion.")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="lanjutkan scraping dari jurnal checkpoint; hanya halaman yang belum selesai atau gagal yang diambil",
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
     # Menjalankan fungsi utama saat skrip dieksekusi
-    main()
\ No newline at end of file
+    args = parse_args()
+    sys.exit(main(resume=args.resume))
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests
+import requests_mock
+import utils.config as config
+from utils.cache import PageCache, CacheMissError, cached_get
+
+URL = 'https://fashion-studio.dicoding.dev/page2'
+
+class TestPageCache(unittest.TestCase):
+
+    def setUp(self):
+        """Menyiapkan cache SQLite sementara untuk setiap tes."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = PageCache(os.path.join(self.tmp_dir.name, 'pages.sqlite'), ttl=3600, max_bytes=1024)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_put_and_get_round_trip(self):
+        """Tes penyimpanan dan pembacaan entri cache beserta validator HTTP-nya."""
+        self.cache.put(URL, '<p>⭐</p>'.encode('utf-8'), etag='"abc"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT', encoding='utf-8')
+
+        entry = self.cache.get(URL)
+
+        self.assertEqual(entry.text, '<p>⭐</p>')
+        self.assertTrue(self.cache.is_fresh(entry))
+        self.assertEqual(PageCache.conditional_headers(entry), {
+            'If-None-Match': '"abc"',
+            'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+        })
+        self.assertIsNone(self.cache.get('https://lain.example'))
+
+    def test_lru_eviction_respects_max_bytes(self):
+        """Tes eviction: entri yang paling lama tidak diakses dibuang saat ukuran melebihi batas."""
+        with patch('utils.cache.time.time', side_effect=[1, 2, 3, 4, 5, 6]):
+            self.cache.put('a', b'x' * 400)     # waktu 1
+            self.cache.put('b', b'x' * 400)     # waktu 2
+            self.cache.get('a')                 # waktu 3: 'a' baru diakses
+            self.cache.put('c', b'x' * 400)     # waktu 4: total 1200 > 1024, 'b' dibuang
+
+        with patch('utils.cache.time.time', return_value=7):
+            self.assertIsNotNone(self.cache.get('a'))
+            self.assertIsNone(self.cache.get('b'))
+            self.assertIsNotNone(self.cache.get('c'))
+        self.assertLessEqual(self.cache.total_bytes(), 1024)
+
+    @patch.object(config, 'CACHE_MODE', 'on')
+    def test_cached_get_sends_conditional_request_and_uses_304(self):
+        """Tes conditional request: entri kedaluwarsa divalidasi ulang dan respons 304 memakai isi cache."""
+        self.cache.ttl = 0
+        with requests_mock.Mocker() as m:
+            m.get(URL, [
+                {'status_code': 200, 'text': 'halaman', 'headers': {'ETag': '"v1"'}},
+                {'status_code': 304},
+            ])
+            with requests.Session() as session:
+                self.assertEqual(cached_get(session, URL, self.cache), 'halaman')
+                self.assertEqual(cached_get(session, URL, self.cache), 'halaman')
+
+            self.assertEqual(m.request_history[1].headers['If-None-Match'], '"v1"')
+
+    @patch.object(config, 'CACHE_MODE', 'on')
+    def test_cached_get_skips_network_for_fresh_entry(self):
+        """Tes TTL: entri yang masih segar dikembalikan tanpa request jaringan."""
+        self.cache.put(URL, b'dari cache', encoding='utf-8')
+        with requests_mock.Mocker() as m:
+            with requests.Session() as session:
+                self.assertEqual(cached_get(session, URL, self.cache), 'dari cache')
+            self.assertEqual(m.call_count, 0)
+
+    @patch.object(config, 'CACHE_MODE', 'replay')
+    def test_cached_get_replay_mode_never_hits_network(self):
+        """Tes mode replay: hanya membaca cache dan gagal jika halaman tidak tersimpan."""
+        self.cache.put(URL, b'rekaman', encoding='utf-8')
+        self.cache.ttl = 0
+        with requests_mock.Mocker() as m:
+            with requests.Session() as session:
+                self.assertEqual(cached_get(session, URL, self.cache), 'rekaman')
+                with self.assertRaises(CacheMissError):
+                    cached_get(session, URL + '0', self.cache)
+            self.assertEqual(m.call_count, 0)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import requests_mock
+
+import utils.config as config
+from utils.checkpoint import CheckpointJournal, open_journal
+from utils.extract import scrape_all_products
+
+BASE_URL = 'https://fashion-studio.dicoding.dev'
+CARD = '<div class="collection-card"><h3 class="product-title">Produk {}</h3></div>'
+
+def page_url(page_num: int) -> str:
+    return BASE_URL if page_num == 1 else f'{BASE_URL}/page{page_num}'
+
+@patch.object(config, 'PAGE_COUNT', 5)
+@patch.object(config, 'SCRAPE_RATE_LIMIT', 0)
+@patch.object(config, 'SCRAPE_MAX_RETRIES', 0)
+@patch.object(config, 'PAGE_RETRY_DELAY', 0)
+@patch('utils.extract.logger')
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        """Menyiapkan path jurnal checkpoint sementara."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.tmp_dir.name, 'checkpoint.sqlite')
+        self.path_patch = patch.object(config, 'CHECKPOINT_PATH', self.journal_path)
+        self.path_patch.start()
+
+    def tearDown(self):
+        self.path_patch.stop()
+        self.tmp_dir.cleanup()
+
+    def _mock_pages(self, m, failing=()):
+        for page_num in range(1, 6):
+            if page_num in failing:
+                m.get(page_url(page_num), status_code=503)
+            else:
+                m.get(page_url(page_num), text=CARD.format(page_num))
+
+    def test_journal_records_done_and_failed_pages(self, mock_logger):
+        """Tes jurnal menyimpan produk halaman selesai dan error halaman gagal."""
+        journal = CheckpointJournal(self.journal_path)
+        journal.reset(BASE_URL)
+        journal.mark_failed(2, '503 Server Error')
+        journal.mark_done(1, [{'title': 'Kemeja ⭐'}])
+        journal.mark_done(2, [{'title': 'Rok'}])
+        journal.mark_failed(3, '503 Server Error')
+
+        self.assertEqual(journal.completed_pages(), {1, 2})
+        self.assertEqual(journal.failed_pages(), {3: '503 Server Error'})
+        self.assertEqual(journal.load_products(1), [{'title': 'Kemeja ⭐'}])
+        journal.close()
+
+    @patch.object(config, 'PAGE_RETRY_ROUNDS', 0)
+    def test_resume_fetches_only_missing_and_failed_pages(self, mock_logger):
+        """Tes resume: halaman yang sudah selesai dibaca dari jurnal, hanya halaman gagal yang diambil ulang."""
+        with requests_mock.Mocker() as m:
+            self._mock_pages(m, failing={3})
+            with patch.object(config, 'CHECKPOINT_ENABLED', True):
+                first_run = scrape_all_products(mode='sequential')
+        self.assertEqual(len(first_run), 4)
+
+        with requests_mock.Mocker() as m:
+            self._mock_pages(m)
+            products = scrape_all_products(mode='sequential', resume=True)
+            self.assertEqual([request.url.rstrip('/') for request in m.request_history], [page_url(3)])
+
+        self.assertEqual([p['title'] for p in products], [f'Produk {i}' for i in range(1, 6)])
+
+    @patch.object(config, 'PAGE_RETRY_ROUNDS', 1)
+    def test_transient_failures_go_to_retry_queue(self, mock_logger):
+        """Tes halaman yang gagal sementara diambil ulang setelah putaran utama, bukan dilewati."""
+        with requests_mock.Mocker() as m:
+            self._mock_pages(m)
+            m.get(page_url(2), [{'status_code': 503}, {'text': CARD.format(2)}])
+            m.get(page_url(4), status_code=404)
+
+            products = scrape_all_products(mode='threaded')
+
+            # Halaman 404 tidak dicoba ulang
+            self.assertEqual(sum(request.url.endswith('/page4') for request in m.request_history), 1)
+
+        self.assertEqual([p['title'] for p in products], ['Produk 1', 'Produk 3', 'Produk 5', 'Produk 2'])
+
+    def test_journal_of_other_site_is_not_resumed(self, mock_logger):
+        """Tes jurnal milik BASE_URL lain dikosongkan saat resume."""
+        journal = CheckpointJournal(self.journal_path)
+        journal.reset('https://situs-lain.example')
+        journal.mark_done(1, [{'title': 'Lama'}])
+        journal.close()
+
+        journal = open_journal(resume=True)
+        self.assertEqual(journal.completed_pages(), set())
+        journal.close()
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
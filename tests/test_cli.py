@@ -0,0 +1,120 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+
+import utils.config as config
+from etl.cli import build_parser, config_overrides, main
+from utils.snapshot import open_snapshot_store
+
+RAW_PRODUCTS = [
+    {'title': 'Kemeja', 'price': '$10.00', 'rating': 'Rating: ⭐ 4.5 / 5', 'colors': '3 Colors', 'size': 'Size: M', 'gender': 'Gender: Men'},
+    {'title': 'Unknown Product', 'price': '$5.00', 'rating': 'Rating: ⭐ 4.0 / 5', 'colors': '2 Colors', 'size': 'Size: S', 'gender': 'Gender: Women'},
+    {'title': 'Rok', 'price': '$20.00', 'rating': 'Rating: ⭐ 3.5 / 5', 'colors': '5 Colors', 'size': 'Size: L', 'gender': 'Gender: Women'},
+]
+
+@patch('utils.metrics.configure_logging')
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        """Menyimpan nilai config karena CLI menimpanya untuk proses ini, dan menyiapkan direktori sementara."""
+        self.saved_config = {name: value for name, value in vars(config).items() if name.isupper()}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, 'products.csv')
+        self.raw_path = os.path.join(self.tmp_dir.name, 'raw.json')
+        with open(self.raw_path, 'w', encoding='utf-8') as f:
+            json.dump(RAW_PRODUCTS, f)
+        config.CSV_OUTPUT_PATH = self.csv_path
+        config.SCHEDULER_LOCK_PATH = os.path.join(self.tmp_dir.name, 'etl.lock')
+
+    def tearDown(self):
+        for name, value in self.saved_config.items():
+            setattr(config, name, value)
+        self.tmp_dir.cleanup()
+
+    def test_execution_profile_and_options_become_config_overrides(self, mock_logging):
+        """Tes profil eksekusi dan opsi CLI diterjemahkan ke nilai config yang ditimpa."""
+        args = build_parser().parse_args([
+            'run', '--execution', 'multiprocess', '--concurrency', '16', '--sinks', 'csv,postgres',
+            '--pipeline-mode', 'stream', '--batch-size', '10',
+        ])
+
+        self.assertEqual(config_overrides(args), {
+            'SCRAPE_MODE': 'threaded', 'PARSE_MODE': 'process', 'SCRAPE_CONCURRENCY': 16,
+            'LOAD_SINKS': 'csv,postgres', 'PIPELINE_MODE': 'stream', 'STREAM_BATCH_PAGES': 10,
+        })
+        with self.assertRaises(SystemExit), patch('sys.stderr'):
+            build_parser().parse_args(['run', '--sinks', 'csv,excel'])
+
+    @patch('utils.extract.scrape_all_products')
+    def test_transform_and_load_from_raw_dump_without_scraping(self, mock_scrape, mock_logging):
+        """Tes tahap transform+load membaca data mentah dari file dan hanya memuat ke tujuan yang dipilih."""
+        with patch('utils.load.save_to_postgres') as mock_postgres:
+            exit_code = main(['run', '--stages', 'transform,load', '--raw', self.raw_path, '--sinks', 'csv'])
+
+        self.assertEqual(exit_code, 0)
+        mock_scrape.assert_not_called()
+        mock_postgres.assert_not_called()
+        self.assertEqual(pd.read_csv(self.csv_path)['title'].tolist(), ['Kemeja', 'Rok'])
+
+    @patch('utils.extract.scrape_all_products', return_value=RAW_PRODUCTS)
+    def test_extract_only_writes_raw_dump(self, mock_scrape, mock_logging):
+        """Tes tahap extract saja menyimpan data mentah tanpa transformasi maupun pemuatan."""
+        raw_output = os.path.join(self.tmp_dir.name, 'raw', 'products.json')
+
+        self.assertEqual(main(['run', '--stages', 'extract', '--raw', raw_output]), 0)
+
+        with open(raw_output, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), RAW_PRODUCTS)
+        self.assertFalse(os.path.exists(self.csv_path))
+
+    def test_load_only_from_csv_snapshot_with_profile(self, mock_logging):
+        """Tes tahap load saja dari snapshot CSV, dan --profile menyimpan statistik cProfile."""
+        snapshot_path = os.path.join(self.tmp_dir.name, 'snapshot.csv')
+        pd.DataFrame({'title': ['Kemeja'], 'price': [160000.0], 'timestamp': ['2024-01-01 10:00:00']}).to_csv(snapshot_path, index=False)
+        profile_path = os.path.join(self.tmp_dir.name, 'run.pstats')
+
+        with patch('etl.cli.logger'):
+            exit_code = main(['run', '--stages', 'load', '--snapshot', snapshot_path, '--sinks', 'csv', '--profile', profile_path])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(pd.read_csv(self.csv_path)['price'].tolist(), [160000.0])
+        self.assertTrue(os.path.getsize(profile_path) > 0)
+
+    @patch('utils.snapshot.logger')
+    def test_transform_replays_latest_raw_snapshot(self, mock_snapshot_logger, mock_logging):
+        """Tes --raw-run mentransformasi ulang snapshot data mentah terbaru tanpa scraping."""
+        config.RAW_SNAPSHOT_DIR = os.path.join(self.tmp_dir.name, 'raw_snapshots')
+        store = open_snapshot_store()
+        with store.open_writer() as writer:
+            writer.write(RAW_PRODUCTS, page=1)
+        store.close()
+
+        exit_code = main(['run', '--stages', 'transform,load', '--raw-run', 'latest', '--sinks', 'csv'])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(pd.read_csv(self.csv_path)['title'].tolist(), ['Kemeja', 'Rok'])
+
+    def test_missing_stage_input_is_rejected(self, mock_logging):
+        """Tes transform tanpa extract wajib menyertakan --raw."""
+        with self.assertRaises(SystemExit), patch('sys.stderr'):
+            main(['run', '--stages', 'transform'])
+
+    def test_heavy_libraries_are_imported_lazily(self, mock_logging):
+        """Tes impor modul pipeline tidak ikut memuat gspread, SQLAlchemy, BeautifulSoup, dan pyarrow."""
+        # pandas 2.x sendiri mengimpor pyarrow jika terpasang, jadi pyarrow diblokir: impor pipeline harus tetap berhasil
+        code = (
+            "import sys; sys.modules['pyarrow'] = None; import etl.pipeline; "
+            "print(','.join(m for m in ('gspread', 'sqlalchemy', 'bs4', 'pyarrow') if sys.modules.get(m)))"
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        self.assertEqual(result.stdout.strip(), '')
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
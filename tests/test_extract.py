@@ -1,8 +1,20 @@
+import os
+import multiprocessing
+import threading
 import unittest
 from unittest.mock import patch, Mock
 # Menambahkan import ini agar 'requests.exceptions.RequestException' dikenali.
 import requests
-from utils.extract import scrape_all_products
+import requests_mock
+import utils.config as config
+import utils.extract as extract_module
+from utils.extract import (
+    scrape_all_products, fetch_page, create_session, RateLimiter, iter_product_batches, parse_page, parse_page_lxml,
+    parse_pagination, discover_page_count, PageResult, _iter_pages_concurrent,
+)
+
+# Direktori berisi halaman HTML yang disimpan dari situs untuk pengujian parser
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
 
 class TestExtract(unittest.TestCase):
 
@@ -63,5 +75,189 @@ class TestExtract(unittest.TestCase):
         # Memeriksa total panggilan sesuai jumlah halaman
         self.assertEqual(mock_get.call_count, 50)
 
+    @patch.object(config, 'PAGE_COUNT', 5)
+    @patch.object(config, 'SCRAPE_RATE_LIMIT', 0)
+    def test_scrape_all_products_threaded_keeps_page_order(self):
+        """Tes mode konkuren: hasil harus tetap berurutan sesuai nomor halaman."""
+        card = '<div class="collection-card"><h3 class="product-title">Produk {}</h3></div>'
+        with requests_mock.Mocker() as m:
+            m.get('https://fashion-studio.dicoding.dev', text=card.format(1))
+            for page_num in range(2, 6):
+                m.get(f'https://fashion-studio.dicoding.dev/page{page_num}', text=card.format(page_num))
+
+            products = scrape_all_products(mode='threaded')
+
+        self.assertEqual([p['title'] for p in products], [f'Produk {i}' for i in range(1, 6)])
+
+    @patch.object(config, 'SCRAPE_RATE_LIMIT', 0)
+    def test_concurrent_pages_refill_queue_as_results_are_consumed(self):
+        """Tes antrean geser: halaman berikutnya dikirim begitu hasil terdepan diambil, tanpa menunggu jendela habis."""
+        page_five_started = threading.Event()
+
+        def scrape(session, rate_limiter, page_num):
+            if page_num == 5:
+                page_five_started.set()
+            # Halaman 2 hanya selesai jika halaman 5 (di luar jendela awal 4 halaman) sudah berjalan
+            ready = page_five_started.wait(5) if page_num == 2 else True
+            return PageResult(page_num, [ready])
+
+        with patch('utils.extract._scrape_page_concurrent', side_effect=scrape):
+            results = list(_iter_pages_concurrent(range(1, 7), max_workers=2))
+
+        self.assertEqual([result.page_num for result in results], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(results[1].products, [True])
+
+    @patch.object(config, 'SCRAPE_BACKOFF_FACTOR', 0)
+    @patch.object(config, 'SCRAPE_MAX_RETRIES', 2)
+    def test_fetch_page_retries_server_errors(self):
+        """Tes fetch_page mencoba ulang status 5xx lalu berhasil."""
+        url = 'https://fashion-studio.dicoding.dev/page2'
+        with requests_mock.Mocker() as m:
+            m.get(url, [{'status_code': 503}, {'status_code': 200, 'text': 'ok'}])
+            with create_session(1) as session:
+                self.assertEqual(fetch_page(session, url), 'ok')
+            self.assertEqual(m.call_count, 2)
+
+    @patch.object(config, 'SCRAPE_BACKOFF_FACTOR', 0)
+    def test_fetch_page_does_not_retry_client_errors(self):
+        """Tes fetch_page langsung gagal untuk status 404 tanpa percobaan ulang."""
+        url = 'https://fashion-studio.dicoding.dev/page99'
+        with requests_mock.Mocker() as m:
+            m.get(url, status_code=404)
+            with create_session(1) as session:
+                with self.assertRaises(requests.exceptions.HTTPError):
+                    fetch_page(session, url)
+            self.assertEqual(m.call_count, 1)
+
+    @patch('utils.extract.time.sleep')
+    def test_rate_limiter_spaces_requests_per_host(self, mock_sleep):
+        """Tes RateLimiter memberi jeda antar request ke host yang sama."""
+        limiter = RateLimiter(rate=2)
+        limiter.wait('https://a.example/page1')
+        limiter.wait('https://a.example/page2')
+        limiter.wait('https://b.example/page1')
+        # Hanya request kedua ke host 'a' yang perlu menunggu
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @patch.object(config, 'PAGE_COUNT', 5)
+    @patch('utils.extract.requests.get')
+    def test_iter_product_batches_groups_pages(self, mock_get):
+        """Tes generator batch: 5 halaman dengan 2 halaman per batch menghasilkan 3 batch."""
+        mock_get.return_value = Mock(status_code=200, text="""
+        <div class="collection-card"><h3 class="product-title">Kemeja</h3></div>
+        """)
+
+        batches = list(iter_product_batches(batch_pages=2, mode='sequential'))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+
+    @patch.object(config, 'PAGE_COUNT', 6)
+    @patch.object(config, 'SCRAPE_RATE_LIMIT', 0)
+    @patch.object(config, 'SCRAPE_MAX_RETRIES', 0)
+    @patch.object(config, 'PARSE_WORKERS', 2)
+    @patch.object(config, 'PARSE_MODE', 'process')
+    def test_scrape_all_products_multiprocess_parsing(self):
+        """Tes parsing di ProcessPoolExecutor: urutan terjaga, halaman gagal dilewati, dan worker sudah dibuat sebelum thread fetch berjalan."""
+        card = '<div class="collection-card"><h3 class="product-title">Produk {}</h3></div>'
+        workers_at_fetch_start = []
+        original_fetch_stage = extract_module._fetch_stage
+
+        def fetch_stage(*args):
+            workers_at_fetch_start.append(len(multiprocessing.active_children()))
+            return original_fetch_stage(*args)
+
+        with requests_mock.Mocker() as m, patch('utils.extract._fetch_stage', side_effect=fetch_stage):
+            m.get('https://fashion-studio.dicoding.dev', text=card.format(1))
+            for page_num in range(2, 7):
+                m.get(f'https://fashion-studio.dicoding.dev/page{page_num}', text=card.format(page_num))
+            m.get('https://fashion-studio.dicoding.dev/page4', status_code=404)
+
+            products = scrape_all_products()
+
+        self.assertEqual([p['title'] for p in products], ['Produk 1', 'Produk 2', 'Produk 3', 'Produk 5', 'Produk 6'])
+        self.assertEqual(workers_at_fetch_start, [2])
+
+    @patch('builtins.print')
+    def test_lxml_parser_matches_bs4_parser_on_saved_pages(self, mock_print):
+        """Tes kesetaraan: parser lxml harus menghasilkan output yang sama persis dengan parser BeautifulSoup."""
+        for page_file in ('page1.html', 'page50.html'):
+            with open(os.path.join(FIXTURES_DIR, page_file), encoding='utf-8') as f:
+                html = f.read()
+
+            with patch.object(config, 'PARSER_BACKEND', 'bs4'):
+                expected = parse_page(html)
+            with patch.object(config, 'PARSER_BACKEND', 'lxml'):
+                self.assertEqual(parse_page(html), expected, page_file)
+            # Input bytes dipakai oleh tahap parsing multiproses
+            self.assertEqual(parse_page_lxml(html.encode('utf-8')), expected, page_file)
+
+    def test_lxml_parser_handles_both_price_layouts(self):
+        """Tes parser lxml pada dua struktur harga: span.price di price-container dan fallback p.price."""
+        with open(os.path.join(FIXTURES_DIR, 'page1.html'), encoding='utf-8') as f:
+            products = {p['title']: p for p in parse_page_lxml(f.read())}
+
+        self.assertEqual(products['T-shirt 2']['price'], '$102.15')
+        self.assertEqual(products['Jacket 6']['price'], '$151.41')
+        self.assertEqual(products['Dress 7']['price'], 'Price Unavailable')
+        self.assertEqual(parse_page_lxml(''), [])
+
+    def test_parse_pagination_on_saved_pages(self):
+        """Tes pembacaan kontrol paginasi dari halaman pertama dan terakhir situs."""
+        for page_file, expected in (('page1.html', (50, [2])), ('page50.html', (50, [49]))):
+            with open(os.path.join(FIXTURES_DIR, page_file), encoding='utf-8') as f:
+                self.assertEqual(parse_pagination(f.read()), expected, page_file)
+
+    @patch.object(config, 'PAGINATION_MODE', 'discover')
+    @patch.object(config, 'SCRAPE_RATE_LIMIT', 0)
+    def test_discover_mode_uses_pagination_and_stops_on_empty_page(self):
+        """Tes mode discover: jumlah halaman dari 'Page 1 of N' dan scraping berhenti di halaman tanpa kartu."""
+        card = '<div class="collection-card"><h3 class="product-title">Produk {}</h3></div>'
+        pagination = '<ul class="pagination"><li><span>Page 1 of 6</span></li><li><a href="/page2">Next</a></li></ul>'
+        with requests_mock.Mocker() as m:
+            m.get('https://fashion-studio.dicoding.dev', text=card.format(1) + pagination)
+            for page_num in range(2, 7):
+                m.get(f'https://fashion-studio.dicoding.dev/page{page_num}', text=card.format(page_num))
+            m.get('https://fashion-studio.dicoding.dev/page4', text='<div class="collection-grid"></div>')
+
+            products = scrape_all_products(mode='sequential')
+
+            requested = [request.url for request in m.request_history]
+        self.assertEqual([p['title'] for p in products], ['Produk 1', 'Produk 2', 'Produk 3'])
+        self.assertFalse(any(url.endswith(('/page5', '/page6')) for url in requested))
+
+    @patch.object(config, 'SCRAPE_RATE_LIMIT', 0)
+    @patch.object(config, 'SCRAPE_MAX_RETRIES', 0)
+    def test_discover_page_count_probes_without_pagination(self):
+        """Tes probe eksponensial lalu biner saat halaman tidak punya kontrol paginasi."""
+        card = '<div class="collection-card"><h3 class="product-title">Produk</h3></div>'
+        with requests_mock.Mocker() as m:
+            m.get(requests_mock.ANY, status_code=404)
+            m.get('https://fashion-studio.dicoding.dev', text=card)
+            for page_num in range(2, 14):
+                m.get(f'https://fashion-studio.dicoding.dev/page{page_num}', text=card)
+
+            self.assertEqual(discover_page_count(), 13)
+            # Halaman 1, probe 2/4/8/16, lalu biner 12/14/13: jauh lebih sedikit dari menelusuri semua halaman
+            self.assertEqual(m.call_count, 8)
+
+    @patch.object(config, 'SCRAPE_RATE_LIMIT', 0)
+    @patch.object(config, 'SCRAPE_MAX_RETRIES', 0)
+    @patch.object(config, 'PAGE_COUNT', 50)
+    @patch('utils.extract.logger')
+    def test_failed_probe_falls_back_within_known_bounds(self, mock_logger):
+        """Tes probe yang gagal (503) tidak menghentikan scraping: PAGE_COUNT dipakai dalam batas yang sudah ditemukan."""
+        card = '<div class="collection-card"><h3 class="product-title">Produk</h3></div>'
+        for failing_page, expected in ((8, 50), (12, 15)):
+            with requests_mock.Mocker() as m:
+                m.get(requests_mock.ANY, status_code=404)
+                m.get('https://fashion-studio.dicoding.dev', text=card)
+                for page_num in range(2, 14):
+                    m.get(f'https://fashion-studio.dicoding.dev/page{page_num}', text=card)
+                m.get(f'https://fashion-studio.dicoding.dev/page{failing_page}', status_code=503)
+
+                # Probe 2/4/8 (gagal) -> belum ada batas atas; probe 2/4/8/16 lalu 12 (gagal) -> batas atas 15
+                self.assertEqual(discover_page_count(), expected)
+            self.assertIn('Probe paginasi gagal', mock_logger.warning.call_args[0][0])
+
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
\ No newline at end of file
@@ -0,0 +1,194 @@
+import re
+import unittest
+from unittest.mock import patch, MagicMock
+import pandas as pd
+
+import utils.config as config
+import utils.gsheet as gsheet
+from utils.gsheet import TokenBucket, _quota_bucket, compute_cell_diff, dataframe_to_values, write_dataframe_diff, get_gsheet_client
+
+class FakeWorksheet:
+    """
+    Worksheet tiruan di memori dengan API gspread yang dipakai writer diff:
+    get_values, batch_update, resize, row_count, dan col_count. Setiap request tulis dicatat.
+    """
+
+    def __init__(self, values=None, rows=1000, cols=26):
+        self.cells = {}
+        for row_index, row in enumerate(values or []):
+            for column_index, value in enumerate(row):
+                self.cells[(row_index, column_index)] = value
+        self.row_count = rows
+        self.col_count = cols
+        self.write_requests = []
+
+    def get_values(self, value_render_option=None):
+        """Mengembalikan isi sheet sebagai grid, dengan baris terakhir dan kolom kosong di kanan dipangkas seperti API asli."""
+        if not self.cells:
+            return []
+        height = max(row for row, _ in self.cells) + 1
+        width = max(column for _, column in self.cells) + 1
+        grid = [[self.cells.get((row, column), "") for column in range(width)] for row in range(height)]
+        grid = [self._trim(row) for row in grid]
+        while grid and not grid[-1]:
+            grid.pop()
+        return grid
+
+    @staticmethod
+    def _trim(row):
+        while row and row[-1] == "":
+            row = row[:-1]
+        return row
+
+    def batch_update(self, data, value_input_option=None):
+        self.write_requests.append(data)
+        for update in data:
+            start, _ = update['range'].split(':')
+            letters, digits = re.match(r'([A-Z]+)(\d+)', start).groups()
+            first_row = int(digits) - 1
+            first_column = sum((ord(ch) - 64) * 26 ** i for i, ch in enumerate(reversed(letters))) - 1
+            for row_offset, row in enumerate(update['values']):
+                for column_offset, value in enumerate(row):
+                    key = (first_row + row_offset, first_column + column_offset)
+                    if value == "":
+                        self.cells.pop(key, None)
+                    else:
+                        self.cells[key] = value
+
+    def resize(self, rows=None, cols=None):
+        self.row_count = rows or self.row_count
+        self.col_count = cols or self.col_count
+
+    @property
+    def cells_written(self):
+        return sum(len(row) for request in self.write_requests for update in request for row in update['values'])
+
+
+class TestGsheetDiffWriter(unittest.TestCase):
+
+    def setUp(self):
+        """Menyiapkan DataFrame sampel dan token bucket tanpa jeda."""
+        self.df = pd.DataFrame({
+            'title': ['Kemeja', 'Rok', 'Jaket'],
+            'price': [160000.0, 200000.0, 800000.0],
+            'rating': [4.5, 4.0, 3.9],
+            'colors': [3, 2, 5],
+            'timestamp': pd.Timestamp('2024-01-01 10:00:00'),
+        })
+        self.bucket = TokenBucket(rate=1000, capacity=1000)
+
+    def test_first_write_fills_empty_sheet(self):
+        """Tes penulisan pertama ke sheet kosong: semua sel ditulis dalam satu range."""
+        worksheet = FakeWorksheet()
+
+        write_dataframe_diff(worksheet, self.df, self.bucket)
+
+        self.assertEqual(len(worksheet.write_requests), 1)
+        self.assertEqual(worksheet.get_values()[0], ['title', 'price', 'rating', 'colors', 'timestamp'])
+        self.assertEqual(worksheet.get_values()[3][0], 'Jaket')
+
+    def test_second_write_sends_only_changed_cells(self):
+        """Tes diff: hanya sel yang berubah yang dikirim; perubahan timestamp saja tidak memicu penulisan."""
+        worksheet = FakeWorksheet()
+        write_dataframe_diff(worksheet, self.df, self.bucket)
+        worksheet.write_requests.clear()
+
+        # Run berikutnya: timestamp baru, dan hanya harga 'Rok' yang berubah
+        updated = self.df.copy()
+        updated['timestamp'] = pd.Timestamp('2024-02-01 10:00:00')
+        updated.loc[1, 'price'] = 180000.0
+        write_dataframe_diff(worksheet, updated, self.bucket)
+
+        self.assertEqual(worksheet.write_requests, [[
+            {'range': 'B3:B3', 'values': [[180000.0]]},
+            {'range': 'E3:E3', 'values': [['2024-02-01 10:00:00']]},
+        ]])
+
+        # Tanpa perubahan sama sekali tidak ada request tulis
+        worksheet.write_requests.clear()
+        self.assertEqual(write_dataframe_diff(worksheet, updated, self.bucket), 0)
+        self.assertEqual(worksheet.write_requests, [])
+
+    def test_shrinking_data_clears_leftover_rows(self):
+        """Tes baris yang sudah tidak ada di data baru dikosongkan."""
+        worksheet = FakeWorksheet()
+        write_dataframe_diff(worksheet, self.df, self.bucket)
+
+        write_dataframe_diff(worksheet, self.df.iloc[:1], self.bucket)
+
+        self.assertEqual(len(worksheet.get_values()), 2)
+
+    def test_compute_cell_diff_merges_consecutive_rows(self):
+        """Tes baris berurutan dengan rentang kolom yang sama digabung menjadi satu range."""
+        old = [['a', 'b'], ['1', '2'], ['3', '4']]
+        new = [['a', 'b'], ['9', '9'], ['8', '8']]
+
+        self.assertEqual(compute_cell_diff(old, new), [{'range': 'A2:B3', 'values': [['9', '9'], ['8', '8']]}])
+
+    @patch.object(config, 'GSHEET_BATCH_MAX_CELLS', 4)
+    def test_large_diff_is_chunked_and_throttled(self):
+        """Tes diff besar dipecah menjadi beberapa batch_update, masing-masing mengambil token dari bucket."""
+        worksheet = FakeWorksheet(rows=2, cols=2)
+        bucket = MagicMock()
+        df = pd.DataFrame({'a': [1, 2, 3], 'b': [4, 5, 6]})
+
+        # Baris berbeda-beda panjang sehingga menghasilkan beberapa range
+        worksheet.cells = {(1, 0): 9, (3, 1): 9}
+        write_dataframe_diff(worksheet, df, bucket)
+
+        self.assertGreater(len(worksheet.write_requests), 1)
+        self.assertEqual(bucket.acquire.call_count, len(worksheet.write_requests) + 1)  # +1 untuk resize
+        self.assertEqual(worksheet.row_count, 4)
+        self.assertEqual(worksheet.get_values(), [['a', 'b'], [1, 4], [2, 5], [3, 6]])
+
+    def test_float32_values_are_rounded(self):
+        """Tes nilai float32 ditulis tanpa noise presisi."""
+        df = pd.DataFrame({'rating': pd.Series([3.9], dtype='float32')})
+
+        self.assertEqual(dataframe_to_values(df), [['rating'], [3.9]])
+
+    @patch('utils.gsheet.time.sleep')
+    def test_token_bucket_waits_when_empty(self, mock_sleep):
+        """Tes token bucket menunggu jika token habis."""
+        bucket = TokenBucket(rate=1, capacity=2)
+        bucket.acquire()
+        bucket.acquire()
+        with patch('utils.gsheet.time.monotonic', side_effect=[bucket._updated, bucket._updated + 1]):
+            bucket.acquire()
+
+        mock_sleep.assert_called_once()
+
+    def test_write_bucket_stays_within_quota_in_first_minute(self):
+        """Tes bucket kuota tulis: dalam 60 detik pertama request tidak melebihi kuota per menit."""
+        clock = [1000.0]
+
+        def sleep(seconds):
+            # Sedikit lebih lama dari yang diminta, seperti time.sleep sungguhan, agar pembulatan float tidak berulang
+            clock[0] += seconds + 1e-9
+
+        with patch('utils.gsheet.time.monotonic', side_effect=lambda: clock[0]), \
+                patch('utils.gsheet.time.sleep', side_effect=sleep):
+            bucket = _quota_bucket(quota_per_minute=60, burst=5)
+            granted = []
+            while clock[0] < 1000.0 + 120:
+                bucket.acquire()
+                granted.append(clock[0])
+
+        first_minute = [moment for moment in granted if moment < 1000.0 + 60]
+        self.assertLessEqual(len(first_minute), 60)
+        self.assertEqual(len([moment for moment in granted if moment == 1000.0]), 5)
+        for start in granted:
+            self.assertLessEqual(len([moment for moment in granted if start <= moment < start + 60]), 60)
+
+    @patch('gspread.service_account')
+    def test_client_is_authorized_once(self, mock_service_account):
+        """Tes client Google Sheets di-cache: autentikasi hanya sekali."""
+        gsheet.reset_gsheet_client()
+        try:
+            self.assertIs(get_gsheet_client(), get_gsheet_client())
+            mock_service_account.assert_called_once()
+        finally:
+            gsheet.reset_gsheet_client()
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
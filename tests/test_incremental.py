@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from utils.incremental import compute_changes, commit_state, compute_row_hashes
+
+def make_products(rows):
+    """Membuat DataFrame bersih dengan kolom yang sama seperti hasil transform_and_clean_data."""
+    df = pd.DataFrame(rows, columns=['title', 'price', 'rating', 'colors', 'size', 'gender'])
+    df['timestamp'] = pd.Timestamp('2024-01-01 10:00:00')
+    return df
+
+class TestIncremental(unittest.TestCase):
+
+    def setUp(self):
+        """Menyiapkan file state sementara dan data run pertama."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp_dir.name, 'state.sqlite')
+        self.first_run = make_products([
+            ('Kemeja', 160000.0, 4.5, 3, 'M', 'Men'),
+            ('Rok', 200000.0, 4.0, 2, 'S', 'Women'),
+            ('Jaket', 800000.0, 3.9, 5, 'L', 'Unisex'),
+        ])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_first_run_inserts_everything(self):
+        """Tes run pertama: tanpa state, semua produk dianggap insert."""
+        changes = compute_changes(self.first_run, self.state_path)
+
+        self.assertEqual(changes.counts(), {'insert': 3, 'update': 0, 'delete': 0, 'unchanged': 0})
+
+    def test_second_run_detects_inserts_updates_and_deletes(self):
+        """Tes run berikutnya: hanya perubahan yang dilaporkan per kategori."""
+        commit_state(self.first_run, self.state_path)
+        second_run = make_products([
+            ('Kemeja', 160000.0, 4.5, 3, 'M', 'Men'),     # tidak berubah
+            ('Rok', 180000.0, 4.0, 2, 'S', 'Women'),      # harga berubah
+            ('Topi', 50000.0, 4.8, 1, 'M', 'Unisex'),     # produk baru
+        ])                                                # 'Jaket' dihapus
+        second_run['timestamp'] = pd.Timestamp('2024-02-01 10:00:00')
+
+        changes = compute_changes(second_run, self.state_path)
+
+        self.assertEqual(changes.counts(), {'insert': 1, 'update': 1, 'delete': 1, 'unchanged': 1})
+        self.assertEqual(changes.inserts.loc[0, 'title'], 'Topi')
+        self.assertEqual(changes.updates.loc[0, 'price'], 180000.0)
+        self.assertEqual(changes.deletes.loc[0, 'title'], 'Jaket')
+        self.assertEqual(sorted(changes.removed_keys['title']), ['Jaket', 'Rok', 'Topi'])
+
+        commit_state(second_run, self.state_path)
+        self.assertTrue(compute_changes(second_run, self.state_path).is_empty)
+
+    @patch('utils.config.LOAD_SINKS', 'csv')
+    def test_new_sink_gets_full_load(self):
+        """Tes state disimpan per kombinasi tujuan: menambah tujuan baru memicu load penuh, bukan hanya selisihnya."""
+        commit_state(self.first_run, self.state_path)
+
+        with patch('utils.config.LOAD_SINKS', 'csv,postgres'):
+            changes = compute_changes(self.first_run, self.state_path)
+
+        self.assertEqual(changes.counts(), {'insert': 3, 'update': 0, 'delete': 0, 'unchanged': 0})
+        self.assertTrue(compute_changes(self.first_run, self.state_path).is_empty)
+
+    def test_legacy_state_without_sinks_is_reset(self):
+        """Tes state versi lama (tanpa kolom sinks) dibuat ulang sehingga run berikutnya menjadi load penuh."""
+        conn = sqlite3.connect(self.state_path)
+        with conn:
+            conn.execute(
+                "CREATE TABLE product_state (title TEXT, size TEXT, gender TEXT, row_hash TEXT, PRIMARY KEY (title, size, gender))"
+            )
+            conn.execute("INSERT INTO product_state VALUES ('Kemeja', 'M', 'Men', 'abc')")
+        conn.close()
+
+        changes = compute_changes(self.first_run, self.state_path)
+
+        self.assertEqual(changes.counts(), {'insert': 3, 'update': 0, 'delete': 0, 'unchanged': 0})
+        commit_state(self.first_run, self.state_path)
+        self.assertTrue(compute_changes(self.first_run, self.state_path).is_empty)
+
+    def test_row_hash_is_stable_across_compact_dtypes(self):
+        """Tes hash baris tidak berubah jika kolom memakai tipe data ringkas (category, float32, int8)."""
+        compact = self.first_run.astype({
+            'rating': 'float32', 'colors': 'int8', 'size': 'category', 'gender': 'category'
+        })
+
+        self.assertEqual(compute_row_hashes(self.first_run).tolist(), compute_row_hashes(compact).tolist())
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -1,9 +1,14 @@
 import unittest
 from unittest.mock import patch, MagicMock # 'patch' untuk mengganti objek/fungsi, 'MagicMock' untuk membuat objek tiruan
+import os
+import tempfile
 import pandas as pd
 
 # Mengimpor fungsi-fungsi yang akan kita uji dari modul 'utils.load'
-from utils.load import save_to_csv, save_to_gsheet, save_to_postgres
+from sqlalchemy import create_engine
+from utils.load import save_to_csv, save_to_gsheet, save_to_postgres, append_to_csv, apply_changes_to_csv, apply_changes_to_gsheet, apply_changes_to_postgres, save_to_postgres_bulk, get_engine, save_to_parquet, read_parquet
+from utils.incremental import compute_changes, commit_state
+import utils.metrics as metrics
 
 # Mendefinisikan kelas tes untuk modul 'load', yang mewarisi dari 'unittest.TestCase'
 class TestLoad(unittest.TestCase):
@@ -101,5 +106,228 @@ class TestLoad(unittest.TestCase):
             index=False
         )
 
+    # --- Pengujian untuk mode streaming ---
+    @patch('utils.load.config')
+    def test_append_to_csv_writes_header_once(self, mock_config):
+        """Tes penulisan CSV per chunk: header hanya ditulis pada chunk pertama."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mock_config.CSV_OUTPUT_PATH = os.path.join(tmp_dir, "stream.csv")
+
+            append_to_csv(self.sample_df, first_chunk=True)
+            append_to_csv(self.sample_df, first_chunk=False)
+
+            result = pd.read_csv(mock_config.CSV_OUTPUT_PATH)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(list(result.columns), ['title', 'price', 'rating'])
+
+    # --- Pengujian untuk mode inkremental ---
+    def _changes_between(self, tmp_dir, old_df, new_df):
+        """Menghitung ChangeSet dari old_df ke new_df memakai file state sementara."""
+        state_path = os.path.join(tmp_dir, "state.sqlite")
+        commit_state(old_df, state_path)
+        return compute_changes(new_df, state_path)
+
+    def _products(self, rows):
+        return pd.DataFrame(rows, columns=['title', 'price', 'rating', 'colors', 'size', 'gender'])
+
+    @patch('utils.load.config')
+    def test_apply_changes_to_csv_rewrites_only_changed_rows(self, mock_config):
+        """Tes penerapan perubahan ke CSV: baris dihapus/berubah diganti, baris lain tetap."""
+        old_df = self._products([('Kemeja', 1.0, 4.5, 3, 'M', 'Men'), ('Rok', 2.0, 4.0, 2, 'S', 'Women')])
+        new_df = self._products([('Kemeja', 1.5, 4.5, 3, 'M', 'Men'), ('Topi', 3.0, 4.8, 1, 'M', 'Unisex')])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mock_config.CSV_OUTPUT_PATH = os.path.join(tmp_dir, "products.csv")
+            old_df.to_csv(mock_config.CSV_OUTPUT_PATH, index=False)
+
+            self.assertTrue(apply_changes_to_csv(self._changes_between(tmp_dir, old_df, new_df)))
+
+            result = pd.read_csv(mock_config.CSV_OUTPUT_PATH)
+        self.assertEqual(sorted(result['title']), ['Kemeja', 'Topi'])
+        self.assertEqual(result.loc[result['title'] == 'Kemeja', 'price'].item(), 1.5)
+
+    @patch('utils.load.create_engine')
+    @patch('utils.load.config')
+    def test_apply_changes_to_postgres_deletes_and_inserts(self, mock_config, mock_create_engine):
+        """Tes penerapan perubahan ke database (SQLite sebagai pengganti PostgreSQL)."""
+        mock_config.DB_TABLE_NAME = "products"
+        engine = create_engine("sqlite://")
+        mock_create_engine.return_value = engine
+        old_df = self._products([('Kemeja', 1.0, 4.5, 3, 'M', 'Men'), ('Rok', 2.0, 4.0, 2, 'S', 'Women')])
+        new_df = self._products([('Kemeja', 1.0, 4.5, 3, 'M', 'Men'), ('Rok', 2.5, 4.0, 2, 'S', 'Women'), ('Topi', 3.0, 4.8, 1, 'M', 'Unisex')])
+        old_df.to_sql("products", engine, index=False)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertTrue(apply_changes_to_postgres(self._changes_between(tmp_dir, old_df, new_df)))
+
+        result = pd.read_sql_table("products", engine).sort_values('title').reset_index(drop=True)
+        self.assertEqual(result['title'].tolist(), ['Kemeja', 'Rok', 'Topi'])
+        self.assertEqual(result['price'].tolist(), [1.0, 2.5, 3.0])
+
+    @patch('utils.load.create_engine')
+    @patch('utils.load.config')
+    def test_reapplying_same_changes_does_not_duplicate_rows(self, mock_config, mock_create_engine):
+        """Tes ChangeSet yang dikirim ulang (misal setelah load gagal sebagian) tidak menggandakan baris baru."""
+        mock_config.DB_TABLE_NAME = "products"
+        engine = create_engine("sqlite://")
+        mock_create_engine.return_value = engine
+        old_df = self._products([('Kemeja', 1.0, 4.5, 3, 'M', 'Men')])
+        new_df = self._products([('Kemeja', 1.5, 4.5, 3, 'M', 'Men'), ('Topi', 3.0, 4.8, 1, 'M', 'Unisex')])
+        old_df.to_sql("products", engine, index=False)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mock_config.CSV_OUTPUT_PATH = os.path.join(tmp_dir, "products.csv")
+            old_df.to_csv(mock_config.CSV_OUTPUT_PATH, index=False)
+            changes = self._changes_between(tmp_dir, old_df, new_df)
+            for _ in range(2):
+                self.assertTrue(apply_changes_to_csv(changes))
+                self.assertTrue(apply_changes_to_postgres(changes))
+
+            csv_result = pd.read_csv(mock_config.CSV_OUTPUT_PATH).sort_values('title')
+        db_result = pd.read_sql_table("products", engine).sort_values('title')
+        for result in (csv_result, db_result):
+            self.assertEqual(result['title'].tolist(), ['Kemeja', 'Topi'])
+            self.assertEqual(result['price'].tolist(), [1.5, 3.0])
+
+    @patch('utils.load.save_to_gsheet')
+    @patch('utils.load.save_to_gsheet_diff', return_value=True)
+    @patch('utils.load.config')
+    def test_apply_changes_to_gsheet_always_writes_diff(self, mock_config, mock_diff, mock_replace):
+        """Tes penerapan perubahan ke Google Sheets selalu lewat penulis diff, juga saat GSHEET_WRITE_METHOD="replace"."""
+        mock_config.GSHEET_WRITE_METHOD = "replace"
+        old_df = self._products([('Kemeja', 1.0, 4.5, 3, 'M', 'Men')])
+        new_df = self._products([('Kemeja', 1.5, 4.5, 3, 'M', 'Men')])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertTrue(apply_changes_to_gsheet(self._changes_between(tmp_dir, old_df, new_df)))
+
+        mock_diff.assert_called_once()
+        mock_replace.assert_not_called()
+
+    # --- Pengujian untuk bulk upsert ---
+    @patch('utils.load.config')
+    def test_save_to_postgres_bulk_upserts_and_keeps_index(self, mock_config):
+        """Tes bulk upsert (SQLite sebagai pengganti PostgreSQL): update, insert, delete, dan index tetap ada."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mock_config.DATABASE_URL = f"sqlite:///{os.path.join(tmp_dir, 'bulk.db')}"
+            mock_config.DB_TABLE_NAME = "products"
+            mock_config.DB_CHUNK_SIZE = 2
+            first = self._products([('Kemeja', 1.0, 4.5, 3, 'M', 'Men'), ('Rok', 2.0, 4.0, 2, 'S', 'Women'), ('Jaket', 5.0, 3.9, 5, 'L', 'Unisex')])
+            second = self._products([('Kemeja', 1.0, 4.5, 3, 'M', 'Men'), ('Rok', 2.5, 4.0, 2, 'S', 'Women'), ('Topi', 3.0, 4.8, 1, 'M', 'Unisex')])
+
+            self.assertTrue(save_to_postgres_bulk(first))
+            self.assertTrue(save_to_postgres_bulk(second))
+
+            engine = get_engine()
+            result = pd.read_sql_query('SELECT * FROM products ORDER BY title', engine)
+            indexes = pd.read_sql_query("SELECT name FROM sqlite_master WHERE type = 'index'", engine)
+            engine.dispose()
+
+        self.assertEqual(result['title'].tolist(), ['Kemeja', 'Rok', 'Topi'])
+        self.assertEqual(result['price'].tolist(), [1.0, 2.5, 3.0])
+        self.assertIn('products_natural_key', indexes['name'].tolist())
+
+    @patch('utils.load.config')
+    def test_save_to_postgres_bulk_migrates_existing_table(self, mock_config):
+        """Tes bulk upsert ke tabel lama hasil to_sql: kolom price_<kode> ditambahkan dan kunci ganda tidak menggagalkan index."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mock_config.DATABASE_URL = f"sqlite:///{os.path.join(tmp_dir, 'bulk.db')}"
+            mock_config.DB_TABLE_NAME = "products"
+            mock_config.DB_CHUNK_SIZE = 2
+            legacy = self._products([('Kemeja', 1.0, 4.5, 3, 'M', 'Men'), ('Kemeja', 1.2, 4.5, 3, 'M', 'Men'), ('Jaket', 5.0, 3.9, 5, 'L', 'Unisex')])
+            legacy.to_sql('products', get_engine(), index=False)
+            current = self._products([('Kemeja', 1.5, 4.5, 3, 'M', 'Men'), ('Jaket', 5.0, 3.9, 5, 'L', 'Unisex')])
+            current['price_eur'] = [0.1, 0.3]
+
+            self.assertTrue(save_to_postgres_bulk(current, delete_missing=False))
+
+            engine = get_engine()
+            result = pd.read_sql_query('SELECT * FROM products ORDER BY title', engine)
+            indexes = pd.read_sql_query("SELECT name FROM sqlite_master WHERE type = 'index'", engine)
+            engine.dispose()
+
+        self.assertEqual(result['title'].tolist(), ['Jaket', 'Kemeja'])
+        self.assertEqual(result['price'].tolist(), [5.0, 1.5])
+        self.assertEqual(result['price_eur'].tolist(), [0.3, 0.1])
+        self.assertIn('products_natural_key', indexes['name'].tolist())
+
+    @patch('utils.load.config')
+    def test_save_to_postgres_bulk_records_duplicate_keys(self, mock_config):
+        """Tes baris dengan kunci ganda di DataFrame: hanya baris terakhir dimuat, sisanya dicatat di metrik."""
+        metrics.enable()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.addCleanup(metrics.enable, False)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mock_config.DATABASE_URL = f"sqlite:///{os.path.join(tmp_dir, 'bulk.db')}"
+            mock_config.DB_TABLE_NAME = "products"
+            mock_config.DB_CHUNK_SIZE = 2
+            df = self._products([('Kemeja', 1.0, 4.5, 3, 'M', 'Men'), ('Rok', 2.0, 4.0, 2, 'S', 'Women'), ('Kemeja', 1.5, 4.5, 3, 'M', 'Men')])
+
+            with self.assertLogs('utils.load', level='WARNING'):
+                self.assertTrue(save_to_postgres_bulk(df))
+
+            engine = get_engine()
+            result = pd.read_sql_query('SELECT * FROM products ORDER BY title', engine)
+            engine.dispose()
+
+        self.assertEqual(result['price'].tolist(), [1.5, 2.0])
+        counters = {(c['name'], c['labels'].get('reason')): c['value'] for c in metrics.snapshot()['counters']}
+        self.assertEqual(counters[('load_rows_dropped', 'duplicate_key')], 1)
+
+    @patch('utils.load.config')
+    def test_save_to_postgres_bulk_many_chunks(self, mock_config):
+        """Tes bulk upsert pada 20.000 baris yang dialirkan dalam beberapa chunk (throughput diukur di benchmarks/)."""
+        rows = 20000
+        df = pd.DataFrame({
+            'title': [f'Produk {i}' for i in range(rows)],
+            'price': [float(i) for i in range(rows)],
+            'rating': [4.0] * rows,
+            'colors': [3] * rows,
+            'size': ['M'] * rows,
+            'gender': ['Men'] * rows,
+            'timestamp': pd.Timestamp('2024-01-01 10:00:00'),
+        })
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mock_config.DATABASE_URL = f"sqlite:///{os.path.join(tmp_dir, 'bulk.db')}"
+            mock_config.DB_TABLE_NAME = "products"
+            mock_config.DB_CHUNK_SIZE = 5000
+
+            self.assertTrue(save_to_postgres_bulk(df))
+
+            engine = get_engine()
+            count = pd.read_sql_query('SELECT COUNT(*) AS n FROM products', engine)['n'].item()
+            engine.dispose()
+
+        self.assertEqual(count, rows)
+
+    # --- Pengujian untuk Parquet ---
+    @patch('utils.load.config')
+    def test_save_to_parquet_appends_partitioned_runs(self, mock_config):
+        """Tes Parquet: run kedua menambah file (append-only), partisi terbentuk, dan pembacaan bisa difilter."""
+        df = self._products([('Kemeja', 1.0, 4.5, 3, 'M', 'Men'), ('Rok', 2.0, 4.0, 2, 'S', 'Women')])
+        df['timestamp'] = pd.Timestamp('2024-01-01 10:00:00')
+        df = df.astype({'size': 'category', 'gender': 'category', 'rating': 'float32'})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mock_config.PARQUET_OUTPUT_PATH = os.path.join(tmp_dir, "products_parquet")
+            mock_config.PARQUET_COMPRESSION = "zstd"
+            mock_config.PARQUET_PARTITION_COLS = "run_date,gender"
+            mock_config.PARQUET_WRITE_MODE = "append"
+
+            self.assertTrue(save_to_parquet(df))
+            self.assertTrue(save_to_parquet(df))
+
+            partitions = os.listdir(os.path.join(mock_config.PARQUET_OUTPUT_PATH, "run_date=2024-01-01"))
+            all_rows = read_parquet()
+            men_only = read_parquet(columns=['title', 'price'], filters=[('gender', '=', 'Men')])
+
+            self.assertTrue(save_to_parquet(df, overwrite=True))
+            after_overwrite = read_parquet()
+
+        self.assertEqual(sorted(partitions), ['gender=Men', 'gender=Women'])
+        self.assertEqual(len(all_rows), 4)
+        self.assertEqual(men_only['title'].tolist(), ['Kemeja', 'Kemeja'])
+        self.assertEqual(list(men_only.columns), ['title', 'price'])
+        self.assertEqual(len(after_overwrite), 2)
+
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
\ No newline at end of file
@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import utils.config as config
+import utils.metrics as metrics
+from utils.transform import transform_and_clean_data, transform_and_clean_data_fast
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        """Mengaktifkan instrumentasi dengan registry kosong untuk setiap tes."""
+        metrics.enable()
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.enable(False)
+        metrics.reset()
+
+    def _counter(self, name, **labels):
+        for counter in metrics.snapshot()["counters"]:
+            if counter["name"] == name and counter["labels"] == labels:
+                return counter["value"]
+        return 0
+
+    def test_disabled_metrics_record_nothing(self):
+        """Tes saat nonaktif: span memakai context manager kosong yang sama dan tidak ada metrik tercatat."""
+        metrics.enable(False)
+
+        self.assertIs(metrics.span("stage.extract"), metrics.span("stage.transform"))
+        with metrics.span("stage.extract"):
+            metrics.inc("pages_fetched")
+
+        report = metrics.snapshot()
+        self.assertEqual(report["counters"], [])
+        self.assertEqual(report["spans"], [])
+
+    def test_spans_and_counters_are_aggregated(self):
+        """Tes span mencatat jumlah/total/maksimum per label dan counter dijumlahkan."""
+        with metrics.span("load.sink", sink="csv"):
+            pass
+        with metrics.span("load.sink", sink="csv"):
+            pass
+        with self.assertRaises(ValueError):
+            with metrics.span("load.sink", sink="gsheet"):
+                raise ValueError("gagal")
+        metrics.inc("rows_loaded", 10, sink="csv")
+        metrics.inc("rows_loaded", 5, sink="csv")
+
+        spans = {item["labels"]["sink"]: item for item in metrics.snapshot()["spans"]}
+        self.assertEqual(spans["csv"]["count"], 2)
+        self.assertGreaterEqual(spans["csv"]["total_seconds"], spans["csv"]["max_seconds"])
+        self.assertEqual(self._counter("rows_loaded", sink="csv"), 15)
+        self.assertEqual(self._counter("span_errors", span="load.sink", sink="gsheet"), 1)
+
+    def test_exports_json_report_and_prometheus_textfile(self):
+        """Tes ekspor laporan JSON dan textfile Prometheus ke path yang dikonfigurasi."""
+        metrics.inc("pages_fetched", 3)
+        metrics.inc("transform_rows_dropped", 2, rule="invalid_title")
+        metrics.observe("extract.fetch", 0.25)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            report_path = os.path.join(tmp_dir, "report", "run.json")
+            prom_path = os.path.join(tmp_dir, "etl.prom")
+            with patch.object(config, "METRICS_REPORT_PATH", report_path), \
+                 patch.object(config, "METRICS_PROMETHEUS_PATH", prom_path):
+                metrics.export()
+
+            with open(report_path) as f:
+                report = json.load(f)
+            with open(prom_path) as f:
+                prom = f.read()
+
+        self.assertEqual(report["spans"][0]["name"], "extract.fetch")
+        self.assertIn("# TYPE etl_pages_fetched_total counter", prom)
+        self.assertIn("etl_pages_fetched_total 3", prom)
+        self.assertIn('etl_transform_rows_dropped_total{rule="invalid_title"} 2', prom)
+        self.assertIn('etl_span_seconds_sum{span="extract.fetch"} 0.25', prom)
+
+    @patch("utils.transform.logger")
+    def test_transform_counts_drops_per_rule(self, mock_logger):
+        """Tes jumlah baris yang dibuang per aturan sama pada jalur standar dan cepat."""
+        product = {"title": "Kemeja", "price": "$10.00", "rating": "Rating: ⭐ 4.5 / 5",
+                   "colors": "3 Colors", "size": "Size: M", "gender": "Gender: Men"}
+        raw_data = [
+            product,
+            product,
+            {**product, "title": "Unknown Product"},
+            {**product, "title": "Rok", "price": "Price Unavailable"},
+            {**product, "title": "Jaket", "rating": "Not Rated"},
+            {**product, "title": "Topi", "price": "$abc"},
+        ]
+        expected = {"invalid_title": 1, "invalid_price": 1, "invalid_rating": 1,
+                    "null_after_conversion": 1, "duplicate": 1}
+
+        for transform_fn in (transform_and_clean_data, transform_and_clean_data_fast):
+            with self.subTest(transform=transform_fn.__name__):
+                metrics.reset()
+                df = transform_fn(raw_data, run_timestamp=datetime(2024, 1, 1))
+
+                self.assertEqual(len(df), 1)
+                self.assertEqual(self._counter("transform_rows_in"), 6)
+                self.assertEqual({rule: self._counter("transform_rows_dropped", rule=rule) for rule in expected}, expected)
+
+    def test_json_formatter_includes_extra_fields(self):
+        """Tes log JSON memuat pesan, level, dan field tambahan dari `extra`."""
+        record = logging.LogRecord("utils.extract", logging.INFO, __file__, 1, "Scraping halaman: %s", ("/page2",), None)
+        record.page = 2
+
+        entry = json.loads(metrics.JsonFormatter().format(record))
+
+        self.assertEqual(entry["message"], "Scraping halaman: /page2")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["page"], 2)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
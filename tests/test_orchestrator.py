@@ -0,0 +1,154 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+import pandas as pd
+
+import utils.config as config
+from etl.pipeline import run_stages
+from utils.orchestrator import Sink, SinkResult, run_sinks, exit_code, build_default_sinks
+
+RAW_BATCHES = [
+    [{'title': 'Kemeja', 'price': '$10.00', 'rating': 'Rating: ⭐ 4.5 / 5', 'colors': '3 Colors', 'size': 'Size: M', 'gender': 'Gender: Men'}],
+    [{'title': 'Rok', 'price': '$20.00', 'rating': 'Rating: ⭐ 3.5 / 5', 'colors': '5 Colors', 'size': 'Size: L', 'gender': 'Gender: Women'}],
+]
+
+class TestOrchestrator(unittest.TestCase):
+
+    def setUp(self):
+        """Menyiapkan DataFrame sampel yang dibagikan ke semua sink."""
+        self.sample_df = pd.DataFrame({'title': ['Kemeja', 'Rok'], 'price': [1.0, 2.0]})
+
+    def test_sinks_run_concurrently(self):
+        """Tes sink berjalan bersamaan: total waktu mendekati sink terlama, bukan jumlah semuanya."""
+        def slow_sink(df):
+            time.sleep(0.3)
+            return True
+
+        start = time.perf_counter()
+        results = run_sinks(self.sample_df, [Sink('a', slow_sink, 5, 0), Sink('b', slow_sink, 5, 0), Sink('c', slow_sink, 5, 0)])
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual([result.rows for result in results], [2, 2, 2])
+        self.assertLess(elapsed, 0.8)
+
+    @patch.object(config, 'LOAD_RETRY_BACKOFF', 0)
+    def test_failures_are_retried_and_isolated(self):
+        """Tes isolasi: sink yang error tidak memengaruhi sink lain, dan sink yang gagal sekali dicoba ulang."""
+        calls = {'flaky': 0}
+        def flaky_sink(df):
+            calls['flaky'] += 1
+            return calls['flaky'] > 1
+        def broken_sink(df):
+            raise RuntimeError("koneksi ditolak")
+        def mutating_sink(df):
+            df['kolom_baru'] = 1
+            return True
+
+        results = run_sinks(self.sample_df, [
+            Sink('flaky', flaky_sink, 5, 2),
+            Sink('broken', broken_sink, 5, 1),
+            Sink('mutating', mutating_sink, 5, 0),
+        ])
+
+        flaky, broken, mutating = results
+        self.assertTrue(flaky.success)
+        self.assertEqual(flaky.attempts, 2)
+        self.assertFalse(broken.success)
+        self.assertEqual(broken.attempts, 2)
+        self.assertIn('koneksi ditolak', broken.error)
+        self.assertTrue(mutating.success)
+        # Perubahan kolom oleh satu sink tidak terlihat di DataFrame bersama
+        self.assertNotIn('kolom_baru', self.sample_df.columns)
+
+    def test_slow_sink_times_out_without_blocking_others(self):
+        """Tes timeout: sink yang macet dilaporkan gagal tanpa menahan sink lain."""
+        def stuck_sink(df):
+            time.sleep(1)
+            return True
+
+        start = time.perf_counter()
+        results = run_sinks(self.sample_df, [Sink('stuck', stuck_sink, 0.2, 0), Sink('fast', lambda df: True, 5, 0)])
+
+        self.assertLess(time.perf_counter() - start, 0.8)
+        self.assertFalse(results[0].success)
+        self.assertIn('timeout', results[0].error)
+        self.assertTrue(results[1].success)
+
+    def test_timed_out_sink_runs_on_daemon_thread_and_is_not_restarted(self):
+        """Tes sink yang melewati timeout berjalan di daemon thread (tidak menahan exit) dan tidak ditulis ulang selama masih berjalan."""
+        release = threading.Event()
+        calls = []
+        def stuck_sink(df):
+            calls.append(threading.current_thread())
+            release.wait(5)
+            return True
+
+        first = run_sinks(self.sample_df, [Sink('macet', stuck_sink, 0.1, 0)])
+        second = run_sinks(self.sample_df, [Sink('macet', stuck_sink, 0.1, 0)])
+        release.set()
+        calls[0].join(5)
+        third = run_sinks(self.sample_df, [Sink('macet', stuck_sink, 5, 0)])
+
+        self.assertTrue(calls[0].daemon)
+        self.assertIn('timeout', first[0].error)
+        self.assertFalse(second[0].success)
+        self.assertIn('masih berjalan', second[0].error)
+        self.assertTrue(third[0].success)
+        self.assertEqual(len(calls), 2)
+
+    @patch('etl.pipeline.logger')
+    @patch('utils.transform.logger')
+    @patch('utils.orchestrator.logger')
+    @patch('utils.load.logger')
+    def test_stream_pipeline_reports_sink_results_and_exit_code(self, mock_load_logger, mock_orchestrator_logger,
+                                                                mock_transform_logger, mock_pipeline_logger):
+        """Tes mode streaming: chunk dimuat lewat sink dengan exit code sesuai kebijakan, pengaturan yang tidak didukung kembali ke mode batch."""
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.multiple(config, PIPELINE_MODE='stream', LOAD_SINKS='csv,postgres', LOAD_FAILURE_POLICY='any',
+                               LOAD_MODE='full', DB_LOAD_METHOD='replace', LOAD_RETRY_BACKOFF=0,
+                               CSV_OUTPUT_PATH=os.path.join(tmp_dir, 'products.csv')), \
+                patch('utils.load.open_postgres_engine', return_value=None), \
+                patch('utils.extract.iter_product_batches', side_effect=lambda **kwargs: iter(RAW_BATCHES)), \
+                patch('utils.extract.scrape_all_products') as mock_scrape:
+            self.assertEqual(run_stages(), 1)
+            self.assertEqual(pd.read_csv(config.CSV_OUTPUT_PATH)['title'].tolist(), ['Kemeja', 'Rok'])
+            results = mock_orchestrator_logger.info.call_args[0][1]
+            self.assertIn('postgres  GAGAL', results)
+            mock_scrape.assert_not_called()
+
+            with patch.object(config, 'LOAD_SINKS', 'csv'):
+                self.assertEqual(run_stages(), 0)
+                mock_scrape.return_value = RAW_BATCHES[0] + RAW_BATCHES[1]
+                with patch.object(config, 'LOAD_MODE', 'incremental'), \
+                        patch.object(config, 'INCREMENTAL_STATE_PATH', os.path.join(tmp_dir, 'state.sqlite')):
+                    self.assertEqual(run_stages(), 0)
+            mock_scrape.assert_called_once()
+            self.assertIn('tidak mendukung', mock_pipeline_logger.warning.call_args[0][0])
+
+    def test_exit_code_policies(self):
+        """Tes kebijakan exit code untuk kombinasi hasil sukses dan gagal."""
+        ok = SinkResult('csv', True, 2, 10, 0.1, 1)
+        failed = SinkResult('gsheet', False, 0, None, 0.1, 2, 'error')
+
+        self.assertEqual(exit_code([ok, failed], 'any'), 1)
+        self.assertEqual(exit_code([ok, failed], 'all'), 0)
+        self.assertEqual(exit_code([failed, failed], 'all'), 1)
+        self.assertEqual(exit_code([ok, failed], 'never'), 0)
+        self.assertEqual(exit_code([ok], 'any'), 0)
+
+    @patch.object(config, 'PARQUET_OUTPUT_PATH', '')
+    @patch.object(config, 'LOAD_SINK_TIMEOUTS', 'gsheet=120')
+    @patch.object(config, 'LOAD_SINKS', 'csv,parquet,gsheet')
+    def test_build_default_sinks_from_config(self):
+        """Tes pembentukan sink dari config: Parquet tanpa path dilewati dan timeout per sink diterapkan."""
+        sinks = build_default_sinks()
+
+        self.assertEqual([sink.name for sink in sinks], ['csv', 'gsheet'])
+        self.assertEqual(sinks[1].timeout, 120)
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+import pandas as pd
+
+import utils.config as config
+import utils.rates as rates
+from utils.transform import transform_and_clean_data, transform_and_clean_data_fast
+
+RAW_PRODUCTS = [
+    {'title': 'Kemeja', 'price': '$10.00', 'rating': 'Rating: ⭐ 4.5 / 5', 'colors': '3 Colors', 'size': 'Size: M', 'gender': 'Gender: Men'},
+    {'title': 'Rok', 'price': '$20.00', 'rating': 'Rating: ⭐ 3.5 / 5', 'colors': '5 Colors', 'size': 'Size: L', 'gender': 'Gender: Women'},
+    {'title': 'Unknown Product', 'price': '$5.00', 'rating': 'Rating: ⭐ 4.0 / 5', 'colors': '2 Colors', 'size': 'Size: S', 'gender': 'Gender: Women'},
+]
+
+# Kurs berversi waktu: IDR berubah pada 1 Maret, EUR hanya punya satu versi
+RATE_ROWS = pd.DataFrame({
+    'effective_at': ['2024-01-01', '2024-03-01', '2024-01-01'],
+    'currency': ['IDR', 'IDR', 'EUR'],
+    'rate': [15500.0, 16200.0, 0.9],
+})
+
+@patch('utils.transform.logger')
+@patch('utils.rates.logger')
+class TestRates(unittest.TestCase):
+
+    def setUp(self):
+        """Menyiapkan direktori sementara dan cache kurs kosong untuk setiap tes."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rates.clear_cache()
+
+    def tearDown(self):
+        rates.clear_cache()
+        self.tmp_dir.cleanup()
+
+    @patch.object(config, 'EXCHANGE_RATES_STATIC', 'EUR=0.9,SGD=1.35')
+    @patch.object(config, 'EXTRA_CURRENCIES', 'eur,SGD')
+    def test_static_rates_add_extra_currency_columns(self, mock_rates_logger, mock_transform_logger):
+        """Tes provider statis: kolom price tetap IDR, mata uang tambahan menjadi kolom baru di kedua jalur transformasi."""
+        run_timestamp = datetime(2024, 1, 1, 10, 0, 0)
+
+        standard = transform_and_clean_data(RAW_PRODUCTS, run_timestamp=run_timestamp)
+        fast = transform_and_clean_data_fast(RAW_PRODUCTS, run_timestamp=run_timestamp)
+
+        expected_columns = ['title', 'price', 'rating', 'colors', 'size', 'gender', 'timestamp', 'price_eur', 'price_sgd']
+        for df in (standard, fast):
+            self.assertEqual(df.columns.tolist(), expected_columns)
+            self.assertEqual(df['price'].tolist(), [160000.0, 320000.0])
+            self.assertEqual(df['price_eur'].tolist(), [9.0, 18.0])
+            self.assertAlmostEqual(df.loc[1, 'price_sgd'], 27.0)
+
+    @patch.object(config, 'EXCHANGE_RATE_PROVIDER', 'file')
+    @patch.object(config, 'EXTRA_CURRENCIES', 'EUR')
+    def test_file_rates_are_joined_as_of_each_timestamp(self, mock_rates_logger, mock_transform_logger):
+        """Tes tabel kurs berversi: setiap timestamp memakai versi kurs terakhir yang sudah berlaku."""
+        rate_file = os.path.join(self.tmp_dir.name, 'rates.csv')
+        RATE_ROWS.to_csv(rate_file, index=False)
+        timestamps = pd.Series(pd.to_datetime(['2024-03-05', '2024-02-10', '2024-03-01', '2024-02-10']), index=[7, 3, 5, 1])
+
+        with patch.object(config, 'EXCHANGE_RATE_FILE', rate_file):
+            found = rates.rates_as_of(timestamps)
+            prices = rates.convert_prices(pd.Series([1.0, 2.0, 3.0, 4.0], index=[7, 3, 5, 1]), timestamps)
+
+            self.assertEqual(found['IDR'].tolist(), [16200.0, 15500.0, 16200.0, 15500.0])
+            self.assertEqual(found.index.tolist(), [7, 3, 5, 1])
+            self.assertEqual(prices['price'].tolist(), [16200.0, 31000.0, 48600.0, 62000.0])
+            self.assertEqual(prices['price_eur'].tolist(), [0.9, 1.8, 2.7, 3.6])
+            with self.assertRaises(ValueError):
+                rates.rates_as_of(datetime(2023, 12, 31))
+            with self.assertRaises(ValueError):
+                rates.rates_as_of(datetime(2024, 3, 1), currencies=['JPY'])
+
+    @patch.object(config, 'EXCHANGE_RATE_PROVIDER', 'sqlite')
+    def test_sqlite_rates_reprice_by_run_timestamp_with_ttl_cache(self, mock_rates_logger, mock_transform_logger):
+        """Tes provider SQLite: data lama dihitung dengan kurs saat itu, dan tabel kurs hanya dibaca ulang setelah TTL habis."""
+        db_path = os.path.join(self.tmp_dir.name, 'rates', 'rates.sqlite')
+        with patch.object(config, 'EXCHANGE_RATE_DB_PATH', db_path):
+            rates.SqliteRateProvider().store(RATE_ROWS)
+
+            with patch.object(rates.SqliteRateProvider, 'load', autospec=True, side_effect=rates.SqliteRateProvider.load) as mock_load, \
+                    patch('utils.rates.time.monotonic', side_effect=[0, 10, config.EXCHANGE_RATE_CACHE_TTL + 1]):
+                january = transform_and_clean_data(RAW_PRODUCTS, run_timestamp=datetime(2024, 1, 15))
+                march = transform_and_clean_data_fast(RAW_PRODUCTS, run_timestamp=datetime(2024, 3, 15))
+                self.assertEqual(mock_load.call_count, 1)
+                rates.rate_table()
+                self.assertEqual(mock_load.call_count, 2)
+
+        self.assertEqual(january['price'].tolist(), [155000.0, 310000.0])
+        self.assertEqual(march['price'].tolist(), [162000.0, 324000.0])
+
+    @patch.object(config, 'PRICE_CURRENCY', 'USD')
+    @patch.object(config, 'EXTRA_CURRENCIES', 'IDR,usd')
+    def test_source_currency_usd_has_implicit_rate(self, mock_rates_logger, mock_transform_logger):
+        """Tes USD sebagai PRICE_CURRENCY atau mata uang tambahan memakai kurs 1.0 tanpa perlu ada di provider."""
+        run_timestamp = datetime(2024, 1, 1, 10, 0, 0)
+
+        for transform in (transform_and_clean_data, transform_and_clean_data_fast):
+            df = transform(RAW_PRODUCTS, run_timestamp=run_timestamp)
+            self.assertEqual(df['price'].tolist(), [10.0, 20.0])
+            self.assertEqual(df['price_idr'].tolist(), [160000.0, 320000.0])
+
+        with patch.object(config, 'EXCHANGE_RATE_PROVIDER', 'file'), \
+                patch.object(config, 'EXCHANGE_RATE_FILE', os.path.join(self.tmp_dir.name, 'tidak-ada.csv')):
+            # Provider tidak dibaca sama sekali jika hanya USD yang diminta
+            self.assertEqual(rates.rates_as_of(datetime(1990, 1, 1), currencies=['USD'])['USD'].tolist(), [1.0])
+
+    def test_unknown_provider_is_rejected(self, mock_rates_logger, mock_transform_logger):
+        """Tes nama provider kurs yang tidak dikenal menghasilkan ValueError."""
+        with self.assertRaises(ValueError):
+            rates.get_provider('api')
+
+    def test_provider_without_load_cannot_be_created(self, mock_rates_logger, mock_transform_logger):
+        """Tes RateProvider abstrak: subclass tanpa load() gagal dibuat, bukan gagal saat kurs dibaca."""
+        class IncompleteProvider(rates.RateProvider):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            IncompleteProvider()
+        with self.assertRaises(TypeError):
+            rates.RateProvider()
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,176 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+import pandas as pd
+
+import utils.config as config
+import utils.extract as extract
+import utils.load as load
+import utils.transform as transform
+from etl.cli import main
+from etl.pipeline import run_stages
+from etl.scheduler import RunLock, next_cron_time, next_run_time, parse_cron, run_daemon
+
+RAW_PRODUCTS = [
+    {'title': 'Kemeja', 'price': '$10.00', 'rating': 'Rating: ⭐ 4.5 / 5', 'colors': '3 Colors', 'size': 'Size: M', 'gender': 'Gender: Men'},
+    {'title': 'Rok', 'price': '$20.00', 'rating': 'Rating: ⭐ 3.5 / 5', 'colors': '5 Colors', 'size': 'Size: L', 'gender': 'Gender: Women'},
+]
+
+@patch('etl.scheduler.logger')
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        """Menyimpan nilai config (CLI menimpanya) dan mengarahkan lock, state, serta output ke direktori sementara."""
+        self.saved_config = {name: value for name, value in vars(config).items() if name.isupper()}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lock_path = os.path.join(self.tmp_dir.name, 'etl.lock')
+        self.csv_path = os.path.join(self.tmp_dir.name, 'products.csv')
+        config.SCHEDULER_LOCK_PATH = self.lock_path
+        config.SCHEDULE_INTERVAL = 0
+        config.SCHEDULE_CRON = ''
+        config.CSV_OUTPUT_PATH = self.csv_path
+        config.LOAD_SINKS = 'csv'
+        config.INCREMENTAL_STATE_PATH = os.path.join(self.tmp_dir.name, 'state.sqlite')
+
+    def tearDown(self):
+        for name, value in self.saved_config.items():
+            setattr(config, name, value)
+        self.tmp_dir.cleanup()
+
+    def test_cron_expression_finds_next_matching_minute(self, mock_logger):
+        """Tes ekspresi cron: langkah, rentang hari kerja, dan aturan OR saat tanggal dan hari sama-sama dibatasi."""
+        self.assertEqual(next_cron_time(parse_cron('*/15 * * * *'), datetime(2024, 1, 5, 10, 7, 30)), datetime(2024, 1, 5, 10, 15))
+        # Jumat 07:00 -> Senin 06:00 berikutnya
+        self.assertEqual(next_cron_time(parse_cron('0 6 * * 1-5'), datetime(2024, 1, 5, 7, 0)), datetime(2024, 1, 8, 6, 0))
+        # Tanggal 15 atau hari Minggu, mana yang lebih dulu (7 Januari 2024 hari Minggu)
+        self.assertEqual(next_cron_time(parse_cron('30 2 15 * 7'), datetime(2024, 1, 2)), datetime(2024, 1, 7, 2, 30))
+        self.assertEqual(next_cron_time(parse_cron('0 0 1 3 *'), datetime(2024, 3, 1, 0, 0)), datetime(2025, 3, 1, 0, 0))
+        for expression in ('* * * *', '60 * * * *', '*/0 * * * *', 'a * * * *'):
+            with self.assertRaises(ValueError):
+                parse_cron(expression)
+
+    def test_interval_schedule_does_not_pile_up_missed_runs(self, mock_logger):
+        """Tes run yang lebih lama dari intervalnya langsung diikuti satu run, bukan antrean run yang terlewat."""
+        config.SCHEDULE_INTERVAL = 600
+        start = datetime(2024, 1, 1, 10, 0)
+
+        self.assertEqual(next_run_time(start, datetime(2024, 1, 1, 10, 2)), datetime(2024, 1, 1, 10, 10))
+        self.assertEqual(next_run_time(start, datetime(2024, 1, 1, 10, 25)), datetime(2024, 1, 1, 10, 25))
+
+    def _hold_lock_in_other_process(self):
+        """Menjalankan proses lain yang memegang flock pada lock file sampai stdin-nya ditutup."""
+        script = (
+            'import fcntl, os, sys\n'
+            f'fd = os.open({self.lock_path!r}, os.O_RDWR | os.O_CREAT)\n'
+            'fcntl.flock(fd, fcntl.LOCK_EX)\n'
+            'os.write(fd, str(os.getpid()).encode())\n'
+            'print("siap", flush=True)\n'
+            'sys.stdin.read()\n'
+        )
+        holder = subprocess.Popen([sys.executable, '-c', script], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.assertEqual(holder.stdout.readline().strip(), 'siap')
+        self.addCleanup(holder.wait)
+        self.addCleanup(holder.stdin.close)
+        return holder
+
+    def test_lock_blocks_other_holder_and_ignores_leftover_file(self, mock_logger):
+        """Tes flock: pemegang lain memblokir run, sedangkan file lock sisa proses yang sudah berhenti tidak menghalangi."""
+        first, second = RunLock(), RunLock()
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.assertEqual(second.holder(), os.getpid())
+        first.release()
+        # File lock tetap ada (tidak dihapus), tetapi lock-nya sudah lepas
+        self.assertTrue(os.path.exists(self.lock_path))
+
+        finished = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True, check=True)
+        with open(self.lock_path, 'w') as f:
+            f.write(finished.stdout.strip())
+        self.assertTrue(second.acquire())
+        self.assertEqual(second.holder(), os.getpid())
+        second.release()
+
+    def test_daemon_reuses_warm_resources_and_survives_failed_run(self, mock_logger):
+        """Tes daemon: session HTTP dan client dipakai ulang antar run, run yang gagal tidak menghentikan jadwal."""
+        seen = []
+
+        def run_once():
+            seen.append((extract._shared_session, load._reuse_clients, os.path.exists(self.lock_path)))
+            if len(seen) == 1:
+                raise RuntimeError('koneksi terputus')
+            return 0
+
+        exit_code = run_daemon(run_once, max_runs=3)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(len(seen), 3)
+        self.assertIsNotNone(seen[0][0])
+        self.assertTrue(all(session is seen[0][0] and reuse and locked for session, reuse, locked in seen))
+        self.assertIsNone(extract._shared_session)
+        self.assertFalse(load._reuse_clients)
+        lock = RunLock()
+        self.assertTrue(lock.acquire())
+        lock.release()
+
+    def test_run_is_skipped_while_another_process_holds_lock(self, mock_logger):
+        """Tes run terjadwal dilewati, dan run manual dibatalkan, selama lock dipegang proses lain."""
+        holder = self._hold_lock_in_other_process()
+
+        exit_code = run_daemon(lambda: self.fail('run tidak boleh berjalan'), max_runs=2)
+        with patch('utils.metrics.configure_logging'), patch('utils.extract.scrape_all_products') as mock_scrape:
+            cli_exit_code = main(['run', '--sinks', 'csv', '--lock', self.lock_path])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(cli_exit_code, 1)
+        mock_scrape.assert_not_called()
+        self.assertIn(holder.pid, mock_logger.warning.call_args[0])
+        self.assertEqual(RunLock().holder(), holder.pid)
+
+    @patch('etl.pipeline.logger')
+    @patch('utils.transform.logger')
+    @patch('utils.orchestrator.logger')
+    def test_unchanged_catalogue_skips_transform_and_load(self, mock_orchestrator_logger, mock_transform_logger, mock_pipeline_logger, mock_logger):
+        """Tes load dilewati jika hash katalog sama dengan load terakhir yang berhasil, termasuk jika urutan produk berubah,
+        tetapi tidak jika kurs atau config transformasi berubah."""
+        changed = RAW_PRODUCTS + [{**RAW_PRODUCTS[0], 'title': 'Jaket'}]
+        catalogues = [RAW_PRODUCTS, RAW_PRODUCTS[::-1], changed, changed, changed, changed]
+        settings = [{}, {}, {}, {'EXCHANGE_RATE_USD_TO_IDR': 17000.0}, {'EXTRA_CURRENCIES': 'EUR', 'EXCHANGE_RATES_STATIC': 'EUR=0.9'}, {}]
+        exit_codes = []
+        with patch('utils.extract.scrape_all_products', side_effect=catalogues), \
+                patch('utils.transform.run_transform', wraps=transform.run_transform) as mock_transform:
+            for overrides in settings:
+                for name, value in overrides.items():
+                    setattr(config, name, value)
+                exit_codes.append(run_stages(skip_unchanged=True))
+
+        self.assertEqual(exit_codes, [0] * 6)
+        self.assertEqual(mock_transform.call_count, 4)
+        loaded = pd.read_csv(self.csv_path)
+        self.assertEqual(loaded['title'].tolist(), ['Kemeja', 'Rok', 'Jaket'])
+        self.assertEqual(loaded['price'].tolist(), [170000.0, 340000.0, 170000.0])
+        self.assertIn('price_eur', loaded.columns)
+
+    @patch('utils.metrics.configure_logging')
+    @patch('etl.pipeline.logger')
+    @patch('utils.transform.logger')
+    @patch('utils.orchestrator.logger')
+    def test_schedule_command_runs_pipeline(self, mock_orchestrator_logger, mock_transform_logger, mock_pipeline_logger,
+                                            mock_logging, mock_logger):
+        """Tes `python -m etl schedule` menjalankan pipeline penuh sesuai opsi dan berhenti setelah --max-runs."""
+        lock_path = os.path.join(self.tmp_dir.name, 'lain', 'etl.lock')
+        with patch('utils.extract.scrape_all_products', return_value=RAW_PRODUCTS) as mock_scrape:
+            exit_code = main(['schedule', '--sinks', 'csv', '--interval', '0.01', '--max-runs', '2', '--lock', lock_path])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(mock_scrape.call_count, 2)
+        self.assertEqual(config.SCHEDULER_LOCK_PATH, lock_path)
+        self.assertEqual(pd.read_csv(self.csv_path)['title'].tolist(), ['Kemeja', 'Rok'])
+        with self.assertRaises(SystemExit), patch('sys.stderr'):
+            main(['schedule', '--cron', '* * *'])
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
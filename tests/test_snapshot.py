@@ -0,0 +1,143 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+import pandas as pd
+import requests_mock
+
+import utils.config as config
+from etl.pipeline import transform_snapshot
+from utils.extract import iter_page_products, scrape_all_products
+from utils.snapshot import open_snapshot_store
+from utils.transform import transform_and_clean_data
+
+BASE_URL = 'https://fashion-studio.dicoding.dev'
+CARD = (
+    '<div class="collection-card"><h3 class="product-title">{title}</h3>'
+    '<div class="price-container"><span class="price">$10.00</span></div>'
+    '<p>Rating: ⭐ 4.5 / 5</p><p>3 Colors</p><p>Size: M</p><p>Gender: Men</p></div>'
+)
+
+def product(title: str) -> dict:
+    return {'title': title, 'price': '$10.00', 'rating': 'Rating: ⭐ 4.5 / 5',
+            'colors': '3 Colors', 'size': 'Size: M', 'gender': 'Gender: Men'}
+
+@patch.object(config, 'RAW_SNAPSHOT_BATCH_ROWS', 4)
+@patch('utils.snapshot.logger')
+class TestRawSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        """Menyiapkan direktori snapshot sementara."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir_patch = patch.object(config, 'RAW_SNAPSHOT_DIR', self.tmp_dir.name)
+        self.dir_patch.start()
+
+    def tearDown(self):
+        self.dir_patch.stop()
+        self.tmp_dir.cleanup()
+
+    def test_write_and_read_back_in_batches(self, mock_logger):
+        """Tes snapshot ditulis per record batch terkompresi dan dibaca ulang per batch lewat memory-map."""
+        store = open_snapshot_store()
+        with store.open_writer('run-1') as writer:
+            writer.write([product(f'Kemeja {i}') for i in range(3)], page=1)
+            writer.write([product(f'Rok {i}') for i in range(3)], page=2)
+            writer.write([product(f'Jaket {i}') for i in range(2)], page=3)
+
+        # Batch penuh (>= 4 baris) ditulis setelah halaman 2, sisanya saat writer ditutup
+        run = store.resolve('latest')
+        self.assertEqual((run.run_id, run.status, run.rows, run.batches), ('run-1', 'complete', 8, 2))
+
+        batches = list(store.iter_batches('run-1', batch_rows=4))
+        self.assertEqual([len(batch) for batch in batches], [4, 2, 2])
+        self.assertEqual(batches[0][0], product('Kemeja 0'))
+        self.assertEqual(store.read_table('run-1').column('source_page').to_pylist(), [1] * 3 + [2] * 3 + [3] * 2)
+        store.close()
+
+    def test_interrupted_run_is_partial_and_not_latest(self, mock_logger):
+        """Tes run yang berhenti di tengah ditandai partial, tetap terbaca, dan tidak dipakai sebagai 'latest'."""
+        store = open_snapshot_store()
+        with store.open_writer('run-lengkap') as writer:
+            writer.write([product('Kemeja')], page=1)
+        with self.assertRaises(RuntimeError):
+            with store.open_writer('run-terputus') as writer:
+                writer.write([product('Rok')] * 5, page=1)
+                raise RuntimeError('koneksi terputus')
+
+        self.assertEqual(store.resolve('run-terputus').status, 'partial')
+        self.assertEqual(sum(len(batch) for batch in store.iter_batches('run-terputus')), 5)
+        self.assertEqual(store.resolve().run_id, 'run-lengkap')
+        with self.assertRaises(ValueError):
+            store.resolve('tidak-ada')
+        store.close()
+
+    @patch.object(config, 'PAGE_COUNT', 3)
+    @patch.object(config, 'RAW_SNAPSHOT_ENABLED', True)
+    @patch('utils.extract.logger')
+    def test_scrape_records_snapshot_with_source_page(self, mock_extract_logger, mock_logger):
+        """Tes scraping menulis data mentah ke snapshot beserta nomor halaman asalnya."""
+        with requests_mock.Mocker() as m:
+            m.get(BASE_URL, text=CARD.format(title='Kemeja'))
+            m.get(f'{BASE_URL}/page2', text=CARD.format(title='Rok') * 2)
+            m.get(f'{BASE_URL}/page3', text=CARD.format(title='Jaket'))
+            raw = scrape_all_products(mode='sequential')
+
+        store = open_snapshot_store()
+        table = store.read_table()
+        self.assertEqual(table.column('title').to_pylist(), [p['title'] for p in raw])
+        self.assertEqual(table.column('source_page').to_pylist(), [1, 2, 2, 3])
+        store.close()
+
+    @patch.object(config, 'PAGE_COUNT', 3)
+    @patch.object(config, 'RAW_SNAPSHOT_ENABLED', True)
+    @patch('utils.extract.logger')
+    def test_consumer_stopping_early_marks_snapshot_partial(self, mock_extract_logger, mock_logger):
+        """Tes snapshot ditandai partial jika pemakai berhenti membaca halaman sebelum selesai."""
+        with requests_mock.Mocker() as m:
+            m.get(requests_mock.ANY, text=CARD.format(title='Kemeja'))
+            pages = iter_page_products(mode='sequential')
+            next(pages)
+            pages.close()
+
+        store = open_snapshot_store()
+        self.assertEqual([(run.status, run.rows) for run in store.runs()], [('partial', 1)])
+        store.close()
+
+    @patch('utils.transform.logger')
+    @patch('etl.pipeline.logger')
+    def test_transform_replay_matches_in_memory_transform(self, mock_pipeline_logger, mock_transform_logger, mock_logger):
+        """Tes transformasi ulang snapshot per batch sama dengan transformasi data mentah sekaligus, termasuk halaman asal."""
+        pages = {page: [product(f'Kemeja {i}') for i in range(3)] + [product('Unknown Product')] for page in (1, 2)}
+        raw = [{**item, 'source_page': page} for page, items in pages.items() for item in items]
+        run_timestamp = datetime(2024, 1, 1)
+        store = open_snapshot_store()
+        with patch('utils.snapshot.time.time', return_value=run_timestamp.timestamp()):
+            with store.open_writer() as writer:
+                for page, items in pages.items():
+                    writer.write(items, page=page)
+        store.close()
+
+        # Timestamp hasil mengikuti waktu run snapshot dibuat, bukan waktu transformasi ulang
+        replayed = transform_snapshot('latest')
+        expected = transform_and_clean_data(raw, run_timestamp=run_timestamp)
+
+        pd.testing.assert_frame_equal(replayed, expected.reset_index(drop=True))
+
+    @patch.object(config, 'RAW_SNAPSHOT_KEEP_RUNS', 2)
+    def test_prune_keeps_latest_runs(self, mock_logger):
+        """Tes hanya RAW_SNAPSHOT_KEEP_RUNS run terbaru yang disimpan."""
+        store = open_snapshot_store()
+        for run_id in ('run-1', 'run-2', 'run-3'):
+            with store.open_writer(run_id) as writer:
+                writer.write([product('Kemeja')], page=1)
+
+        removed = store.prune()
+
+        self.assertEqual(removed, ['run-1'])
+        self.assertEqual([run.run_id for run in store.runs()], ['run-3', 'run-2'])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir.name, 'run-1.arrow')))
+        store.close()
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -1,6 +1,7 @@
 import unittest
 import pandas as pd
-from utils.transform import transform_and_clean_data
+from datetime import datetime
+from utils.transform import transform_and_clean_data, transform_batches, transform_and_clean_data_fast
 
 class TestTransform(unittest.TestCase):
 
@@ -39,5 +40,61 @@ class TestTransform(unittest.TestCase):
         # 5. Pastikan kolom timestamp ada
         self.assertIn('timestamp', cleaned_df.columns)
 
+    def test_transform_batches_drops_duplicates_across_batches(self):
+        """Tes transformasi streaming: duplikat antar batch dibuang dan timestamp seragam."""
+        row_a = {'title': 'Kemeja', 'price': '$10.00', 'rating': 'Rating: ⭐ 4.0 / 5', 'colors': '3 Colors', 'size': 'Size: M', 'gender': 'Gender: Men'}
+        row_b = {'title': 'Rok', 'price': '$12.00', 'rating': 'Rating: ⭐ 4.2 / 5', 'colors': '2 Colors', 'size': 'Size: S', 'gender': 'Gender: Women'}
+        invalid = {'title': 'Unknown Product', 'price': '$1.00', 'rating': 'Not Rated', 'colors': '1 Color', 'size': 'Size: S', 'gender': 'Gender: Men'}
+
+        chunks = list(transform_batches([[row_a], [row_a, row_b], [invalid]]))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [1, 1])
+        self.assertEqual(chunks[1].loc[0, 'title'], 'Rok')
+        self.assertEqual(chunks[0].loc[0, 'timestamp'], chunks[1].loc[0, 'timestamp'])
+
+    def test_fast_transform_matches_standard_transform(self):
+        """Tes jalur cepat: hasil sama dengan jalur standar (rating persis sama), hanya tipe data size/gender/colors lebih ringkas."""
+        raw_data = [
+            {'title': 'T-shirt Bagus', 'price': '$15.00', 'rating': 'Rating: ⭐ 4.5 / 5', 'colors': '3 Colors', 'size': 'Size: L', 'gender': 'Gender: Men'},
+            {'title': 'T-shirt Bagus', 'price': '$15.00', 'rating': 'Rating: ⭐ 4.5 / 5', 'colors': '3 Colors', 'size': 'Size: L', 'gender': 'Gender: Men'},
+            {'title': 'T-shirt Bagus', 'price': '$15.0', 'rating': 'Rating: ⭐ 4.5 / 5', 'colors': '3 Colors', 'size': 'Size: L ', 'gender': 'Gender: Men'},
+            {'title': 'Unknown Product', 'price': '$10.00', 'rating': 'Rating: ⭐ 4.0 / 5', 'colors': '1 Color', 'size': 'Size: S', 'gender': 'Gender: Unisex'},
+            {'title': 'Celana Mahal', 'price': 'Price Unavailable', 'rating': 'Not Rated', 'colors': '2 Colors', 'size': 'Size: M', 'gender': 'Gender: Women'},
+            {'title': 'Topi', 'price': 'gratis', 'rating': 'Rating: ⭐ 4.1 / 5', 'colors': '1 Color', 'size': 'Size: M', 'gender': 'Gender: Men'},
+            {'title': 'Jaket Keren', 'price': '$2,000.00', 'rating': 'Rating: ⭐ 3.9 / 5', 'colors': '5 Colors', 'size': 'Size: XL', 'gender': 'Gender: Unisex'},
+        ]
+        run_timestamp = datetime(2024, 1, 1, 10, 0, 0)
+
+        expected = transform_and_clean_data(raw_data, run_timestamp=run_timestamp)
+        fast = transform_and_clean_data_fast(raw_data, run_timestamp=run_timestamp)
+
+        # Tipe data ringkas
+        self.assertEqual(str(fast['size'].dtype), 'category')
+        self.assertEqual(str(fast['gender'].dtype), 'category')
+        self.assertEqual(str(fast['rating'].dtype), 'float64')
+        self.assertEqual(str(fast['colors'].dtype), 'int16')
+
+        # Nilai sama dengan jalur standar setelah tipe data disamakan
+        normalized = fast.astype({'colors': 'int64', 'size': 'object', 'gender': 'object'})
+        pd.testing.assert_frame_equal(normalized, expected)
+        self.assertEqual(len(fast), 2)
+
+    def test_source_page_is_kept_but_ignored_for_duplicates(self):
+        """Tes kolom source_page ikut dibawa kedua jalur, tetapi produk sama dari halaman lain tetap dianggap duplikat."""
+        row = {'title': 'Kemeja', 'price': '$10.00', 'rating': 'Rating: ⭐ 4.0 / 5', 'colors': '3 Colors', 'size': 'Size: M', 'gender': 'Gender: Men'}
+        other = {**row, 'title': 'Rok'}
+        invalid = {**row, 'title': 'Unknown Product'}
+        raw_data = [{**row, 'source_page': 1}, {**invalid, 'source_page': 1}, {**row, 'source_page': 2}, {**other, 'source_page': 3}]
+        run_timestamp = datetime(2024, 1, 1, 10, 0, 0)
+
+        for transform in (transform_and_clean_data, transform_and_clean_data_fast):
+            cleaned = transform(raw_data, run_timestamp=run_timestamp)
+            self.assertEqual(cleaned['title'].tolist(), ['Kemeja', 'Rok'])
+            self.assertEqual(cleaned['source_page'].tolist(), [1, 3])
+            self.assertEqual(str(cleaned['source_page'].dtype), 'Int32')
+
+        chunks = list(transform_batches([[raw_data[0]], [raw_data[2], raw_data[3]]]))
+        self.assertEqual([chunk['title'].tolist() for chunk in chunks], [['Kemeja'], ['Rok']])
+
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
\ No newline at end of file
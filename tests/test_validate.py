@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+
+import utils.config as config
+import utils.metrics as metrics
+from etl.cli import main
+from utils.transform import transform_and_clean_data, transform_and_clean_data_fast
+from utils.validate import QUARANTINE_COLUMNS, Rule, run_validation, validate, write_quarantine
+
+def cleaned_products() -> pd.DataFrame:
+    """Data hasil transformasi dengan beberapa baris yang melanggar aturan kualitas data."""
+    return pd.DataFrame({
+        'title': ['Kemeja', 'Rok', 'Jaket', 'Topi', 'Celana'],
+        'price': [160000.0, 0.0, 320000.0, 999_000_000.0, 240000.0],
+        'rating': [4.5, 4.0, 7.5, 3.0, 4.1],
+        'colors': [3, 2, 0, 1, 5],
+        'size': ['M', 'S', 'XXXL', 'L', 'XL'],
+        'gender': ['Men', 'Women', 'Unisex', 'Robot', 'Men'],
+        'source_page': pd.array([1, 1, 2, 3, 3], dtype='Int32'),
+    })
+
+class TestValidate(unittest.TestCase):
+
+    def setUp(self):
+        """Mengaktifkan validasi dan metrik, serta menyiapkan file karantina sementara; nilai config disimpan karena CLI menimpanya."""
+        self.saved_config = {name: value for name, value in vars(config).items() if name.isupper()}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.quarantine_path = os.path.join(self.tmp_dir.name, 'karantina', 'quarantine.csv')
+        config.VALIDATION_ENABLED = True
+        config.VALIDATION_QUARANTINE_PATH = self.quarantine_path
+        config.SCHEDULER_LOCK_PATH = os.path.join(self.tmp_dir.name, 'etl.lock')
+        metrics.enable()
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.enable(False)
+        metrics.reset()
+        for name, value in self.saved_config.items():
+            setattr(config, name, value)
+        self.tmp_dir.cleanup()
+
+    def test_rules_are_counted_and_combined_per_row(self):
+        """Tes setiap aturan dihitung terpisah, dan baris karantina mencatat semua aturan yang dilanggar."""
+        result = validate(cleaned_products())
+
+        self.assertEqual(result.valid['title'].tolist(), ['Kemeja', 'Celana'])
+        self.assertEqual(result.counts, {
+            'price_range': 2, 'rating_range': 1, 'colors_positive': 1, 'allowed_size': 1, 'allowed_gender': 1,
+        })
+        self.assertEqual(result.quarantine['title'].tolist(), ['Rok', 'Jaket', 'Topi'])
+        self.assertEqual(result.quarantine['failed_rules'].tolist(), [
+            'price_range', 'rating_range,colors_positive,allowed_size', 'price_range,allowed_gender',
+        ])
+        self.assertEqual(result.quarantine['source_page'].tolist(), [1, 2, 3])
+
+    def test_custom_rules_and_missing_values(self):
+        """Tes aturan kustom: nilai kosong selalu melanggar, dan aturan untuk kolom yang tidak ada dilewati."""
+        df = pd.DataFrame({'price': [10.0, None, 50.0], 'size': pd.Categorical(['M', 'S', None])})
+        rules = [
+            Rule('price_cap', 'price', 'range', max=20),
+            Rule('only_m', 'size', 'allowed', allowed=('M',)),
+            Rule('rating_range', 'rating', 'range', min=0, max=5),
+        ]
+
+        result = validate(df, rules)
+
+        self.assertEqual(len(result.valid), 1)
+        self.assertEqual(result.counts, {'price_cap': 2, 'only_m': 2})
+        self.assertEqual(result.quarantine['failed_rules'].tolist(), ['price_cap,only_m', 'price_cap,only_m'])
+
+    @patch('utils.validate.logger')
+    def test_run_validation_appends_quarantine_and_records_metrics(self, mock_logger):
+        """Tes tahap validasi menulis karantina (header sekali) dan metrik per aturan, lalu membuang source_page."""
+        first = run_validation(cleaned_products())
+        run_validation(cleaned_products())
+
+        self.assertEqual(first['title'].tolist(), ['Kemeja', 'Celana'])
+        self.assertNotIn('source_page', first.columns)
+        quarantine = pd.read_csv(self.quarantine_path)
+        self.assertEqual(len(quarantine), 6)
+        self.assertEqual(quarantine['source_page'].tolist(), [1, 2, 3] * 2)
+
+        counters = {(c['name'], c['labels'].get('rule')): c['value'] for c in metrics.snapshot()['counters']}
+        self.assertEqual(counters[('validation_rows_checked', None)], 10)
+        self.assertEqual(counters[('validation_rows_rejected', 'price_range')], 4)
+        self.assertIn('Halaman asal terbanyak', mock_logger.warning.call_args[0][0] % mock_logger.warning.call_args[0][1:])
+
+    @patch('utils.transform.logger')
+    @patch('utils.validate.logger')
+    def test_transform_drops_are_quarantined_with_source_page(self, mock_logger, mock_transform_logger):
+        """Tes baris mentah yang dibuang transformasi ikut dikarantina dengan aturan dan halaman asalnya, di kedua jalur."""
+        base = {'rating': 'Rating: ⭐ 4.5 / 5', 'colors': '3 Colors', 'size': 'Size: M', 'gender': 'Gender: Men'}
+        raw = [
+            {'title': 'Kemeja', 'price': '$10.00', **base, 'source_page': 1},
+            {'title': 'Unknown Product', 'price': '$10.00', **base, 'source_page': 2},
+            {'title': 'Rok', 'price': 'Price Unavailable', **base, 'source_page': 3},
+            {'title': 'Topi', 'price': '$10.00', **base, 'rating': 'Not Rated', 'source_page': 4},
+            {'title': 'Jaket', 'price': '$abc', **base, 'source_page': 5},
+        ]
+
+        for transform in (transform_and_clean_data, transform_and_clean_data_fast):
+            cleaned = transform(raw)
+            self.assertEqual(cleaned['title'].tolist(), ['Kemeja'])
+
+        quarantine = pd.read_csv(self.quarantine_path)
+        self.assertEqual(quarantine.columns.tolist(), list(QUARANTINE_COLUMNS))
+        self.assertEqual(quarantine[['title', 'failed_rules', 'source_page']].values.tolist(), [
+            ['Unknown Product', 'invalid_title', 2], ['Rok', 'invalid_price', 3],
+            ['Topi', 'invalid_rating', 4], ['Jaket', 'null_after_conversion', 5],
+        ] * 2)
+        self.assertTrue(quarantine['timestamp'].notna().all())
+
+    @patch('utils.validate.logger')
+    def test_quarantine_file_with_other_header_is_rotated(self, mock_logger):
+        """Tes file karantina lama dengan header berbeda dipindahkan, sehingga baris baru tidak pernah salah kolom."""
+        os.makedirs(os.path.dirname(self.quarantine_path))
+        pd.DataFrame({'title': ['Lama'], 'price_eur': [1.0], 'failed_rules': ['price_range']}).to_csv(self.quarantine_path, index=False)
+
+        for _ in range(2):
+            self.assertTrue(write_quarantine(validate(cleaned_products()).quarantine.assign(price_eur=1.0)))
+
+        quarantine = pd.read_csv(self.quarantine_path)
+        self.assertEqual(quarantine.columns.tolist(), list(QUARANTINE_COLUMNS))
+        self.assertEqual(quarantine['title'].tolist(), ['Rok', 'Jaket', 'Topi'] * 2)
+        rotated = [name for name in os.listdir(os.path.dirname(self.quarantine_path)) if name != 'quarantine.csv']
+        self.assertEqual(len(rotated), 1)
+        self.assertEqual(pd.read_csv(os.path.join(os.path.dirname(self.quarantine_path), rotated[0]))['title'].tolist(), ['Lama'])
+
+    def test_disabled_validation_only_drops_source_page(self):
+        """Tes saat validasi nonaktif semua baris diteruskan tanpa karantina."""
+        config.VALIDATION_ENABLED = False
+
+        result = run_validation(cleaned_products())
+
+        self.assertEqual(len(result), 5)
+        self.assertNotIn('source_page', result.columns)
+        self.assertFalse(os.path.exists(self.quarantine_path))
+        self.assertEqual(metrics.snapshot()['counters'], [])
+
+    @patch('utils.validate.logger')
+    @patch('utils.metrics.configure_logging')
+    def test_cli_validate_quarantines_before_load(self, mock_logging, mock_logger):
+        """Tes `--validate` menjalankan tahap validasi sebelum load: hanya baris valid yang dimuat."""
+        config.VALIDATION_ENABLED = False
+        raw_path = os.path.join(self.tmp_dir.name, 'raw.json')
+        csv_path = os.path.join(self.tmp_dir.name, 'products.csv')
+        raw = [
+            {'title': 'Kemeja', 'price': '$10.00', 'rating': 'Rating: ⭐ 4.5 / 5', 'colors': '3 Colors', 'size': 'Size: M', 'gender': 'Gender: Men', 'source_page': 1},
+            {'title': 'Rok', 'price': '$20.00', 'rating': 'Rating: ⭐ 3.5 / 5', 'colors': '5 Colors', 'size': 'Size: XXXL', 'gender': 'Gender: Women', 'source_page': 2},
+        ]
+        with open(raw_path, 'w', encoding='utf-8') as f:
+            json.dump(raw, f)
+
+        config.CSV_OUTPUT_PATH = csv_path
+        with patch('etl.pipeline.logger'), patch('utils.transform.logger'):
+            exit_code = main(['run', '--stages', 'transform,load', '--raw', raw_path, '--sinks', 'csv', '--validate'])
+
+        self.assertEqual(exit_code, 0)
+        loaded = pd.read_csv(csv_path)
+        self.assertEqual(loaded['title'].tolist(), ['Kemeja'])
+        self.assertNotIn('source_page', loaded.columns)
+        quarantine = pd.read_csv(self.quarantine_path)
+        self.assertEqual(quarantine[['title', 'failed_rules', 'source_page']].values.tolist(), [['Rok', 'allowed_size', 2]])
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,197 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple, Optional, Dict
+
+import requests
+import utils.config as config
+import utils.metrics as metrics
+
+
+class CachedPage(NamedTuple):
+    """Satu entri cache: isi halaman beserta validator HTTP-nya."""
+    url: str
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    encoding: Optional[str]
+    fetched_at: float
+
+    @property
+    def text(self) -> str:
+        """Isi halaman dalam bentuk teks, di-decode dengan encoding dari response asli."""
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+
+class CacheMissError(requests.exceptions.RequestException):
+    """Dilempar pada mode replay ketika halaman yang diminta tidak ada di cache."""
+
+
+class PageCache:
+    """
+    Cache halaman HTTP persisten berbasis SQLite, dengan URL sebagai kunci.
+    Menyimpan ETag/Last-Modified untuk conditional request, memiliki TTL,
+    dan membuang entri yang paling lama tidak diakses (LRU) jika ukuran total melebihi batas.
+    """
+
+    def __init__(self, path: str, ttl: float, max_bytes: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Satu koneksi dipakai bersama oleh semua thread, dilindungi lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    encoding TEXT,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages(last_access)")
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Mengambil entri cache untuk URL (dan memperbarui waktu aksesnya), atau None jika tidak ada."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT url, body, etag, last_modified, encoding, fetched_at FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url))
+        return CachedPage(*row)
+
+    def is_fresh(self, entry: CachedPage) -> bool:
+        """Entri dianggap segar jika umurnya belum melewati TTL, sehingga tidak perlu request ulang."""
+        return time.time() - entry.fetched_at < self.ttl
+
+    def put(self, url: str, body: bytes, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, encoding: Optional[str] = None):
+        """Menyimpan atau mengganti entri cache untuk URL, lalu menjalankan eviction LRU."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, encoding, len(body), now, now),
+            )
+            self._evict()
+
+    def touch(self, url: str):
+        """Menandai entri masih valid (misalnya setelah respons 304) sehingga TTL dihitung ulang."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url)
+            )
+
+    def total_bytes(self) -> int:
+        """Ukuran total isi halaman yang tersimpan di cache."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def _evict(self):
+        """Menghapus entri yang paling lama tidak diakses hingga ukuran total di bawah batas."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT url, size FROM pages ORDER BY last_access ASC").fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+
+    def close(self):
+        """Menutup koneksi SQLite."""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedPage]) -> Dict[str, str]:
+        """Membangun header If-None-Match/If-Modified-Since dari validator entri cache."""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+
+# Instance cache bersama untuk satu proses, dibuat saat pertama kali dibutuhkan
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = threading.Lock()
+
+def get_page_cache() -> Optional[PageCache]:
+    """
+    Mengembalikan cache halaman bersama sesuai config.CACHE_MODE.
+    Mengembalikan None jika cache dimatikan ("off").
+    """
+    global _page_cache
+    if config.CACHE_MODE not in ("on", "replay"):
+        return None
+    with _page_cache_lock:
+        if _page_cache is None or _page_cache.path != config.CACHE_PATH:
+            _page_cache = PageCache(config.CACHE_PATH, config.CACHE_TTL, config.CACHE_MAX_BYTES)
+        return _page_cache
+
+def cached_get(session, url: str, cache: Optional[PageCache] = None, raw: bool = False):
+    """
+    Melakukan satu GET melalui cache halaman.
+    - Tanpa cache: request biasa.
+    - Mode replay: hanya membaca cache, CacheMissError jika halaman tidak ada.
+    - Entri masih dalam TTL: dikembalikan tanpa request jaringan.
+    - Selain itu: conditional request; respons 304 memakai isi dari cache, respons 200 disimpan ke cache.
+    Mengembalikan teks HTML, atau bytes mentah jika `raw` bernilai True.
+    """
+    if cache is None:
+        response = session.get(url, timeout=config.SCRAPE_TIMEOUT)
+        # Memunculkan error jika status code bukan 2xx
+        response.raise_for_status()
+        if metrics.is_enabled():
+            metrics.inc("bytes_downloaded", len(response.content))
+        return response.content if raw else response.text
+
+    entry = cache.get(url)
+    if config.CACHE_MODE == "replay":
+        if entry is None:
+            raise CacheMissError(f"Halaman {url} tidak ada di cache (mode replay)")
+        metrics.inc("page_cache", result="replay")
+        return entry.body if raw else entry.text
+
+    if entry is not None and cache.is_fresh(entry):
+        metrics.inc("page_cache", result="hit")
+        return entry.body if raw else entry.text
+
+    response = session.get(url, timeout=config.SCRAPE_TIMEOUT, headers=cache.conditional_headers(entry))
+    if response.status_code == 304 and entry is not None:
+        # Halaman tidak berubah sejak disimpan
+        cache.touch(url)
+        metrics.inc("page_cache", result="not_modified")
+        return entry.body if raw else entry.text
+
+    response.raise_for_status()
+    metrics.inc("page_cache", result="miss")
+    if metrics.is_enabled():
+        metrics.inc("bytes_downloaded", len(response.content))
+    cache.put(
+        url,
+        response.content,
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified'),
+        encoding=response.encoding,
+    )
+    return response.content if raw else response.text
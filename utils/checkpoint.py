@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+import utils.config as config
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointJournal:
+    """
+    Jurnal checkpoint scraping berbasis SQLite.
+    Setiap halaman yang selesai disimpan bersama produk hasil parsing-nya, dan setiap halaman
+    yang gagal dicatat beserta error-nya, sehingga run berikutnya dengan resume cukup
+    mengambil halaman yang belum selesai. Setiap halaman di-commit begitu selesai.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL: setiap commit cukup menambah log, dan data yang sudah di-commit tetap aman jika proses mati
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                page_num INTEGER PRIMARY KEY,
+                status TEXT NOT NULL,
+                products TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def reset(self, base_url: str):
+        """Mengosongkan jurnal dan memulai crawl baru untuk `base_url`."""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('base_url', ?)", (base_url,))
+            self._conn.commit()
+
+    def completed_pages(self) -> Set[int]:
+        """Nomor halaman yang sudah selesai di-scrape."""
+        with self._lock:
+            rows = self._conn.execute("SELECT page_num FROM pages WHERE status = 'done'").fetchall()
+        return {row[0] for row in rows}
+
+    def failed_pages(self) -> Dict[int, str]:
+        """Halaman yang gagal pada run terakhir beserta error-nya."""
+        with self._lock:
+            rows = self._conn.execute("SELECT page_num, error FROM pages WHERE status = 'failed'").fetchall()
+        return dict(rows)
+
+    def load_products(self, page_num: int) -> List[dict]:
+        """Produk hasil parsing yang tersimpan untuk halaman yang sudah selesai."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT products FROM pages WHERE page_num = ? AND status = 'done'", (page_num,)
+            ).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def mark_done(self, page_num: int, products: List[dict]):
+        """Mencatat halaman sebagai selesai beserta produknya."""
+        self._record(page_num, "done", json.dumps(products, ensure_ascii=False), None)
+
+    def mark_failed(self, page_num: int, error: str):
+        """Mencatat halaman sebagai gagal; halaman ini diambil ulang pada run resume."""
+        self._record(page_num, "failed", None, error)
+
+    def _record(self, page_num: int, status: str, products: Optional[str], error: Optional[str]):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO pages (page_num, status, products, attempts, error, updated_at)
+                VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT(page_num) DO UPDATE SET
+                    status = excluded.status,
+                    products = excluded.products,
+                    attempts = pages.attempts + 1,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+                """,
+                (page_num, status, products, error, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_journal(resume: bool = False, path: Optional[str] = None) -> CheckpointJournal:
+    """
+    Membuka jurnal checkpoint di `path` (default config.CHECKPOINT_PATH).
+    Tanpa `resume`, jurnal dikosongkan untuk crawl baru. Dengan `resume`, isi jurnal dipakai,
+    kecuali jurnal tersebut milik BASE_URL lain; dalam hal itu jurnal dikosongkan.
+    """
+    journal = CheckpointJournal(path or config.CHECKPOINT_PATH)
+    if resume and journal.get_meta("base_url") == config.BASE_URL:
+        done, failed = journal.completed_pages(), journal.failed_pages()
+        logger.info(
+            "Melanjutkan scraping dari checkpoint: %s halaman selesai, %s halaman gagal akan diambil ulang.",
+            len(done), len(failed),
+        )
+        return journal
+    if resume:
+        logger.warning("Checkpoint tidak ditemukan atau milik BASE_URL lain; scraping dimulai dari awal.")
+    journal.reset(config.BASE_URL)
+    return journal
@@ -13,6 +13,23 @@ PAGE_COUNT = int(os.getenv("PAGE_COUNT", 50))
 # --- Konfigurasi Konversi ---
 # Nilai tukar dari USD ke IDR
 EXCHANGE_RATE_USD_TO_IDR = float(os.getenv("EXCHANGE_RATE_USD_TO_IDR", 16000))
+# Sumber kurs: "static" (nilai dari config), "file" (tabel kurs CSV), atau "sqlite" (tabel kurs SQLite)
+EXCHANGE_RATE_PROVIDER = os.getenv("EXCHANGE_RATE_PROVIDER", "static")
+# Kurs tetap tambahan per 1 USD untuk provider "static", format "KODE=nilai,..." (misal "EUR=0.92,SGD=1.35")
+EXCHANGE_RATES_STATIC = os.getenv("EXCHANGE_RATES_STATIC", "")
+# Tabel kurs berversi waktu (kolom effective_at, currency, rate) untuk provider "file" dan "sqlite"
+EXCHANGE_RATE_FILE = os.getenv("EXCHANGE_RATE_FILE", "rates.csv")
+EXCHANGE_RATE_DB_PATH = os.getenv("EXCHANGE_RATE_DB_PATH", ".cache/rates.sqlite")
+# Umur (detik) tabel kurs di cache proses sebelum dibaca ulang dari sumbernya
+EXCHANGE_RATE_CACHE_TTL = float(os.getenv("EXCHANGE_RATE_CACHE_TTL", 3600))
+# Mata uang kolom price (USD berarti harga sumber tanpa konversi)
+PRICE_CURRENCY = os.getenv("PRICE_CURRENCY", "IDR")
+# Mata uang tambahan (dipisah koma), masing-masing menjadi kolom price_<kode>, misal "EUR,SGD" -> price_eur, price_sgd
+EXTRA_CURRENCIES = os.getenv("EXTRA_CURRENCIES", "")
+
+# --- Konfigurasi Transformasi ---
+# Jalur transformasi: "standard" (transform_and_clean_data) atau "fast" (vektorisasi + tipe data ringkas)
+TRANSFORM_MODE = os.getenv("TRANSFORM_MODE", "standard")
 
 # --- Konfigurasi Database PostgreSQL ---
 # Informasi untuk koneksi ke database
@@ -24,13 +41,152 @@ DB_NAME = os.getenv("DB_NAME")
 DB_TABLE_NAME = os.getenv("DB_TABLE_NAME", "products")
 # Membuat URL koneksi database yang akan digunakan oleh SQLAlchemy
 DATABASE_URL = f"postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Metode pemuatan ke PostgreSQL: "replace" (to_sql, ganti tabel) atau "upsert" (COPY ke staging + ON CONFLICT)
+DB_LOAD_METHOD = os.getenv("DB_LOAD_METHOD", "replace")
+# Jumlah baris per chunk saat mengalirkan data ke tabel staging
+DB_CHUNK_SIZE = int(os.getenv("DB_CHUNK_SIZE", 50000))
+# Ukuran connection pool engine PostgreSQL bersama
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
 
 # --- Konfigurasi Google Sheets ---
 # Path ke file kredensial JSON dari Google Service Account
 GSHEET_CREDENTIALS_PATH = os.getenv("GSHEET_CREDENTIALS_PATH")
 # URL lengkap dari Google Sheet tujuan
 GSHEET_URL = os.getenv("GSHEET_URL")
+# Metode penulisan: "replace" (kosongkan lalu tulis ulang) atau "diff" (hanya sel yang berubah)
+GSHEET_WRITE_METHOD = os.getenv("GSHEET_WRITE_METHOD", "replace")
+# Kuota request tulis per menit yang dipakai oleh throttle token bucket
+GSHEET_WRITE_QUOTA_PER_MINUTE = float(os.getenv("GSHEET_WRITE_QUOTA_PER_MINUTE", 60))
+# Jumlah request tulis yang boleh dikirim sekaligus tanpa menunggu; sisanya dari kuota dibagi rata sepanjang menit
+GSHEET_WRITE_BURST = float(os.getenv("GSHEET_WRITE_BURST", 5))
+# Jumlah sel maksimum per request batch_update
+GSHEET_BATCH_MAX_CELLS = int(os.getenv("GSHEET_BATCH_MAX_CELLS", 50000))
+# Kolom yang perubahannya saja tidak memicu penulisan baris (dipisah koma)
+GSHEET_DIFF_IGNORE_COLUMNS = os.getenv("GSHEET_DIFF_IGNORE_COLUMNS", "timestamp")
 
 # --- Konfigurasi Output ---
 # Path untuk menyimpan file CSV hasil proses ETL
-CSV_OUTPUT_PATH = os.getenv("CSV_OUTPUT_PATH", "products.csv")
\ No newline at end of file
+CSV_OUTPUT_PATH = os.getenv("CSV_OUTPUT_PATH", "products.csv")
+# Direktori dataset Parquet hasil proses ETL; kosongkan untuk menonaktifkan output Parquet
+PARQUET_OUTPUT_PATH = os.getenv("PARQUET_OUTPUT_PATH", "")
+# Kompresi file Parquet (misal "zstd", "snappy", "gzip")
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+# Kolom partisi, dipisah koma; "run_date" berarti tanggal dari kolom timestamp
+PARQUET_PARTITION_COLS = os.getenv("PARQUET_PARTITION_COLS", "run_date,gender")
+# Mode penulisan Parquet: "append" (tambah file baru tiap run) atau "overwrite" (ganti seluruh dataset)
+PARQUET_WRITE_MODE = os.getenv("PARQUET_WRITE_MODE", "append")
+
+# --- Konfigurasi Mesin Scraping ---
+# Mode pengambilan halaman: "sequential" (satu per satu) atau "threaded" (konkuren)
+SCRAPE_MODE = os.getenv("SCRAPE_MODE", "sequential")
+# Jumlah maksimum request yang berjalan bersamaan pada mode "threaded"
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", 8))
+# Batas laju request per host (request per detik), 0 berarti tanpa batas
+SCRAPE_RATE_LIMIT = float(os.getenv("SCRAPE_RATE_LIMIT", 10))
+# Jumlah percobaan ulang untuk setiap halaman yang gagal diambil
+SCRAPE_MAX_RETRIES = int(os.getenv("SCRAPE_MAX_RETRIES", 3))
+# Faktor dasar (detik) untuk exponential backoff antar percobaan ulang
+SCRAPE_BACKOFF_FACTOR = float(os.getenv("SCRAPE_BACKOFF_FACTOR", 0.5))
+# Timeout (detik) untuk setiap request HTTP
+SCRAPE_TIMEOUT = int(os.getenv("SCRAPE_TIMEOUT", 15))
+# Mode parsing HTML: "sequential" (di proses utama) atau "process" (ProcessPoolExecutor)
+PARSE_MODE = os.getenv("PARSE_MODE", "sequential")
+# Backend parser kartu produk: "bs4" (BeautifulSoup) atau "lxml" (XPath terkompilasi, lebih cepat)
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "bs4")
+# Jumlah proses worker untuk parsing pada mode "process"
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+
+# --- Konfigurasi Cache Halaman ---
+# Mode cache: "off" (tanpa cache), "on" (cache + conditional request), "replay" (hanya baca cache, tanpa jaringan)
+CACHE_MODE = os.getenv("CACHE_MODE", "off")
+# Path file SQLite untuk menyimpan cache halaman
+CACHE_PATH = os.getenv("CACHE_PATH", ".cache/pages.sqlite")
+# Umur maksimum (detik) entri cache sebelum divalidasi ulang ke server
+CACHE_TTL = float(os.getenv("CACHE_TTL", 3600))
+# Ukuran maksimum cache (byte); entri yang paling lama tidak diakses dibuang lebih dulu
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+# --- Konfigurasi Pipeline ---
+# Mode pipeline: "batch" (semua data sekaligus) atau "stream" (per batch halaman)
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "batch")
+# Jumlah halaman per batch pada mode "stream"
+STREAM_BATCH_PAGES = int(os.getenv("STREAM_BATCH_PAGES", 5))
+# Daftar tujuan pemuatan (dipisah koma): csv, parquet, gsheet, postgres
+LOAD_SINKS = os.getenv("LOAD_SINKS", "csv,parquet,gsheet,postgres")
+# Jumlah thread pemuatan; 0 berarti satu thread per tujuan (semua tujuan berjalan bersamaan)
+LOAD_CONCURRENCY = int(os.getenv("LOAD_CONCURRENCY", 0))
+# Batas waktu (detik, dihitung sejak tahap load dimulai) dan jumlah percobaan ulang default untuk setiap tujuan
+LOAD_SINK_TIMEOUT = float(os.getenv("LOAD_SINK_TIMEOUT", 300))
+LOAD_SINK_RETRIES = int(os.getenv("LOAD_SINK_RETRIES", 1))
+# Nilai khusus per tujuan, format "nama=nilai,..." (misal "gsheet=120,postgres=60")
+LOAD_SINK_TIMEOUTS = os.getenv("LOAD_SINK_TIMEOUTS", "")
+LOAD_SINK_RETRY_COUNTS = os.getenv("LOAD_SINK_RETRY_COUNTS", "")
+# Faktor dasar (detik) exponential backoff antar percobaan ulang pemuatan
+LOAD_RETRY_BACKOFF = float(os.getenv("LOAD_RETRY_BACKOFF", 2))
+# Kebijakan exit code: "any" (gagal jika ada tujuan gagal), "all" (gagal jika semua gagal), "never"
+LOAD_FAILURE_POLICY = os.getenv("LOAD_FAILURE_POLICY", "any")
+# Mode pemuatan: "full" (tulis ulang semua data) atau "incremental" (hanya insert/update/delete)
+LOAD_MODE = os.getenv("LOAD_MODE", "full")
+# Path file SQLite untuk menyimpan hash produk yang sudah dimuat per kombinasi LOAD_SINKS (mode "incremental")
+INCREMENTAL_STATE_PATH = os.getenv("INCREMENTAL_STATE_PATH", ".cache/incremental_state.sqlite")
+
+# --- Konfigurasi Observabilitas ---
+# Aktifkan pencatatan metrik (span waktu dan counter) per tahap, halaman, dan tujuan
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+# Path laporan run JSON; kosongkan untuk tidak menyimpan
+METRICS_REPORT_PATH = os.getenv("METRICS_REPORT_PATH", "metrics/run_report.json")
+# Path textfile Prometheus (misal direktori textfile collector node_exporter); kosongkan untuk tidak menyimpan
+METRICS_PROMETHEUS_PATH = os.getenv("METRICS_PROMETHEUS_PATH", "")
+# Level log (DEBUG, INFO, WARNING, ERROR) dan format log: "text" atau "json"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+# --- Konfigurasi Checkpoint Scraping ---
+# Catat setiap halaman yang selesai/gagal ke jurnal agar scraping bisa dilanjutkan dengan --resume
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "false").lower() in ("1", "true", "yes")
+# Path file SQLite jurnal checkpoint
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".cache/checkpoint.sqlite")
+# Jumlah putaran pengambilan ulang halaman yang gagal karena error sementara, setelah putaran utama
+PAGE_RETRY_ROUNDS = int(os.getenv("PAGE_RETRY_ROUNDS", 1))
+# Jeda (detik) sebelum setiap putaran pengambilan ulang
+PAGE_RETRY_DELAY = float(os.getenv("PAGE_RETRY_DELAY", 2))
+
+# --- Konfigurasi Paginasi ---
+# "fixed" memakai PAGE_COUNT; "discover" membaca kontrol paginasi atau melakukan probe untuk mencari halaman terakhir
+PAGINATION_MODE = os.getenv("PAGINATION_MODE", "fixed")
+# Batas atas nomor halaman saat probe pada mode "discover"
+PAGINATION_MAX_PAGES = int(os.getenv("PAGINATION_MAX_PAGES", 10000))
+
+# --- Konfigurasi Snapshot Data Mentah ---
+# Simpan data mentah setiap run ke snapshot Arrow IPC agar transformasi bisa diulang tanpa scraping
+RAW_SNAPSHOT_ENABLED = os.getenv("RAW_SNAPSHOT_ENABLED", "false").lower() in ("1", "true", "yes")
+# Direktori file snapshot (<run_id>.arrow) beserta indeks run-nya (index.sqlite)
+RAW_SNAPSHOT_DIR = os.getenv("RAW_SNAPSHOT_DIR", ".cache/raw_snapshots")
+# Kompresi buffer Arrow IPC: "zstd", "lz4", atau kosong untuk tanpa kompresi
+RAW_SNAPSHOT_COMPRESSION = os.getenv("RAW_SNAPSHOT_COMPRESSION", "zstd")
+# Jumlah baris per record batch saat menulis, dan ukuran batch maksimum saat membaca ulang
+RAW_SNAPSHOT_BATCH_ROWS = int(os.getenv("RAW_SNAPSHOT_BATCH_ROWS", 50000))
+# Jumlah run terbaru yang disimpan; run yang lebih lama dihapus (0 berarti simpan semua)
+RAW_SNAPSHOT_KEEP_RUNS = int(os.getenv("RAW_SNAPSHOT_KEEP_RUNS", 30))
+
+# --- Konfigurasi Validasi Kualitas Data ---
+# Jalankan tahap validasi setelah transformasi; baris yang melanggar aturan dikarantina, bukan dimuat
+VALIDATION_ENABLED = os.getenv("VALIDATION_ENABLED", "false").lower() in ("1", "true", "yes")
+# Rentang harga yang valid dalam Rupiah (setelah konversi kurs)
+VALIDATION_PRICE_MIN = float(os.getenv("VALIDATION_PRICE_MIN", 1))
+VALIDATION_PRICE_MAX = float(os.getenv("VALIDATION_PRICE_MAX", 100_000_000))
+# Ukuran dan gender yang diizinkan (dipisah koma)
+VALIDATION_ALLOWED_SIZES = os.getenv("VALIDATION_ALLOWED_SIZES", "XS,S,M,L,XL,XXL")
+VALIDATION_ALLOWED_GENDERS = os.getenv("VALIDATION_ALLOWED_GENDERS", "Men,Women,Unisex")
+# File CSV karantina (ditambahkan setiap run); kosongkan untuk tidak menyimpan
+VALIDATION_QUARANTINE_PATH = os.getenv("VALIDATION_QUARANTINE_PATH", "quarantine.csv")
+
+# --- Konfigurasi Scheduler ---
+# Jarak antar run (detik) pada mode daemon `python -m etl schedule`
+SCHEDULE_INTERVAL = float(os.getenv("SCHEDULE_INTERVAL", 3600))
+# Ekspresi cron 5 kolom (menit jam tanggal bulan hari-minggu); jika diisi, menggantikan SCHEDULE_INTERVAL
+SCHEDULE_CRON = os.getenv("SCHEDULE_CRON", "")
+# Lock file (flock) yang mencegah dua run berjalan bersamaan, baik terjadwal maupun manual (berisi PID pemegang lock)
+SCHEDULER_LOCK_PATH = os.getenv("SCHEDULER_LOCK_PATH", ".cache/etl.lock")
+# Lewati transform dan load jika hash katalog hasil extract sama dengan load terakhir yang berhasil
+SCHEDULE_SKIP_UNCHANGED = os.getenv("SCHEDULE_SKIP_UNCHANGED", "true").lower() in ("1", "true", "yes")
@@ -1,7 +1,25 @@
+import contextlib
+import logging
+import queue
+import re
+from collections import deque
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
+
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from lxml import etree, html as lxml_html
 import utils.config as config
-from typing import List, Dict, Optional
+import utils.metrics as metrics
+from utils.cache import CacheMissError, cached_get, get_page_cache
+from utils.checkpoint import open_journal
+from utils.fields import SOURCE_PAGE_FIELD
+from utils.snapshot import open_snapshot_store
+from typing import Iterator, List, Dict, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
 
 def scrape_product_details(product_card) -> Optional[Dict[str, any]]:
     """
@@ -40,55 +58,657 @@ def scrape_product_details(product_card) -> Optional[Dict[str, any]]:
             "gender": gender_text,
         }
     except AttributeError as e:
-        print(f"Error parsing product card: {e}")
+        logger.error("Error parsing product card: %s", e)
+        return None
+
+def _class_xpath(tag: str, class_name: str, descendant: bool = True) -> etree.XPath:
+    """Membuat XPath terkompilasi untuk elemen `tag` yang memiliki kelas `class_name` (setara `class_` di BeautifulSoup)."""
+    axis = ".//" if descendant else "//"
+    return etree.XPath(
+        f"{axis}{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+    )
+
+# XPath dikompilasi sekali saat modul dimuat agar tidak diparsing ulang untuk setiap kartu
+_CARD_XPATH = _class_xpath('div', 'collection-card', descendant=False)
+_TITLE_XPATH = _class_xpath('h3', 'product-title')
+_PRICE_CONTAINER_XPATH = _class_xpath('div', 'price-container')
+_PRICE_SPAN_XPATH = _class_xpath('span', 'price')
+_PRICE_P_XPATH = _class_xpath('p', 'price')
+_DETAILS_XPATH = etree.XPath(".//p")
+# Parser HTML untuk input bytes, agar karakter seperti '⭐' tidak salah di-decode
+_UTF8_HTML_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+def _first_text(xpath: etree.XPath, element) -> Optional[str]:
+    """Mengembalikan teks (sudah di-strip) dari elemen pertama hasil XPath, atau None jika tidak ada."""
+    matches = xpath(element)
+    return matches[0].text_content().strip() if matches else None
+
+def _document(html):
+    """Mem-parsing teks atau bytes HTML menjadi dokumen lxml (None jika kosong)."""
+    if not html or not html.strip():
         return None
+    if isinstance(html, bytes):
+        return lxml_html.document_fromstring(html, parser=_UTF8_HTML_PARSER)
+    return lxml_html.document_fromstring(html)
 
-def scrape_all_products() -> List[Dict[str, any]]:
+def scrape_product_details_lxml(product_card) -> Optional[Dict[str, any]]:
     """
-    Melakukan scraping data produk dari semua halaman yang ditentukan di konfigurasi.
-    Mengembalikan daftar (list) dari dictionary produk.
+    Versi cepat scrape_product_details untuk elemen lxml, memakai XPath terkompilasi.
+    Menghasilkan dictionary yang sama persis dengan parser BeautifulSoup, atau None jika ada error.
     """
-    all_products = []
-    print("Memulai proses scraping...")
+    title = _first_text(_TITLE_XPATH, product_card)
+    if title is None:
+        logger.error("Error parsing product card: judul produk tidak ditemukan")
+        return None
 
-    # Looping untuk setiap halaman dari 1 sampai PAGE_COUNT
-    for page_num in range(1, config.PAGE_COUNT + 1):
-        # Struktur URL berbeda untuk halaman pertama dan halaman berikutnya
-        if page_num == 1:
-            url = config.BASE_URL
-        else:
-            # --- PERBAIKAN DI SINI ---
-            # Menghapus garis miring (/) antara 'page' dan nomor halaman
-            url = f"{config.BASE_URL}/page{page_num}"
-        
-        print(f"Scraping halaman: {url}")
+    # Penanganan harga yang memiliki struktur HTML berbeda
+    price_containers = _PRICE_CONTAINER_XPATH(product_card)
+    if price_containers:
+        price = _first_text(_PRICE_SPAN_XPATH, price_containers[0])
+    else:
+        # Fallback untuk struktur lama atau jika container tidak ada
+        price = _first_text(_PRICE_P_XPATH, product_card)
+    if price is None:
+        price = "Price Unavailable"
+
+    # Ekstrak detail lain dari tag <p>
+    details = [p.text_content().strip() for p in _DETAILS_XPATH(product_card)]
+    return {
+        "title": title,
+        "price": price,
+        "rating": details[0] if len(details) > 0 else "Not Rated",
+        "colors": details[1] if len(details) > 1 else "",
+        "size": details[2] if len(details) > 2 else "",
+        "gender": details[3] if len(details) > 3 else "",
+    }
+
+def parse_page_lxml(html) -> List[Dict[str, any]]:
+    """
+    Mem-parsing satu halaman HTML dengan lxml dan XPath terkompilasi.
+    Menerima teks maupun bytes (diasumsikan UTF-8) dan mengembalikan daftar produk.
+    """
+    document = _document(html)
+    if document is None:
+        return []
+
+    products = []
+    for card in _CARD_XPATH(document):
+        product_details = scrape_product_details_lxml(card)
+        if product_details:
+            products.append(product_details)
+    return products
+
+def build_page_url(page_num: int) -> str:
+    """
+    Membangun URL untuk nomor halaman tertentu.
+    Halaman pertama memakai BASE_URL, halaman berikutnya memakai pola '/page{n}'.
+    """
+    if page_num == 1:
+        return config.BASE_URL
+    # Tidak ada garis miring (/) antara 'page' dan nomor halaman
+    return f"{config.BASE_URL}/page{page_num}"
+
+_PAGINATION_XPATH = _class_xpath('ul', 'pagination', descendant=False)
+_LINK_HREF_XPATH = etree.XPath(".//a/@href")
+_PAGE_OF_RE = re.compile(r'Page\s+(\d+)\s+of\s+(\d+)', re.IGNORECASE)
+_PAGE_HREF_RE = re.compile(r'/page(\d+)/?$')
+
+def count_cards(html) -> int:
+    """Jumlah elemen `collection-card` di halaman."""
+    document = _document(html)
+    return len(_CARD_XPATH(document)) if document is not None else 0
+
+def parse_pagination(html) -> Tuple[Optional[int], List[int]]:
+    """
+    Membaca kontrol paginasi halaman.
+    Mengembalikan (halaman terakhir dari teks "Page X of N" atau None, daftar nomor halaman yang ditautkan).
+    """
+    document = _document(html)
+    if document is None:
+        return None, []
+    last_page, linked = None, []
+    for pagination in _PAGINATION_XPATH(document):
+        match = _PAGE_OF_RE.search(pagination.text_content())
+        if match:
+            last_page = int(match.group(2))
+        for href in _LINK_HREF_XPATH(pagination):
+            href_match = _PAGE_HREF_RE.search(href)
+            if href_match:
+                linked.append(int(href_match.group(1)))
+    return last_page, sorted(set(linked))
+
+def parse_page(html: str) -> List[Dict[str, any]]:
+    """
+    Mem-parsing satu halaman HTML dan mengembalikan daftar produk di dalamnya.
+    Backend parser dipilih lewat config.PARSER_BACKEND ("bs4" atau "lxml").
+    Kartu produk yang gagal di-parsing dilewati.
+    """
+    with metrics.span("extract.parse"):
+        products = parse_page_lxml(html) if config.PARSER_BACKEND == "lxml" else _parse_page_bs4(html)
+    metrics.inc("cards_parsed", len(products))
+    return products
+
+def _parse_page_bs4(html: str) -> List[Dict[str, any]]:
+    """Mem-parsing satu halaman HTML dengan BeautifulSoup."""
+    # Diimpor di sini agar backend lxml (dan CLI yang tidak melakukan ekstraksi) tidak memuat bs4
+    from bs4 import BeautifulSoup
+
+    # Parsing HTML menggunakan BeautifulSoup dengan parser lxml
+    soup = BeautifulSoup(html, 'lxml')
 
+    products = []
+    # Mencari semua elemen kartu produk
+    for card in soup.find_all('div', class_='collection-card'):
+        product_details = scrape_product_details(card)
+        if product_details:
+            products.append(product_details)
+    return products
+
+class RateLimiter:
+    """
+    Pembatas laju request per host yang aman dipakai dari banyak thread.
+    Setiap host mendapat jeda minimum 1 / rate detik antar request.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_allowed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        """Menunggu hingga request berikutnya ke host dari URL boleh dikirim."""
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def create_session(pool_size: Optional[int] = None) -> requests.Session:
+    """
+    Membuat requests.Session dengan connection pool keep-alive.
+    Ukuran pool mengikuti jumlah worker agar koneksi TCP/TLS bisa dipakai ulang.
+    """
+    pool_size = pool_size or config.SCRAPE_CONCURRENCY
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Session bersama yang dipakai ulang antar run oleh scheduler (lihat set_shared_session); None berarti
+# setiap scraping membuat session sendiri dan menutupnya setelah selesai
+_shared_session: Optional[requests.Session] = None
+
+def set_shared_session(session: Optional[requests.Session]):
+    """Memasang session bersama (atau melepasnya dengan None); session tidak ditutup oleh scraping."""
+    global _shared_session
+    _shared_session = session
+
+@contextlib.contextmanager
+def _session_scope(pool_size: Optional[int] = None) -> Iterator[requests.Session]:
+    """Memakai session bersama jika ada, selain itu membuat session baru yang ditutup setelah blok selesai."""
+    if _shared_session is not None:
+        yield _shared_session
+        return
+    with create_session(pool_size) as session:
+        yield session
+
+def _is_retryable(error: requests.exceptions.RequestException) -> bool:
+    """Error koneksi/timeout dan status 429/5xx layak dicoba ulang, status 4xx lain tidak."""
+    if isinstance(error, CacheMissError):
+        return False
+    response = getattr(error, "response", None)
+    if response is None:
+        return True
+    return response.status_code == 429 or response.status_code >= 500
+
+def fetch_page(session: requests.Session, url: str, rate_limiter: Optional[RateLimiter] = None, raw: bool = False):
+    """
+    Mengambil isi HTML dari satu URL menggunakan session yang diberikan.
+    Mengembalikan teks HTML, atau bytes mentah jika `raw` bernilai True.
+    Jika cache halaman aktif (config.CACHE_MODE), request melewati cache tersebut.
+    Percobaan ulang dilakukan dengan exponential backoff; error terakhir dilempar ulang.
+    """
+    cache = get_page_cache()
+    attempt = 0
+    while True:
+        # Mode replay tidak menyentuh jaringan sehingga tidak perlu dibatasi lajunya
+        if rate_limiter and config.CACHE_MODE != "replay":
+            rate_limiter.wait(url)
         try:
-            # Melakukan request GET ke URL dengan timeout
-            response = requests.get(url, timeout=15)
-            # Memunculkan error jika status code bukan 2xx
-            response.raise_for_status()
-
-            # Parsing HTML menggunakan BeautifulSoup dengan parser lxml
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # Mencari semua elemen kartu produk
-            product_cards = soup.find_all('div', class_='collection-card')
-            
-            for card in product_cards:
-                product_details = scrape_product_details(card)
-                if product_details:
-                    all_products.append(product_details)
-        
-        # Penanganan kesalahan jika terjadi masalah dengan request (koneksi, timeout, dll)
+            with metrics.span("extract.fetch"):
+                content = cached_get(session, url, cache, raw=raw)
+            metrics.inc("pages_fetched")
+            return content
         except requests.exceptions.RequestException as e:
-            print(f"Gagal mengambil data dari {url}: {e}")
-            # Bisa dilanjutkan ke halaman berikutnya atau dihentikan
-            continue
-        # Penanganan kesalahan umum lainnya
+            if attempt >= config.SCRAPE_MAX_RETRIES or not _is_retryable(e):
+                metrics.inc("pages_failed")
+                raise
+            metrics.inc("fetch_retries")
+            delay = config.SCRAPE_BACKOFF_FACTOR * (2 ** attempt)
+            logger.warning("Percobaan ke-%s gagal untuk %s: %s. Mencoba lagi dalam %.1f detik...", attempt + 1, url, e, delay)
+            time.sleep(delay)
+            attempt += 1
+
+def _page_has_cards(session: requests.Session, rate_limiter: RateLimiter, page_num: int) -> bool:
+    """Memeriksa apakah halaman ada (bukan 404) dan berisi minimal satu kartu produk."""
+    try:
+        html = fetch_page(session, build_page_url(page_num), rate_limiter, raw=True)
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return False
+        raise
+    metrics.inc("pagination_probes")
+    return count_cards(html) > 0
+
+def discover_page_count(max_pages: Optional[int] = None) -> int:
+    """
+    Mencari nomor halaman terakhir katalog sebelum scraping dimulai.
+    1. Baca kontrol paginasi halaman pertama: teks "Page 1 of N" langsung memberi N.
+    2. Jika tidak ada, tautan '/page{n}' menjadi batas bawah, lalu probe eksponensial
+       (2, 4, 8, ...) hingga menemukan halaman kosong/404, dan pencarian biner di antaranya.
+    Jika halaman pertama tidak bisa diambil, config.PAGE_COUNT dipakai sebagai fallback. Jika sebuah probe gagal,
+    PAGE_COUNT dipakai selama tidak melewati batas yang sudah ditemukan (tidak kurang dari halaman berisi terakhir,
+    tidak lebih dari halaman kosong pertama).
+    """
+    max_pages = max_pages or config.PAGINATION_MAX_PAGES
+    rate_limiter = RateLimiter(config.SCRAPE_RATE_LIMIT)
+    with _session_scope(1) as session:
+        try:
+            first_page = fetch_page(session, build_page_url(1), rate_limiter, raw=True)
+        except requests.exceptions.RequestException as e:
+            logger.error("Gagal membaca paginasi, memakai PAGE_COUNT=%s: %s", config.PAGE_COUNT, e)
+            return config.PAGE_COUNT
+
+        last_page, linked_pages = parse_pagination(first_page)
+        if last_page:
+            logger.info("Paginasi terdeteksi dari halaman pertama: %s halaman.", last_page)
+            return min(last_page, max_pages)
+        if count_cards(first_page) == 0:
+            logger.warning("Halaman pertama tidak berisi kartu produk.")
+            return 1
+
+        # Halaman yang ditautkan dianggap ada; probe dimulai setelahnya
+        low = min(max(linked_pages, default=1), max_pages)
+        high = None
+        try:
+            probe = max(2, low * 2)
+            while probe <= max_pages:
+                if not _page_has_cards(session, rate_limiter, probe):
+                    high = probe
+                    break
+                low = probe
+                probe *= 2
+            high = high or max_pages + 1
+
+            # Pencarian biner: `low` selalu halaman berisi, `high` selalu halaman kosong/tidak ada
+            while high - low > 1:
+                middle = (low + high) // 2
+                if _page_has_cards(session, rate_limiter, middle):
+                    low = middle
+                else:
+                    high = middle
+        except requests.exceptions.RequestException as e:
+            # Probe gagal (5xx setelah retry, koneksi putus): PAGE_COUNT dipakai dalam batas yang sudah diketahui
+            upper = high - 1 if high else max_pages
+            fallback = max(low, min(config.PAGE_COUNT, upper))
+            logger.warning("Probe paginasi gagal, memakai %s halaman (batas bawah %s, PAGE_COUNT=%s): %s",
+                           fallback, low, config.PAGE_COUNT, e)
+            return fallback
+    logger.info("Paginasi ditemukan lewat probe: %s halaman.", low)
+    return low
+
+def resolve_page_count() -> int:
+    """Jumlah halaman yang akan di-scrape: hasil discovery jika PAGINATION_MODE="discover", selain itu PAGE_COUNT."""
+    if config.PAGINATION_MODE == "discover":
+        return discover_page_count()
+    return config.PAGE_COUNT
+
+class PageResult(NamedTuple):
+    """Hasil scraping satu halaman. `products` bernilai None jika halaman gagal diambil atau di-parsing."""
+    page_num: int
+    products: Optional[List[Dict[str, any]]]
+    error: Optional[str] = None
+    # True jika kegagalannya sementara (koneksi, timeout, 429/5xx) sehingga layak dicoba ulang
+    retryable: bool = False
+
+def _failed_page(page_num: int, url: str, error: Exception) -> PageResult:
+    """Mencatat kegagalan satu halaman ke log dan membentuk PageResult-nya."""
+    if isinstance(error, requests.exceptions.RequestException):
+        logger.error("Gagal mengambil data dari %s: %s", url, error, extra={"page": page_num})
+        return PageResult(page_num, None, str(error), _is_retryable(error))
+    logger.error("Terjadi kesalahan saat memproses halaman %s: %s", page_num, error)
+    return PageResult(page_num, None, str(error))
+
+def _scrape_page_concurrent(session: requests.Session, rate_limiter: RateLimiter, page_num: int) -> PageResult:
+    """Mengambil dan mem-parsing satu halaman untuk mode konkuren."""
+    url = build_page_url(page_num)
+    logger.info("Scraping halaman: %s", url, extra={"page": page_num})
+    try:
+        return PageResult(page_num, parse_page(fetch_page(session, url, rate_limiter)))
+    except Exception as e:
+        return _failed_page(page_num, url, e)
+
+def _iter_pages_concurrent(pages: Sequence[int], max_workers: Optional[int] = None) -> Iterator[PageResult]:
+    """
+    Menghasilkan (yield) hasil per halaman dari thread pool terbatas, sesuai urutan `pages`.
+    Antrean geser menjaga paling banyak 2 x `max_workers` halaman dalam proses: setiap kali hasil terdepan
+    diambil, satu halaman baru langsung dikirim, sehingga worker tidak menganggur menunggu satu jendela habis
+    dan hasil yang belum dikonsumsi tidak menumpuk di memori.
+    """
+    max_workers = max_workers or config.SCRAPE_CONCURRENCY
+    window = max_workers * 2
+    rate_limiter = RateLimiter(config.SCRAPE_RATE_LIMIT)
+    with _session_scope(max_workers) as session:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending_pages = iter(pages)
+            in_flight = deque()
+
+            def submit_next() -> bool:
+                page_num = next(pending_pages, None)
+                if page_num is None:
+                    return False
+                in_flight.append(executor.submit(_scrape_page_concurrent, session, rate_limiter, page_num))
+                return True
+
+            while len(in_flight) < window and submit_next():
+                pass
+            while in_flight:
+                # Hasil diambil sesuai urutan nomor halaman
+                result = in_flight.popleft().result()
+                submit_next()
+                yield result
+
+def _iter_pages_sequential(pages: Sequence[int]) -> Iterator[PageResult]:
+    """Menghasilkan (yield) hasil per halaman dengan mengambil halaman satu per satu."""
+    cache = get_page_cache()
+    for page_num in pages:
+        url = build_page_url(page_num)
+        logger.info("Scraping halaman: %s", url, extra={"page": page_num})
+
+        try:
+            # Melakukan request GET ke URL dengan timeout (melalui cache halaman jika aktif)
+            with metrics.span("extract.fetch"):
+                html = cached_get(_shared_session or requests, url, cache)
+            metrics.inc("pages_fetched")
+            result = PageResult(page_num, parse_page(html))
+        # Penanganan kesalahan request (koneksi, timeout, dll) dan kesalahan parsing
         except Exception as e:
-            print(f"Terjadi kesalahan saat memproses halaman {page_num}: {e}")
-            continue
+            if isinstance(e, requests.exceptions.RequestException):
+                metrics.inc("pages_failed")
+            result = _failed_page(page_num, url, e)
+
+        yield result
+
+# Penanda bahwa tahap fetch sudah selesai mengirim semua halaman ke antrean
+_FETCH_DONE = None
+
+def _fetch_stage(page_queue: queue.Queue, pages: Sequence[int], max_workers: int, stop: threading.Event):
+    """
+    Tahap fetch: mengambil halaman-halaman `pages` secara konkuren dan memasukkan
+    (nomor halaman, bytes HTML atau PageResult gagal) ke antrean.
+    Halaman yang belum diambil dilewati begitu `stop` di-set.
+    """
+    rate_limiter = RateLimiter(config.SCRAPE_RATE_LIMIT)
+
+    def fetch(page_num: int):
+        if stop.is_set():
+            return
+        url = build_page_url(page_num)
+        logger.info("Scraping halaman: %s", url, extra={"page": page_num})
+        try:
+            content = fetch_page(session, url, rate_limiter, raw=True)
+        except requests.exceptions.RequestException as e:
+            content = _failed_page(page_num, url, e)
+        page_queue.put((page_num, content))
+
+    try:
+        with _session_scope(max_workers) as session:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(fetch, pages))
+    except Exception as e:
+        logger.error("Terjadi kesalahan pada tahap fetch: %s", e)
+    finally:
+        page_queue.put(_FETCH_DONE)
+
+def _parse_result(page_num: int, pending) -> PageResult:
+    """Mengambil hasil parsing dari future, atau meneruskan PageResult halaman yang gagal diambil."""
+    if isinstance(pending, PageResult):
+        return pending
+    try:
+        products = pending.result()
+        # Metrik parsing di proses worker tidak terlihat di proses utama, jadi kartu dihitung di sini
+        metrics.inc("cards_parsed", len(products))
+        return PageResult(page_num, products)
+    except Exception as e:
+        return _failed_page(page_num, build_page_url(page_num), e)
+
+def _iter_pages_multiprocess(pages: Sequence[int], parse_workers: Optional[int] = None) -> Iterator[PageResult]:
+    """
+    Menghasilkan (yield) hasil per halaman dengan memisahkan network I/O dan parsing.
+    Thread fetch mengisi antrean bytes halaman, lalu parsing dijalankan di ProcessPoolExecutor
+    sehingga memakai banyak core. Hasil tetap dikembalikan sesuai urutan `pages`.
+    """
+    parse_workers = parse_workers or config.PARSE_WORKERS
+    fetch_workers = config.SCRAPE_CONCURRENCY
+    # Antrean dibatasi agar tahap fetch tidak jauh mendahului tahap parsing
+    page_queue = queue.Queue(maxsize=max(fetch_workers, parse_workers) * 4)
+    stop = threading.Event()
+
+    pending = {}
+    order = iter(pages)
+    next_page = next(order, None)
+    fetch_done = False
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        # Dengan start method fork, semua worker dibuat pada submit pertama. Pool dipanaskan sebelum thread fetch
+        # berjalan, agar tidak ada proses anak yang di-fork saat thread lain memegang lock (metrik, cache, urllib3).
+        pool.submit(int).result()
+        fetcher = threading.Thread(target=_fetch_stage, args=(page_queue, pages, fetch_workers, stop), daemon=True)
+        fetcher.start()
+        try:
+            while True:
+                item = page_queue.get()
+                if item is _FETCH_DONE:
+                    fetch_done = True
+                    break
+                page_num, content = item
+                pending[page_num] = content if isinstance(content, PageResult) else pool.submit(parse_page, content)
+
+                # Keluarkan halaman berurutan yang parsing-nya sudah selesai
+                while next_page in pending and (isinstance(pending[next_page], PageResult) or pending[next_page].done()):
+                    yield _parse_result(next_page, pending.pop(next_page))
+                    next_page = next(order, None)
+
+            # Tunggu sisa halaman yang masih di-parsing, tetap sesuai urutan
+            while next_page is not None:
+                if next_page in pending:
+                    yield _parse_result(next_page, pending.pop(next_page))
+                else:
+                    # Tahap fetch berhenti sebelum halaman ini sempat diambil
+                    yield PageResult(next_page, None, "halaman tidak sempat diambil", retryable=True)
+                next_page = next(order, None)
+        finally:
+            if not fetch_done:
+                # Konsumen berhenti lebih awal: hentikan tahap fetch dan kosongkan antrean agar thread-nya tidak tertahan
+                stop.set()
+                while page_queue.get() is not _FETCH_DONE:
+                    pass
+            fetcher.join()
+
+def iter_page_results(pages: Sequence[int], mode: Optional[str] = None) -> Iterator[PageResult]:
+    """
+    Menghasilkan (yield) PageResult untuk setiap halaman di `pages`, sesuai urutannya.
+    Jika PARSE_MODE bernilai "process", parsing dijalankan di proses terpisah.
+    Selain itu mode "threaded" memakai scraping konkuren, dan mode lain sekuensial.
+    """
+    mode = mode or config.SCRAPE_MODE
+    if config.PARSE_MODE == "process":
+        return _iter_pages_multiprocess(pages)
+    if mode == "threaded":
+        return _iter_pages_concurrent(pages)
+    return _iter_pages_sequential(pages)
+
+def _log_start(mode: Optional[str]):
+    mode = mode or config.SCRAPE_MODE
+    if config.PARSE_MODE == "process":
+        logger.info("Memulai proses scraping dengan %s worker parsing...", config.PARSE_WORKERS)
+    elif mode == "threaded":
+        logger.info("Memulai proses scraping konkuren dengan %s worker...", config.SCRAPE_CONCURRENCY)
+    else:
+        logger.info("Memulai proses scraping...")
+
+def _record_result(result: PageResult, journal, failed: Dict[int, bool]) -> Optional[List[Dict[str, any]]]:
+    """
+    Mencatat hasil satu halaman ke jurnal checkpoint (jika ada) dan ke daftar halaman gagal.
+    Mengembalikan produk halaman tersebut, atau None jika halaman gagal.
+    """
+    if result.products is None:
+        failed[result.page_num] = result.retryable
+        if journal:
+            journal.mark_failed(result.page_num, result.error)
+        return None
+    failed.pop(result.page_num, None)
+    if journal:
+        journal.mark_done(result.page_num, result.products)
+    return result.products
+
+def _tag_source_page(products: List[Dict[str, any]], page_num: int) -> List[Dict[str, any]]:
+    """Menambahkan nomor halaman asal ke setiap produk (di tempat) dan mengembalikan daftar yang sama."""
+    for product in products:
+        product[SOURCE_PAGE_FIELD] = page_num
+    return products
+
+def iter_page_products(mode: Optional[str] = None, resume: bool = False,
+                       with_source_page: bool = False) -> Iterator[List[Dict[str, any]]]:
+    """
+    Menghasilkan (yield) daftar produk untuk setiap halaman yang berhasil (lihat _iter_numbered_pages).
+    Jika `with_source_page`, setiap produk diberi kunci source_page berisi nomor halaman asalnya.
+    Jika RAW_SNAPSHOT_ENABLED, produk setiap halaman juga ditulis ke snapshot data mentah run ini
+    beserta nomor halamannya; snapshot ditandai "partial" jika pembacaan berhenti sebelum selesai.
+    """
+    pages = _iter_numbered_pages(mode, resume)
+    if not config.RAW_SNAPSHOT_ENABLED:
+        for page_num, products in pages:
+            yield _tag_source_page(products, page_num) if with_source_page else products
+        return
+
+    store = open_snapshot_store()
+    writer = store.open_writer()
+    complete = False
+    try:
+        for page_num, products in pages:
+            writer.write(products, page_num)
+            yield _tag_source_page(products, page_num) if with_source_page else products
+        complete = True
+    finally:
+        pages.close()
+        writer.close(complete)
+        store.prune()
+        store.close()
+
+def _iter_numbered_pages(mode: Optional[str] = None, resume: bool = False) -> Iterator[Tuple[int, List[Dict[str, any]]]]:
+    """
+    Menghasilkan (yield) pasangan (nomor halaman, daftar produk) untuk setiap halaman yang berhasil,
+    berurutan dari halaman 1.
+
+    Halaman yang gagal karena error sementara masuk antrean retry dan diambil ulang setelah
+    putaran utama (PAGE_RETRY_ROUNDS putaran, jeda PAGE_RETRY_DELAY); hasilnya di-yield di akhir.
+
+    Jika CHECKPOINT_ENABLED atau `resume`, setiap halaman yang selesai atau gagal dicatat ke jurnal
+    checkpoint. Dengan `resume`, halaman yang sudah selesai pada run sebelumnya dibaca dari jurnal
+    dan hanya halaman yang belum selesai atau gagal yang diambil dari jaringan.
+
+    Jumlah halaman ditentukan oleh resolve_page_count(). Pada PAGINATION_MODE="discover",
+    scraping juga berhenti lebih awal begitu ada halaman tanpa kartu produk.
+    """
+    _log_start(mode)
+    page_count = resolve_page_count()
+    journal = open_journal(resume) if config.CHECKPOINT_ENABLED or resume else None
+    try:
+        done = journal.completed_pages() if journal else set()
+        pages = [page_num for page_num in range(1, page_count + 1) if page_num not in done]
+        metrics.inc("pages_resumed", len(done))
+
+        # Halaman gagal -> apakah kegagalannya sementara (masuk antrean retry)
+        failed = {}
+        results = iter_page_results(pages, mode)
+        for page_num in range(1, page_count + 1):
+            if page_num in done:
+                yield page_num, journal.load_products(page_num)
+                continue
+            products = _record_result(next(results), journal, failed)
+            if products is not None:
+                yield page_num, products
+            if products == [] and config.PAGINATION_MODE == "discover":
+                # Halaman tanpa kartu produk berarti katalog sudah habis
+                logger.info("Halaman %s tidak berisi produk, scraping dihentikan lebih awal.", page_num)
+                results.close()
+                break
+
+        for round_num in range(1, config.PAGE_RETRY_ROUNDS + 1):
+            retry_queue = [page_num for page_num, retryable in failed.items() if retryable]
+            if not retry_queue:
+                break
+            logger.warning(
+                "Mengambil ulang %s halaman yang gagal (putaran %s) dalam %.1f detik...",
+                len(retry_queue), round_num, config.PAGE_RETRY_DELAY,
+            )
+            time.sleep(config.PAGE_RETRY_DELAY)
+            metrics.inc("pages_retried", len(retry_queue))
+            for result in iter_page_results(retry_queue, mode):
+                products = _record_result(result, journal, failed)
+                if products is not None:
+                    yield result.page_num, products
+
+        if failed:
+            logger.warning(
+                "%s halaman tetap gagal: %s.%s", len(failed), sorted(failed),
+                " Jalankan ulang dengan --resume untuk mengambil halaman tersebut." if journal else "",
+            )
+    finally:
+        if journal:
+            journal.close()
+
+def iter_product_batches(batch_pages: Optional[int] = None, mode: Optional[str] = None,
+                         resume: bool = False, with_source_page: bool = False) -> Iterator[List[Dict[str, any]]]:
+    """
+    Menghasilkan (yield) batch produk mentah, masing-masing berisi hasil dari `batch_pages` halaman.
+    Dipakai oleh pipeline streaming agar memori hanya sebesar satu batch.
+    """
+    batch_pages = batch_pages or config.STREAM_BATCH_PAGES
+    batch = []
+    pages_in_batch = 0
+    total = 0
+    for products in iter_page_products(mode, resume=resume, with_source_page=with_source_page):
+        batch.extend(products)
+        pages_in_batch += 1
+        if pages_in_batch >= batch_pages:
+            if batch:
+                total += len(batch)
+                yield batch
+            batch = []
+            pages_in_batch = 0
+    if batch:
+        total += len(batch)
+        yield batch
+    logger.info("Scraping selesai. Total produk mentah yang didapat: %s", total)
+
+def scrape_all_products(mode: Optional[str] = None, resume: bool = False,
+                        with_source_page: bool = False) -> List[Dict[str, any]]:
+    """
+    Melakukan scraping data produk dari semua halaman yang ditentukan di konfigurasi.
+    Mode "threaded" menjalankan scraping konkuren, selain itu halaman diambil satu per satu.
+    Dengan `resume`, halaman yang sudah selesai di jurnal checkpoint tidak diambil ulang.
+    Dengan `with_source_page`, setiap produk membawa nomor halaman asalnya (kunci source_page).
+    Mengembalikan daftar (list) dari dictionary produk.
+    """
+    all_products = []
+    for products in iter_page_products(mode, resume=resume, with_source_page=with_source_page):
+        all_products.extend(products)
 
-    print(f"Scraping selesai. Total produk mentah yang didapat: {len(all_products)}")
-    return all_products
\ No newline at end of file
+    logger.info("Scraping selesai. Total produk mentah yang didapat: %s", len(all_products))
+    return all_products
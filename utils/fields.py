@@ -0,0 +1,7 @@
+# Nama kolom data mentah yang dipakai bersama oleh extract, transform, validate, dan snapshot.
+# Modul ini sengaja tanpa dependensi agar bisa diimpor tanpa memuat pyarrow.
+
+# Kolom data mentah yang dihasilkan scrape_product_details; semuanya teks apa adanya dari halaman
+RAW_FIELDS = ("title", "price", "rating", "colors", "size", "gender")
+# Kunci opsional berisi nomor halaman asal produk; tidak ikut dibersihkan maupun dipakai untuk deduplikasi
+SOURCE_PAGE_FIELD = "source_page"
@@ -0,0 +1,256 @@
+import logging
+import math
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import gspread
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+import utils.config as config
+
+logger = logging.getLogger(__name__)
+
+# Client Google Sheets yang sudah terautentikasi, dipakai ulang antar pemanggilan
+_client = None
+_client_lock = threading.Lock()
+
+def get_gsheet_client():
+    """
+    Mengembalikan client gspread yang sudah terautentikasi.
+    Autentikasi service account hanya dilakukan sekali per proses.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = gspread.service_account(filename=config.GSHEET_CREDENTIALS_PATH)
+        return _client
+
+def reset_gsheet_client():
+    """Membuang client yang tersimpan sehingga pemanggilan berikutnya melakukan autentikasi ulang."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+class TokenBucket:
+    """
+    Throttle token bucket yang aman dipakai dari banyak thread.
+    Token terisi `rate` per detik hingga `capacity`; setiap request API mengambil satu token.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        """Menunggu hingga token tersedia, lalu mengambilnya."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+def _quota_bucket(quota_per_minute: float, burst: float) -> TokenBucket:
+    """
+    Membuat token bucket yang tidak pernah melewati `quota_per_minute` dalam jendela 60 detik mana pun.
+    Bucket mulai dengan `burst` token dan terisi (quota - burst) per menit, sehingga burst awal
+    ditambah isi ulang selama satu menit tetap sama dengan kuota.
+    """
+    burst = max(1.0, min(burst, quota_per_minute - 1))
+    return TokenBucket(rate=max(quota_per_minute - burst, 1) / 60, capacity=burst)
+
+# Throttle bersama untuk request tulis ke Sheets, sesuai kuota per menit
+_write_bucket = _quota_bucket(config.GSHEET_WRITE_QUOTA_PER_MINUTE, config.GSHEET_WRITE_BURST)
+
+
+def _normalize_cell(value) -> str:
+    """
+    Menyamakan representasi sel agar nilai dari sheet dan dari DataFrame bisa dibandingkan:
+    kosong/NaN menjadi "", float bulat menjadi angka tanpa desimal, selain itu str().
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+def dataframe_to_values(df: pd.DataFrame) -> List[list]:
+    """
+    Mengubah DataFrame menjadi grid nilai sel (baris pertama header) yang siap dikirim dengan RAW:
+    angka tetap angka Python, NaN menjadi sel kosong, dan nilai lain (timestamp, category) menjadi string.
+    """
+    columns = []
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_float_dtype(series):
+            # float32 dibulatkan agar 3.9 tidak tertulis sebagai 3.9000000953674316
+            values = series.astype('float64')
+            if series.dtype == np.float32:
+                values = values.round(6)
+            columns.append([None if math.isnan(value) else value for value in values.tolist()])
+        elif pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+            columns.append(series.tolist())
+        else:
+            columns.append(["" if pd.isna(value) else str(value) for value in series.tolist()])
+    header = [str(column) for column in df.columns]
+    return [header] + [list(row) for row in zip(*columns)]
+
+def _spans(columns: List[int]) -> List[Tuple[int, int]]:
+    """Mengelompokkan indeks kolom yang berurutan menjadi rentang (awal, akhir)."""
+    spans = []
+    for column in columns:
+        if spans and spans[-1][1] == column - 1:
+            spans[-1] = (spans[-1][0], column)
+        else:
+            spans.append((column, column))
+    return spans
+
+def compute_cell_diff(old_values: List[list], new_values: List[list], ignore_columns: List[str] = ()) -> List[dict]:
+    """
+    Membandingkan grid lama (isi sheet) dengan grid baru dan menghasilkan daftar range yang berubah
+    dalam format batch_update gspread: [{'range': 'A2:C4', 'values': [[...], ...]}, ...].
+    - Sel di luar grid baru (baris/kolom yang berkurang) dikosongkan.
+    - Kolom di `ignore_columns` (misal timestamp) hanya ditulis jika sel lain di baris yang sama berubah.
+    - Baris berurutan dengan rentang kolom yang sama digabung menjadi satu range persegi.
+    """
+    header = new_values[0] if new_values else []
+    ignored = {index for index, name in enumerate(header) if name in ignore_columns}
+    width = max([len(row) for row in old_values + new_values] or [0])
+    height = max(len(old_values), len(new_values))
+
+    # Rentang kolom yang berubah per baris
+    row_spans = []
+    for row_index in range(height):
+        old_row = old_values[row_index] if row_index < len(old_values) else []
+        new_row = new_values[row_index] if row_index < len(new_values) else []
+        changed = [
+            column for column in range(width)
+            if _normalize_cell(old_row[column] if column < len(old_row) else None)
+            != _normalize_cell(new_row[column] if column < len(new_row) else None)
+        ]
+        if all(column in ignored for column in changed):
+            changed = []
+        row_spans.append(_spans(changed))
+
+    def cell(row_index: int, column: int):
+        row = new_values[row_index] if row_index < len(new_values) else []
+        value = row[column] if column < len(row) else None
+        return "" if value is None else value
+
+    # Gabungkan baris berurutan yang rentang kolomnya sama
+    blocks = []
+    open_blocks = {}
+    for row_index, spans in enumerate(row_spans):
+        next_open = {}
+        for span in spans:
+            block = open_blocks.get(span)
+            if block is None:
+                block = {'start_row': row_index, 'span': span, 'rows': []}
+                blocks.append(block)
+            block['rows'].append([cell(row_index, column) for column in range(span[0], span[1] + 1)])
+            next_open[span] = block
+        open_blocks = next_open
+
+    return [
+        {
+            'range': f"{rowcol_to_a1(block['start_row'] + 1, block['span'][0] + 1)}:"
+                     f"{rowcol_to_a1(block['start_row'] + len(block['rows']), block['span'][1] + 1)}",
+            'values': block['rows'],
+        }
+        for block in blocks
+    ]
+
+def _split_update(update: dict, max_cells: int) -> List[dict]:
+    """Memecah satu range yang lebih besar dari `max_cells` menjadi beberapa range per kelompok baris."""
+    start, end = update['range'].split(':')
+    first_row, first_col = a1_to_rowcol(start)
+    _, last_col = a1_to_rowcol(end)
+    rows_per_part = max(1, max_cells // (last_col - first_col + 1))
+    parts = []
+    for offset in range(0, len(update['values']), rows_per_part):
+        rows = update['values'][offset:offset + rows_per_part]
+        parts.append({
+            'range': f"{rowcol_to_a1(first_row + offset, first_col)}:"
+                     f"{rowcol_to_a1(first_row + offset + len(rows) - 1, last_col)}",
+            'values': rows,
+        })
+    return parts
+
+def _chunk_updates(updates: List[dict], max_cells: int) -> List[List[dict]]:
+    """
+    Membagi daftar range menjadi beberapa batch_update yang masing-masing berisi paling banyak `max_cells` sel.
+    Range yang terlalu besar dipecah per kelompok baris terlebih dahulu.
+    """
+    updates = [
+        part for update in updates
+        for part in (_split_update(update, max_cells) if sum(len(row) for row in update['values']) > max_cells else [update])
+    ]
+    chunks, current, cells = [], [], 0
+    for update in updates:
+        size = sum(len(row) for row in update['values'])
+        if current and cells + size > max_cells:
+            chunks.append(current)
+            current, cells = [], 0
+        current.append(update)
+        cells += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+def write_dataframe_diff(worksheet, df: pd.DataFrame, bucket: Optional[TokenBucket] = None) -> int:
+    """
+    Menulis DataFrame ke worksheet dengan hanya mengirim sel yang berubah.
+    Sheet dibaca sekali, diff dihitung secara lokal, lalu range yang berubah dikirim lewat
+    batch_update bertahap yang dibatasi token bucket. Worksheet tidak pernah dikosongkan.
+    Mengembalikan jumlah sel yang ditulis.
+    """
+    bucket = bucket or _write_bucket
+    new_values = dataframe_to_values(df)
+    old_values = worksheet.get_values(value_render_option='UNFORMATTED_VALUE')
+    ignore_columns = [column.strip() for column in config.GSHEET_DIFF_IGNORE_COLUMNS.split(",") if column.strip()]
+    updates = compute_cell_diff(old_values, new_values, ignore_columns)
+    if not updates:
+        return 0
+
+    # Perbesar worksheet jika data baru melebihi ukuran grid saat ini
+    rows_needed = len(new_values)
+    cols_needed = len(new_values[0]) if new_values else 0
+    if rows_needed > worksheet.row_count or cols_needed > worksheet.col_count:
+        bucket.acquire()
+        worksheet.resize(rows=max(rows_needed, worksheet.row_count), cols=max(cols_needed, worksheet.col_count))
+
+    for chunk in _chunk_updates(updates, config.GSHEET_BATCH_MAX_CELLS):
+        bucket.acquire()
+        worksheet.batch_update(chunk, value_input_option='RAW')
+    return sum(len(row) for update in updates for row in update['values'])
+
+def save_to_gsheet_diff(df: pd.DataFrame) -> bool:
+    """
+    Menyimpan DataFrame ke Google Sheets dengan menulis hanya sel yang berubah.
+    Client yang sudah terautentikasi dipakai ulang. Mengembalikan True jika berhasil.
+    """
+    try:
+        logger.info("Menyimpan perubahan data ke Google Sheets...")
+        worksheet = get_gsheet_client().open_by_url(config.GSHEET_URL).get_worksheet(0)
+        cells = write_dataframe_diff(worksheet, df)
+        logger.info("Data berhasil disinkronkan ke Google Sheets (%s sel ditulis).", cells)
+        return True
+    except FileNotFoundError:
+        logger.error("File kredensial tidak ditemukan di path: %s", config.GSHEET_CREDENTIALS_PATH)
+        return False
+    except Exception as e:
+        logger.error("Gagal menyimpan data ke Google Sheets: %s", e)
+        return False
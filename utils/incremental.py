@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import NamedTuple, Dict, List, Optional
+
+import pandas as pd
+import utils.config as config
+import utils.rates as rates
+import utils.validate as validate
+
+# Kolom kunci alami produk; satu kombinasi dianggap satu produk
+KEY_COLUMNS = ['title', 'size', 'gender']
+# Kolom isi hasil transform_and_clean_data yang ikut dihitung hash-nya (timestamp tidak ikut)
+CONTENT_COLUMNS = ['title', 'price', 'rating', 'colors', 'size', 'gender']
+
+
+class ChangeSet(NamedTuple):
+    """Hasil perbandingan data bersih saat ini dengan state yang sudah dimuat sebelumnya."""
+    current: pd.DataFrame
+    inserts: pd.DataFrame
+    updates: pd.DataFrame
+    deletes: pd.DataFrame
+    unchanged: int
+
+    @property
+    def is_empty(self) -> bool:
+        """True jika tidak ada insert, update, maupun delete."""
+        return self.inserts.empty and self.updates.empty and self.deletes.empty
+
+    @property
+    def upserts(self) -> pd.DataFrame:
+        """Gabungan baris baru dan baris yang berubah, yang perlu ditulis ke tujuan."""
+        return pd.concat([self.inserts, self.updates], ignore_index=True)
+
+    @property
+    def removed_keys(self) -> pd.DataFrame:
+        """
+        Kunci produk yang harus dihapus dari tujuan sebelum upsert: baris dihapus, baris berubah, dan baris baru.
+        Kunci baris baru ikut dihapus agar ChangeSet yang dikirim ulang setelah load gagal sebagian tidak menggandakan baris.
+        """
+        return pd.concat(
+            [self.deletes[KEY_COLUMNS], self.updates[KEY_COLUMNS], self.inserts[KEY_COLUMNS]], ignore_index=True
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """Jumlah baris per kategori perubahan."""
+        return {
+            'insert': len(self.inserts),
+            'update': len(self.updates),
+            'delete': len(self.deletes),
+            'unchanged': self.unchanged,
+        }
+
+
+def compute_row_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    Menghitung hash stabil untuk setiap baris dari kolom isi produk.
+    Nilai dinormalisasi dulu (string, float64 yang dibulatkan, int64) agar hash
+    tidak berubah antar run maupun antar tipe data (misalnya category atau float32).
+    """
+    canonical = pd.DataFrame({
+        'title': df['title'].astype(str),
+        'price': df['price'].astype('float64').round(6),
+        'rating': df['rating'].astype('float64').round(6),
+        'colors': df['colors'].astype('int64'),
+        'size': df['size'].astype(str),
+        'gender': df['gender'].astype(str),
+    })
+    hashes = pd.util.hash_pandas_object(canonical, index=False)
+    return hashes.map('{:016x}'.format)
+
+
+def _connect(state_path: str) -> sqlite3.Connection:
+    """Membuka database state dan memastikan tabelnya ada."""
+    directory = os.path.dirname(state_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(state_path)
+    # State versi lama tidak menyimpan kombinasi tujuan sehingga tidak bisa dipakai lagi;
+    # tabel dibuat ulang dan run berikutnya menjadi load penuh
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(product_state)")]
+    if columns and 'sinks' not in columns:
+        with conn:
+            conn.execute("DROP TABLE product_state")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS product_state (
+            sinks TEXT NOT NULL,
+            title TEXT NOT NULL,
+            size TEXT NOT NULL,
+            gender TEXT NOT NULL,
+            row_hash TEXT NOT NULL,
+            PRIMARY KEY (sinks, title, size, gender)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalogue_state (
+            sinks TEXT PRIMARY KEY,
+            catalogue_hash TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+def load_state(state_path: str = None) -> pd.DataFrame:
+    """
+    Membaca hash produk yang sudah dimuat pada run sebelumnya ke tujuan LOAD_SINKS saat ini.
+    Kombinasi tujuan yang belum punya state (misalnya setelah tujuan baru ditambahkan) mendapat state kosong,
+    sehingga semua produk dimuat penuh.
+    """
+    conn = _connect(state_path or config.INCREMENTAL_STATE_PATH)
+    try:
+        return pd.read_sql_query(
+            "SELECT title, size, gender, row_hash FROM product_state WHERE sinks = ?", conn, params=(config.LOAD_SINKS,)
+        )
+    finally:
+        conn.close()
+
+
+def compute_changes(df: pd.DataFrame, state_path: str = None) -> ChangeSet:
+    """
+    Membandingkan DataFrame bersih dengan state yang tersimpan.
+    Produk dikenali lewat KEY_COLUMNS; jika kunci muncul lebih dari sekali, baris terakhir yang dipakai.
+    """
+    current = df.drop_duplicates(subset=KEY_COLUMNS, keep='last').reset_index(drop=True)
+    current = current.assign(row_hash=compute_row_hashes(current).to_numpy())
+    # Kunci dibandingkan sebagai string agar cocok dengan nilai yang dibaca dari SQLite
+    current_keys = current[KEY_COLUMNS].astype(str)
+    previous = load_state(state_path)
+
+    merged = current_keys.assign(row_hash=current['row_hash'].to_numpy()).merge(
+        previous, on=KEY_COLUMNS, how='outer', suffixes=('', '_prev'), indicator=True
+    )
+    in_current = merged[merged['_merge'] != 'right_only']
+    changed_keys = in_current.loc[
+        (in_current['_merge'] == 'both') & (in_current['row_hash'] != in_current['row_hash_prev']),
+        KEY_COLUMNS,
+    ]
+    new_keys = in_current.loc[in_current['_merge'] == 'left_only', KEY_COLUMNS]
+    deletes = merged.loc[merged['_merge'] == 'right_only', KEY_COLUMNS].reset_index(drop=True)
+
+    def rows_for(keys: pd.DataFrame) -> pd.DataFrame:
+        mask = pd.MultiIndex.from_frame(current_keys).isin(pd.MultiIndex.from_frame(keys))
+        return current.loc[mask].drop(columns='row_hash').reset_index(drop=True)
+
+    inserts = rows_for(new_keys)
+    updates = rows_for(changed_keys)
+    return ChangeSet(
+        current=current.drop(columns='row_hash'),
+        inserts=inserts,
+        updates=updates,
+        deletes=deletes,
+        unchanged=len(current) - len(inserts) - len(updates),
+    )
+
+
+def commit_state(df: pd.DataFrame, state_path: str = None):
+    """
+    Menyimpan hash semua produk saat ini sebagai state baru untuk tujuan LOAD_SINKS saat ini.
+    Dipanggil hanya setelah semua tujuan berhasil dimuat, sehingga run yang gagal akan diulang penuh.
+    """
+    current = df.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+    rows = current[KEY_COLUMNS].astype(str).assign(row_hash=compute_row_hashes(current).to_numpy())
+    rows.insert(0, 'sinks', config.LOAD_SINKS)
+    conn = _connect(state_path or config.INCREMENTAL_STATE_PATH)
+    try:
+        with conn:
+            conn.execute("DELETE FROM product_state WHERE sinks = ?", (config.LOAD_SINKS,))
+            conn.executemany(
+                "INSERT INTO product_state (sinks, title, size, gender, row_hash) VALUES (?, ?, ?, ?, ?)",
+                rows.itertuples(index=False, name=None),
+            )
+    finally:
+        conn.close()
+
+
+def transform_fingerprint(run_timestamp: datetime) -> dict:
+    """
+    Masukan transformasi dan validasi selain data mentah yang memengaruhi hasil load: mata uang target beserta
+    kurs yang berlaku pada `run_timestamp`, TRANSFORM_MODE, dan aturan validasi (jika VALIDATION_ENABLED).
+    """
+    currency_rates = rates.rates_as_of(run_timestamp).iloc[0]
+    return {
+        'price_currency': config.PRICE_CURRENCY.upper(),
+        'rates': {currency: float(rate) for currency, rate in currency_rates.items()},
+        'transform_mode': config.TRANSFORM_MODE,
+        'validation_rules': [rule._asdict() for rule in validate.default_rules()] if config.VALIDATION_ENABLED else None,
+    }
+
+
+def compute_catalogue_hash(raw_products: List[dict], fingerprint: Optional[dict] = None) -> str:
+    """
+    Menghitung hash SHA-256 isi katalog dari data mentah hasil extract, ditambah `fingerprint`
+    (lihat transform_fingerprint) agar perubahan kurs atau config transformasi tetap memicu load.
+    Setiap produk dinormalisasi (kunci terurut, tanpa nomor halaman asal) dan urutan produk tidak berpengaruh,
+    sehingga produk yang hanya berpindah halaman tidak dianggap perubahan.
+    """
+    products = sorted(
+        json.dumps({key: value for key, value in product.items() if key != 'source_page'}, sort_keys=True, ensure_ascii=False)
+        for product in raw_products
+    )
+    digest = hashlib.sha256()
+    for product in products:
+        digest.update(product.encode('utf-8'))
+        digest.update(b'\n')
+    if fingerprint is not None:
+        digest.update(json.dumps(fingerprint, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_catalogue_hash(state_path: str = None) -> Optional[str]:
+    """Hash katalog dari load terakhir yang berhasil ke tujuan LOAD_SINKS saat ini, atau None."""
+    conn = _connect(state_path or config.INCREMENTAL_STATE_PATH)
+    try:
+        row = conn.execute("SELECT catalogue_hash FROM catalogue_state WHERE sinks = ?", (config.LOAD_SINKS,)).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def commit_catalogue_hash(catalogue_hash: str, state_path: str = None):
+    """
+    Menyimpan hash katalog untuk tujuan LOAD_SINKS saat ini.
+    Dipanggil hanya setelah semua tujuan berhasil dimuat; hash disimpan per kombinasi tujuan
+    agar menambah tujuan baru tetap memicu load.
+    """
+    conn = _connect(state_path or config.INCREMENTAL_STATE_PATH)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO catalogue_state (sinks, catalogue_hash, updated_at) VALUES (?, ?, ?)",
+                (config.LOAD_SINKS, catalogue_hash, time.time()),
+            )
+    finally:
+        conn.close()
@@ -1,28 +1,152 @@
+import io
+import logging
+import os
+import shutil
+import threading
+import uuid
+import time
 import pandas as pd
-import gspread
-from gspread_dataframe import set_with_dataframe
-from sqlalchemy import create_engine
 import utils.config as config
+import utils.metrics as metrics
+from utils.incremental import KEY_COLUMNS
 
-def save_to_csv(df: pd.DataFrame):
+logger = logging.getLogger(__name__)
+
+# --- Impor malas pustaka berat ---
+# gspread, SQLAlchemy, dan pyarrow baru diimpor saat tujuan yang membutuhkannya dipakai,
+# sehingga run yang hanya memuat ke CSV tidak membayar waktu impornya.
+# Pembungkus di bawah tetap menjadi atribut modul ini agar bisa di-patch (misal 'utils.load.create_engine').
+
+def create_engine(*args, **kwargs):
+    from sqlalchemy import create_engine as sqlalchemy_create_engine
+    return sqlalchemy_create_engine(*args, **kwargs)
+
+def inspect(subject):
+    from sqlalchemy import inspect as sqlalchemy_inspect
+    return sqlalchemy_inspect(subject)
+
+def text(statement: str):
+    from sqlalchemy import text as sqlalchemy_text
+    return sqlalchemy_text(statement)
+
+def set_with_dataframe(worksheet, df: pd.DataFrame, **kwargs):
+    from gspread_dataframe import set_with_dataframe as gspread_set_with_dataframe
+    return gspread_set_with_dataframe(worksheet, df, **kwargs)
+
+# Jika True (diaktifkan scheduler lewat reuse_clients), client gspread dan engine PostgreSQL
+# dipakai ulang antar run alih-alih dibuat (dan diautentikasi) ulang setiap kali menyimpan
+_reuse_clients = False
+
+def reuse_clients(enabled: bool = True):
+    """Mengaktifkan atau menonaktifkan pemakaian ulang client Google Sheets dan engine PostgreSQL untuk proses ini."""
+    global _reuse_clients
+    _reuse_clients = enabled
+
+def _gspread_client():
+    """Membuat client gspread dari file kredensial service account (atau client bersama jika reuse_clients aktif)."""
+    if _reuse_clients:
+        from utils.gsheet import get_gsheet_client
+        return get_gsheet_client()
+    import gspread
+    return gspread.service_account(filename=config.GSHEET_CREDENTIALS_PATH)
+
+def save_to_gsheet_diff(df: pd.DataFrame) -> bool:
+    """Menulis hanya sel yang berubah ke Google Sheets (lihat utils.gsheet.save_to_gsheet_diff)."""
+    from utils.gsheet import save_to_gsheet_diff as gsheet_save_to_gsheet_diff
+    return gsheet_save_to_gsheet_diff(df)
+
+def save_to_csv(df: pd.DataFrame) -> bool:
     """
     Menyimpan DataFrame ke dalam file CSV.
+    Mengembalikan True jika berhasil.
     """
     try:
-        print(f"Menyimpan data ke CSV di path: {config.CSV_OUTPUT_PATH}...")
+        logger.info("Menyimpan data ke CSV di path: %s...", config.CSV_OUTPUT_PATH)
         df.to_csv(config.CSV_OUTPUT_PATH, index=False)
-        print("Data berhasil disimpan ke CSV.")
+        logger.info("Data berhasil disimpan ke CSV.")
+        return True
     except Exception as e:
-        print(f"Gagal menyimpan data ke CSV: {e}")
+        logger.error("Gagal menyimpan data ke CSV: %s", e)
+        return False
 
-def save_to_gsheet(df: pd.DataFrame):
+def _parquet_partition_columns() -> list:
+    """Daftar kolom partisi Parquet dari config.PARQUET_PARTITION_COLS (dipisah koma)."""
+    return [column.strip() for column in config.PARQUET_PARTITION_COLS.split(",") if column.strip()]
+
+def save_to_parquet(df: pd.DataFrame, overwrite: bool = None) -> bool:
+    """
+    Menyimpan DataFrame sebagai dataset Parquet terkompresi dan terpartisi (gaya Hive) di PARQUET_OUTPUT_PATH.
+    Setiap pemanggilan menulis file baru dengan nama unik, sehingga run berikutnya cukup menambah file (append-only).
+    Jika `overwrite` (default mengikuti PARQUET_WRITE_MODE), dataset lama dihapus lebih dulu.
+    Partisi 'run_date' dibentuk dari kolom timestamp. Mengembalikan True jika berhasil.
+    """
+    if overwrite is None:
+        overwrite = config.PARQUET_WRITE_MODE == "overwrite"
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        logger.info("Menyimpan data ke Parquet di path: %s...", config.PARQUET_OUTPUT_PATH)
+        partition_columns = _parquet_partition_columns()
+        if "run_date" in partition_columns:
+            df = df.assign(run_date=df["timestamp"].dt.strftime("%Y-%m-%d"))
+        if overwrite and os.path.exists(config.PARQUET_OUTPUT_PATH):
+            shutil.rmtree(config.PARQUET_OUTPUT_PATH)
+
+        ds.write_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            config.PARQUET_OUTPUT_PATH,
+            format="parquet",
+            partitioning=partition_columns or None,
+            partitioning_flavor="hive",
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=ds.ParquetFileFormat().make_write_options(compression=config.PARQUET_COMPRESSION),
+        )
+        logger.info("Data berhasil disimpan ke Parquet.")
+        return True
+    except Exception as e:
+        logger.error("Gagal menyimpan data ke Parquet: %s", e)
+        return False
+
+def read_parquet(path: str = None, columns: list = None, filters=None) -> pd.DataFrame:
+    """
+    Membaca dataset Parquet (default PARQUET_OUTPUT_PATH) dengan memory-map sehingga file tidak disalin ke memori
+    sebelum didekode. `columns` dan `filters` (misal [('gender', '=', 'Men')]) diteruskan ke pyarrow agar
+    hanya kolom dan partisi yang dibutuhkan yang dibaca.
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path or config.PARQUET_OUTPUT_PATH, columns=columns, filters=filters, memory_map=True)
+    return table.to_pandas()
+
+def read_snapshot(path: str) -> pd.DataFrame:
+    """
+    Membaca data bersih yang sudah pernah dimuat (snapshot CSV atau dataset Parquet) untuk run load saja.
+    Path berupa direktori atau berakhiran .parquet dibaca sebagai Parquet; kolom partisi 'run_date'
+    dibuang dan kolom partisi lain dikembalikan ke string. Selain itu dibaca sebagai CSV.
+    """
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        df = read_parquet(path)
+        if "run_date" in df.columns:
+            df = df.drop(columns="run_date")
+        for column in df.select_dtypes(include="category").columns:
+            df[column] = df[column].astype(str)
+        return df
+    df = pd.read_csv(path)
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df
+
+def save_to_gsheet(df: pd.DataFrame) -> bool:
     """
     Menyimpan DataFrame ke dalam Google Sheets.
+    Mengembalikan True jika berhasil.
     """
     try:
-        print(f"Menyimpan data ke Google Sheets...")
+        logger.info("Menyimpan data ke Google Sheets...")
         # Autentikasi menggunakan file kredensial
-        gc = gspread.service_account(filename=config.GSHEET_CREDENTIALS_PATH)
+        gc = _gspread_client()
         # Buka spreadsheet berdasarkan URL
         spreadsheet = gc.open_by_url(config.GSHEET_URL)
         # Pilih worksheet pertama (index 0)
@@ -33,20 +157,24 @@ def save_to_gsheet(df: pd.DataFrame):
         
         # Tulis DataFrame ke worksheet
         set_with_dataframe(worksheet, df)
-        print("Data berhasil disimpan ke Google Sheets.")
+        logger.info("Data berhasil disimpan ke Google Sheets.")
+        return True
     except FileNotFoundError:
-        print(f"File kredensial tidak ditemukan di path: {config.GSHEET_CREDENTIALS_PATH}")
+        logger.error("File kredensial tidak ditemukan di path: %s", config.GSHEET_CREDENTIALS_PATH)
+        return False
     except Exception as e:
-        print(f"Gagal menyimpan data ke Google Sheets: {e}")
+        logger.error("Gagal menyimpan data ke Google Sheets: %s", e)
+        return False
 
-def save_to_postgres(df: pd.DataFrame):
+def save_to_postgres(df: pd.DataFrame) -> bool:
     """
     Menyimpan DataFrame ke dalam tabel database PostgreSQL.
+    Mengembalikan True jika berhasil.
     """
     try:
-        print(f"Menyimpan data ke PostgreSQL...")
-        # Buat engine koneksi ke database menggunakan SQLAlchemy
-        engine = create_engine(config.DATABASE_URL)
+        logger.info("Menyimpan data ke PostgreSQL...")
+        # Buat engine koneksi ke database menggunakan SQLAlchemy (engine bersama jika reuse_clients aktif)
+        engine = get_engine() if _reuse_clients else create_engine(config.DATABASE_URL)
         
         # Simpan DataFrame ke tabel, ganti tabel jika sudah ada
         df.to_sql(
@@ -55,6 +183,325 @@ def save_to_postgres(df: pd.DataFrame):
             if_exists='replace',
             index=False
         )
-        print(f"Data berhasil disimpan ke tabel '{config.DB_TABLE_NAME}' di PostgreSQL.")
+        logger.info("Data berhasil disimpan ke tabel '%s' di PostgreSQL.", config.DB_TABLE_NAME)
+        return True
+    except Exception as e:
+        logger.error("Gagal menyimpan data ke PostgreSQL: %s", e)
+        return False
+
+def append_to_csv(df: pd.DataFrame, first_chunk: bool) -> bool:
+    """
+    Menulis satu chunk DataFrame ke file CSV untuk pipeline streaming.
+    Chunk pertama menimpa file beserta header, chunk berikutnya ditambahkan di akhir file.
+    Mengembalikan True jika berhasil.
+    """
+    try:
+        df.to_csv(
+            config.CSV_OUTPUT_PATH,
+            mode='w' if first_chunk else 'a',
+            header=first_chunk,
+            index=False
+        )
+        logger.info("%s baris ditambahkan ke CSV.", len(df))
+        return True
+    except Exception as e:
+        logger.error("Gagal menambahkan data ke CSV: %s", e)
+        return False
+
+def open_gsheet_worksheet():
+    """
+    Membuka worksheet pertama dari Google Sheet tujuan.
+    Mengembalikan None jika autentikasi atau pembukaan sheet gagal.
+    """
+    try:
+        gc = _gspread_client()
+        return gc.open_by_url(config.GSHEET_URL).get_worksheet(0)
+    except Exception as e:
+        logger.error("Gagal membuka Google Sheets: %s", e)
+        return None
+
+def append_to_gsheet(df: pd.DataFrame, worksheet, first_chunk: bool) -> bool:
+    """
+    Menulis satu chunk DataFrame ke worksheet untuk pipeline streaming.
+    Chunk pertama membersihkan worksheet dan menulis header, chunk berikutnya ditambahkan sebagai baris baru.
+    Mengembalikan True jika berhasil (False juga jika worksheet gagal dibuka).
+    """
+    if worksheet is None:
+        return False
+    try:
+        if first_chunk:
+            worksheet.clear()
+            set_with_dataframe(worksheet, df)
+        else:
+            # Konversi ke string agar nilai seperti timestamp bisa dikirim sebagai JSON
+            worksheet.append_rows(df.astype(str).values.tolist())
+        logger.info("%s baris ditambahkan ke Google Sheets.", len(df))
+        return True
+    except Exception as e:
+        logger.error("Gagal menambahkan data ke Google Sheets: %s", e)
+        return False
+
+def open_postgres_engine():
+    """
+    Mengambil engine SQLAlchemy (dengan connection pool bersama) ke database PostgreSQL.
+    Mengembalikan None jika engine gagal dibuat.
+    """
+    try:
+        return get_engine()
+    except Exception as e:
+        logger.error("Gagal membuat koneksi ke PostgreSQL: %s", e)
+        return None
+
+def append_to_postgres(df: pd.DataFrame, engine, first_chunk: bool) -> bool:
+    """
+    Menulis satu chunk DataFrame ke tabel PostgreSQL untuk pipeline streaming.
+    Chunk pertama mengganti tabel, chunk berikutnya ditambahkan ke tabel yang sama.
+    Mengembalikan True jika berhasil (False juga jika engine gagal dibuat).
+    """
+    if engine is None:
+        return False
+    try:
+        df.to_sql(
+            name=config.DB_TABLE_NAME,
+            con=engine,
+            if_exists='replace' if first_chunk else 'append',
+            index=False
+        )
+        logger.info("%s baris ditambahkan ke tabel '%s'.", len(df), config.DB_TABLE_NAME)
+        return True
+    except Exception as e:
+        logger.error("Gagal menambahkan data ke PostgreSQL: %s", e)
+        return False
+
+# --- Pemuatan inkremental (hanya perubahan) ---
+
+def _drop_keys(df: pd.DataFrame, keys: pd.DataFrame, key_columns: list) -> pd.DataFrame:
+    """Membuang baris DataFrame yang kuncinya ada di `keys`."""
+    if keys.empty or df.empty:
+        return df
+    mask = pd.MultiIndex.from_frame(df[key_columns].astype(str)).isin(
+        pd.MultiIndex.from_frame(keys[key_columns].astype(str))
+    )
+    return df[~mask]
+
+def apply_changes_to_csv(changes) -> bool:
+    """
+    Menerapkan ChangeSet ke file CSV: baris dengan kunci yang dihapus/berubah/baru dibuang, lalu baris baru/berubah ditambahkan.
+    Jika file belum ada, seluruh data saat ini ditulis. Tidak ada yang ditulis jika tidak ada perubahan.
+    """
+    if changes.is_empty:
+        logger.info("CSV: tidak ada perubahan, file tidak ditulis ulang.")
+        return True
+    try:
+        if not os.path.exists(config.CSV_OUTPUT_PATH):
+            return save_to_csv(changes.current)
+        existing = pd.read_csv(config.CSV_OUTPUT_PATH)
+        existing = _drop_keys(existing, changes.removed_keys, KEY_COLUMNS)
+        # Baris lama yang tersisa bisa kosong jika semua kuncinya ikut diganti
+        frames = [frame for frame in (existing, changes.upserts) if not frame.empty]
+        result = pd.concat(frames, ignore_index=True) if frames else existing
+        result.to_csv(config.CSV_OUTPUT_PATH, index=False)
+        logger.info("Perubahan berhasil diterapkan ke CSV: %s", changes.counts())
+        return True
+    except Exception as e:
+        logger.error("Gagal menerapkan perubahan ke CSV: %s", e)
+        return False
+
+def apply_changes_to_gsheet(changes) -> bool:
+    """
+    Menerapkan ChangeSet ke Google Sheets.
+    Worksheet hanya ditulis jika ada perubahan, dan selalu lewat penulis diff (apa pun GSHEET_WRITE_METHOD):
+    hanya sel yang berbeda dari isi worksheet yang dikirim, bukan kosongkan lalu tulis ulang seluruh data.
+    """
+    if changes.is_empty:
+        logger.info("Google Sheets: tidak ada perubahan, worksheet tidak ditulis ulang.")
+        return True
+    return save_to_gsheet_diff(changes.current)
+
+def apply_changes_to_postgres(changes) -> bool:
+    """
+    Menerapkan ChangeSet ke tabel PostgreSQL dalam satu transaksi:
+    DELETE untuk kunci produk yang dihapus/berubah/baru, lalu INSERT untuk produk baru/berubah.
+    Karena kunci baris baru ikut dihapus, ChangeSet yang sama aman diterapkan ulang.
+    Jika tabel belum ada, seluruh data saat ini dimuat.
+    """
+    if changes.is_empty:
+        logger.info("PostgreSQL: tidak ada perubahan.")
+        return True
+    try:
+        engine = get_engine()
+        if not inspect(engine).has_table(config.DB_TABLE_NAME):
+            changes.current.to_sql(name=config.DB_TABLE_NAME, con=engine, if_exists='replace', index=False)
+            logger.info("Tabel '%s' belum ada, seluruh data dimuat.", config.DB_TABLE_NAME)
+            return True
+
+        removed_keys = changes.removed_keys
+        condition = " AND ".join(f"{column} = :{column}" for column in KEY_COLUMNS)
+        with engine.begin() as conn:
+            if not removed_keys.empty:
+                conn.execute(
+                    text(f'DELETE FROM "{config.DB_TABLE_NAME}" WHERE {condition}'),
+                    removed_keys.astype(str).to_dict('records'),
+                )
+            if not changes.upserts.empty:
+                changes.upserts.to_sql(name=config.DB_TABLE_NAME, con=conn, if_exists='append', index=False)
+        logger.info("Perubahan berhasil diterapkan ke PostgreSQL: %s", changes.counts())
+        return True
+    except Exception as e:
+        logger.error("Gagal menerapkan perubahan ke PostgreSQL: %s", e)
+        return False
+
+# --- Loader PostgreSQL berkapasitas tinggi (COPY + upsert) ---
+
+# Engine bersama per URL database, agar connection pool dipakai ulang antar pemanggilan
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(url: str = None):
+    """
+    Mengembalikan engine SQLAlchemy bersama untuk URL database (default config.DATABASE_URL).
+    Engine hanya dibuat sekali per proses sehingga koneksi di pool dipakai ulang.
+    """
+    url = url or config.DATABASE_URL
+    with _engines_lock:
+        if url not in _engines:
+            options = {'pool_pre_ping': True}
+            if str(url).startswith('postgresql'):
+                options['pool_size'] = config.DB_POOL_SIZE
+            _engines[url] = create_engine(url, **options)
+        return _engines[url]
+
+def dispose_engines():
+    """Menutup semua koneksi di pool engine bersama dan melupakan engine-nya."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+def _sql_type(dtype) -> str:
+    """Memetakan dtype pandas ke tipe kolom SQL yang dipahami PostgreSQL maupun SQLite."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'DOUBLE PRECISION'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'TIMESTAMP'
+    return 'TEXT'
+
+def _ensure_upsert_table(conn, df: pd.DataFrame, table: str):
+    """
+    Membuat tabel tujuan jika belum ada, dan memastikan ada unique index pada kunci alami
+    yang dibutuhkan oleh INSERT ... ON CONFLICT.
+    Tabel lama (misalnya hasil to_sql dari save_to_postgres) dimigrasikan lebih dulu: kolom DataFrame yang belum ada
+    (misalnya price_<kode> dari EXTRA_CURRENCIES) ditambahkan, dan jika index belum ada, baris dengan kunci ganda
+    dihapus agar index bisa dibuat; kunci tersebut diisi ulang dari DataFrame oleh upsert.
+    """
+    index = f"{table}_natural_key"
+    key = ", ".join(f'"{column}"' for column in KEY_COLUMNS)
+    inspector = inspect(conn)
+    if not inspector.has_table(table):
+        columns = ", ".join(f'"{column}" {_sql_type(dtype)}' for column, dtype in df.dtypes.items())
+        conn.exec_driver_sql(f'CREATE TABLE IF NOT EXISTS "{table}" ({columns})')
+    else:
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for column, dtype in df.dtypes.items():
+            if column not in existing:
+                conn.exec_driver_sql(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {_sql_type(dtype)}')
+                logger.info("Kolom '%s' ditambahkan ke tabel '%s'.", column, table)
+        if index not in {existing_index['name'] for existing_index in inspector.get_indexes(table)}:
+            duplicated = conn.exec_driver_sql(
+                f'DELETE FROM "{table}" WHERE ({key}) IN '
+                f'(SELECT {key} FROM "{table}" GROUP BY {key} HAVING COUNT(*) > 1)'
+            ).rowcount
+            if duplicated:
+                logger.warning(
+                    "%s baris dengan kunci (%s) ganda dihapus dari tabel '%s' sebelum unique index dibuat.",
+                    duplicated, ", ".join(KEY_COLUMNS), table,
+                )
+    conn.exec_driver_sql(f'CREATE UNIQUE INDEX IF NOT EXISTS "{index}" ON "{table}" ({key})')
+
+def _copy_chunk(conn, staging: str, chunk: pd.DataFrame):
+    """Mengalirkan satu chunk ke tabel staging lewat COPY FROM STDIN (psycopg2)."""
+    buffer = io.StringIO()
+    chunk.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    columns = ", ".join(f'"{column}"' for column in chunk.columns)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY "{staging}" ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+    finally:
+        cursor.close()
+
+def _insert_chunk(conn, staging: str, chunk: pd.DataFrame):
+    """Memasukkan satu chunk ke tabel staging dengan executemany (untuk database selain PostgreSQL, misal SQLite)."""
+    columns = ", ".join(f'"{column}"' for column in chunk.columns)
+    params = ", ".join(f":{column}" for column in chunk.columns)
+    chunk = chunk.copy()
+    # Driver seperti sqlite3 tidak menerima pd.Timestamp, jadi dikirim sebagai string ISO
+    for column in chunk.select_dtypes(include=['datetime', 'datetimetz']).columns:
+        chunk[column] = chunk[column].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+    records = chunk.astype(object).where(chunk.notna(), None).to_dict('records')
+    conn.execute(text(f'INSERT INTO "{staging}" ({columns}) VALUES ({params})'), records)
+
+def save_to_postgres_bulk(df: pd.DataFrame, chunksize: int = None, delete_missing: bool = True) -> bool:
+    """
+    Memuat DataFrame ke tabel PostgreSQL dengan throughput tinggi dalam satu transaksi:
+    1. Data dialirkan per chunk ke tabel staging sementara memakai COPY FROM STDIN.
+    2. Staging di-upsert ke DB_TABLE_NAME dengan INSERT ... ON CONFLICT pada kunci alami (title, size, gender).
+    3. Jika `delete_missing`, produk yang tidak ada lagi di DataFrame dihapus dari tabel.
+    Tabel tidak pernah di-drop, sehingga index tetap ada dan pembaca selalu melihat data yang konsisten.
+    Baris dengan kunci alami ganda hanya dimuat sekali (baris terakhir); sisanya dicatat sebagai peringatan
+    dan metrik `load_rows_dropped{sink=postgres,reason=duplicate_key}`.
+    Mengembalikan True jika berhasil.
+    """
+    table = config.DB_TABLE_NAME
+    staging = f"{table}_staging"
+    chunksize = chunksize or config.DB_CHUNK_SIZE
+    # ON CONFLICT tidak boleh menyentuh baris yang sama dua kali dalam satu perintah
+    duplicated = df.duplicated(subset=KEY_COLUMNS, keep='last')
+    if duplicated.any():
+        logger.warning(
+            "%s baris dengan kunci (%s) ganda tidak dimuat ke tabel '%s'; hanya baris terakhir per kunci yang dipakai.",
+            int(duplicated.sum()), ", ".join(KEY_COLUMNS), table,
+        )
+        metrics.inc("load_rows_dropped", int(duplicated.sum()), sink="postgres", reason="duplicate_key")
+        df = df[~duplicated]
+    columns = ", ".join(f'"{column}"' for column in df.columns)
+    key = ", ".join(f'"{column}"' for column in KEY_COLUMNS)
+    updates = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in df.columns if column not in KEY_COLUMNS)
+    key_match = " AND ".join(f's."{column}" = "{table}"."{column}"' for column in KEY_COLUMNS)
+
+    try:
+        logger.info("Menyimpan data ke database dengan bulk upsert (%s baris)...", len(df))
+        start = time.perf_counter()
+        engine = get_engine()
+        with engine.begin() as conn:
+            _ensure_upsert_table(conn, df, table)
+            conn.exec_driver_sql(f'CREATE TEMP TABLE "{staging}" AS SELECT {columns} FROM "{table}" WHERE 1 = 0')
+
+            load_chunk = _copy_chunk if conn.dialect.name == 'postgresql' else _insert_chunk
+            for offset in range(0, len(df), chunksize):
+                load_chunk(conn, staging, df.iloc[offset:offset + chunksize])
+
+            # Index pada kunci staging membuat anti-join DELETE di bawah tidak kuadratik
+            conn.exec_driver_sql(f'CREATE INDEX "{staging}_key" ON "{staging}" ({key})')
+            # 'WHERE true' diperlukan SQLite agar ON CONFLICT tidak dianggap bagian dari SELECT
+            conn.exec_driver_sql(
+                f'INSERT INTO "{table}" ({columns}) SELECT {columns} FROM "{staging}" WHERE true '
+                f'ON CONFLICT ({key}) DO UPDATE SET {updates}'
+            )
+            if delete_missing:
+                conn.exec_driver_sql(
+                    f'DELETE FROM "{table}" WHERE NOT EXISTS (SELECT 1 FROM "{staging}" s WHERE {key_match})'
+                )
+            conn.exec_driver_sql(f'DROP TABLE "{staging}"')
+
+        elapsed = time.perf_counter() - start
+        rate = len(df) / elapsed if elapsed > 0 else float('inf')
+        logger.info("%s baris di-upsert ke tabel '%s' dalam %.2f detik (%.0f baris/detik).", len(df), table, elapsed, rate)
+        return True
     except Exception as e:
-        print(f"Gagal menyimpan data ke PostgreSQL: {e}")
\ No newline at end of file
+        logger.error("Gagal menyimpan data ke database dengan bulk upsert: %s", e)
+        return False
@@ -0,0 +1,219 @@
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import utils.config as config
+
+# Status instrumentasi; jika nonaktif, span() dan inc() langsung kembali tanpa mencatat apa pun
+_enabled = config.METRICS_ENABLED
+_lock = threading.Lock()
+# Kunci metrik: (nama, label terurut sebagai tuple pasangan)
+_counters: Dict[Tuple[str, tuple], float] = {}
+_spans: Dict[Tuple[str, tuple], list] = {}
+_started_at = datetime.now()
+
+# Context manager kosong yang dipakai ulang saat instrumentasi nonaktif
+_NULL_SPAN = contextlib.nullcontext()
+
+def enable(enabled: bool = True):
+    """Mengaktifkan atau menonaktifkan pencatatan metrik untuk proses ini."""
+    global _enabled
+    _enabled = enabled
+
+def is_enabled() -> bool:
+    return _enabled
+
+def reset():
+    """Menghapus semua metrik yang sudah tercatat dan memulai run baru."""
+    global _started_at
+    with _lock:
+        _counters.clear()
+        _spans.clear()
+        _started_at = datetime.now()
+
+def _key(name: str, labels: dict) -> Tuple[str, tuple]:
+    return name, tuple(sorted(labels.items()))
+
+def inc(name: str, value: float = 1, **labels):
+    """Menambah counter `name` (dengan label opsional) sebesar `value`."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name: str, seconds: float, **labels):
+    """Mencatat satu durasi ke span `name`: jumlah, total, dan maksimum."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        stats = _spans.get(key)
+        if stats is None:
+            _spans[key] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+class _Span:
+    """Context manager yang mengukur durasi blok kode dan mencatatnya lewat observe()."""
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        if exc_type is not None:
+            inc("span_errors", span=self.name, **self.labels)
+        return False
+
+def span(name: str, **labels):
+    """
+    Mengukur durasi sebuah blok kode:
+        with metrics.span("extract.fetch"):
+            ...
+    Saat instrumentasi nonaktif, yang dikembalikan context manager kosong yang sama setiap kali.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, labels)
+
+def snapshot() -> dict:
+    """Mengembalikan salinan semua metrik dalam bentuk dict yang siap diserialisasi ke JSON."""
+    with _lock:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+        spans = [
+            {"name": name, "labels": dict(labels), "count": count, "total_seconds": total, "max_seconds": maximum}
+            for (name, labels), (count, total, maximum) in sorted(_spans.items())
+        ]
+    return {
+        "started_at": _started_at.isoformat(timespec="seconds"),
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "counters": counters,
+        "spans": spans,
+    }
+
+def _atomic_write(path: str, content: str):
+    """Menulis file lewat file sementara lalu rename agar pembaca tidak melihat file setengah jadi."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+def write_json_report(path: str, report: Optional[dict] = None):
+    """Menyimpan laporan run (snapshot metrik) sebagai file JSON."""
+    _atomic_write(path, json.dumps(report or snapshot(), indent=2))
+
+def _prometheus_name(name: str) -> str:
+    return "etl_" + name.replace(".", "_").replace("-", "_")
+
+def _prometheus_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+def render_prometheus(report: Optional[dict] = None) -> str:
+    """
+    Mengubah snapshot metrik ke format teks Prometheus (untuk textfile collector node_exporter).
+    Counter menjadi `etl_<nama>_total`; span menjadi `etl_span_seconds_{count,sum,max}` dengan label `span`.
+    """
+    report = report or snapshot()
+    lines = []
+    declared = set()
+    for counter in report["counters"]:
+        metric = _prometheus_name(counter["name"]) + "_total"
+        if metric not in declared:
+            lines.append(f"# TYPE {metric} counter")
+            declared.add(metric)
+        lines.append(f"{metric}{_prometheus_labels(counter['labels'])} {counter['value']}")
+
+    if report["spans"]:
+        for suffix, field, kind in (("count", "count", "counter"), ("sum", "total_seconds", "counter"), ("max", "max_seconds", "gauge")):
+            metric = f"etl_span_seconds_{suffix}"
+            lines.append(f"# TYPE {metric} {kind}")
+            for item in report["spans"]:
+                labels = {"span": item["name"], **item["labels"]}
+                lines.append(f"{metric}{_prometheus_labels(labels)} {item[field]}")
+
+    lines.append("# TYPE etl_last_run_timestamp_seconds gauge")
+    lines.append(f"etl_last_run_timestamp_seconds {datetime.fromisoformat(report['finished_at']).timestamp():.0f}")
+    return "\n".join(lines) + "\n"
+
+def write_prometheus_textfile(path: str, report: Optional[dict] = None):
+    """Menyimpan metrik dalam format teks Prometheus."""
+    _atomic_write(path, render_prometheus(report))
+
+def export():
+    """
+    Menulis laporan run ke path yang dikonfigurasi (METRICS_REPORT_PATH, METRICS_PROMETHEUS_PATH).
+    Tidak melakukan apa pun jika instrumentasi nonaktif.
+    """
+    if not _enabled:
+        return
+    report = snapshot()
+    if config.METRICS_REPORT_PATH:
+        write_json_report(config.METRICS_REPORT_PATH, report)
+        logging.getLogger(__name__).info("Laporan metrik disimpan ke %s", config.METRICS_REPORT_PATH)
+    if config.METRICS_PROMETHEUS_PATH:
+        write_prometheus_textfile(config.METRICS_PROMETHEUS_PATH, report)
+        logging.getLogger(__name__).info("Metrik Prometheus disimpan ke %s", config.METRICS_PROMETHEUS_PATH)
+
+
+# Atribut standar LogRecord; atribut lain dianggap field tambahan dari `extra=`
+_RESERVED_LOG_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """Formatter log satu baris JSON per record, termasuk field tambahan dari `extra=`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_LOG_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None):
+    """
+    Mengatur logging root untuk pipeline: level dari LOG_LEVEL dan format dari LOG_FORMAT
+    ("text" untuk teks biasa, "json" untuk satu baris JSON per log). Output ke stdout.
+    """
+    level = level or config.LOG_LEVEL
+    fmt = fmt or config.LOG_FORMAT
+    handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper())
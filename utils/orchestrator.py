@@ -0,0 +1,264 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+import utils.config as config
+import utils.load as load
+import utils.metrics as metrics
+
+logger = logging.getLogger(__name__)
+
+# Thread sink yang melewati timeout tetapi masih menulis: nama sink -> thread
+_lingering: Dict[str, threading.Thread] = {}
+_lingering_lock = threading.Lock()
+
+
+class Sink(NamedTuple):
+    """Satu tujuan pemuatan: fungsi penulis beserta kebijakan timeout dan retry-nya."""
+    name: str
+    # Fungsi yang menulis data ke tujuan dan mengembalikan True jika berhasil
+    write: Callable[[object], bool]
+    timeout: float
+    retries: int
+    # Fungsi opsional yang mengembalikan ukuran output (byte) setelah penulisan
+    size: Optional[Callable[[], int]] = None
+
+
+class SinkResult(NamedTuple):
+    """Hasil pemuatan ke satu tujuan."""
+    name: str
+    success: bool
+    rows: int
+    bytes_written: Optional[int]
+    latency: float
+    attempts: int
+    error: Optional[str] = None
+
+
+def _path_size(path: str) -> Optional[int]:
+    """Ukuran file, atau total ukuran semua file di dalam direktori, dalam byte."""
+    if not path or not os.path.exists(path):
+        return None
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def _row_count(payload) -> int:
+    """Jumlah baris yang dikirim: panjang DataFrame, atau jumlah insert/update/delete untuk ChangeSet."""
+    if isinstance(payload, pd.DataFrame):
+        return len(payload)
+    return len(payload.inserts) + len(payload.updates) + len(payload.deletes)
+
+
+def _sink_setting(mapping: str, name: str, default: float) -> float:
+    """Membaca nilai khusus sink dari string 'nama=nilai,...' di config, atau nilai default."""
+    for item in mapping.split(","):
+        key, _, value = item.partition("=")
+        if key.strip() == name and value.strip():
+            return float(value)
+    return default
+
+
+def build_default_sinks(incremental: bool = False) -> List[Sink]:
+    """
+    Membangun daftar sink dari config.LOAD_SINKS, dengan timeout/retry dari
+    LOAD_SINK_TIMEOUT/LOAD_SINK_RETRIES (bisa ditimpa per sink lewat LOAD_SINK_TIMEOUTS/LOAD_SINK_RETRY_COUNTS).
+    Jika `incremental`, sink menerima ChangeSet dan hanya menerapkan perubahan.
+    """
+    postgres_writer = load.save_to_postgres_bulk if config.DB_LOAD_METHOD == "upsert" else load.save_to_postgres
+    gsheet_writer = load.save_to_gsheet_diff if config.GSHEET_WRITE_METHOD == "diff" else load.save_to_gsheet
+    writers = {
+        "csv": (load.apply_changes_to_csv if incremental else load.save_to_csv, lambda: _path_size(config.CSV_OUTPUT_PATH)),
+        "parquet": (load.save_to_parquet, lambda: _path_size(config.PARQUET_OUTPUT_PATH)),
+        "gsheet": (load.apply_changes_to_gsheet if incremental else gsheet_writer, None),
+        "postgres": (load.apply_changes_to_postgres if incremental else postgres_writer, None),
+    }
+
+    sinks = []
+    for name in (item.strip() for item in config.LOAD_SINKS.split(",")):
+        if name not in writers:
+            continue
+        # Output Parquet hanya aktif jika path-nya dikonfigurasi, dan tidak dipakai pada mode inkremental
+        if name == "parquet" and (incremental or not config.PARQUET_OUTPUT_PATH):
+            continue
+        write, size = writers[name]
+        sinks.append(Sink(
+            name=name,
+            write=write,
+            timeout=_sink_setting(config.LOAD_SINK_TIMEOUTS, name, config.LOAD_SINK_TIMEOUT),
+            retries=int(_sink_setting(config.LOAD_SINK_RETRY_COUNTS, name, config.LOAD_SINK_RETRIES)),
+            size=size,
+        ))
+    return sinks
+
+
+def _run_sink(sink: Sink, payload, deadline: float) -> SinkResult:
+    """
+    Menjalankan satu sink dengan retry dan exponential backoff sampai berhasil, jatah retry habis,
+    atau batas waktunya terlewati. Exception tidak pernah keluar dari fungsi ini agar sink lain tidak terganggu.
+    """
+    start = time.perf_counter()
+    attempts = 0
+    error = None
+    while True:
+        attempts += 1
+        metrics.inc("sink_attempts", sink=sink.name)
+        try:
+            with metrics.span("load.sink", sink=sink.name):
+                success = sink.write(payload)
+            if success:
+                rows = _row_count(payload)
+                bytes_written = sink.size() if sink.size else None
+                metrics.inc("rows_loaded", rows, sink=sink.name)
+                if bytes_written is not None:
+                    metrics.inc("bytes_written", bytes_written, sink=sink.name)
+                return SinkResult(sink.name, True, rows, bytes_written, time.perf_counter() - start, attempts)
+            error = "penulisan gagal"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        delay = config.LOAD_RETRY_BACKOFF * (2 ** (attempts - 1))
+        if attempts > sink.retries or time.monotonic() + delay >= deadline:
+            metrics.inc("sink_failures", sink=sink.name)
+            return SinkResult(sink.name, False, 0, None, time.perf_counter() - start, attempts, error)
+        logger.warning("Sink '%s' gagal (%s), mencoba lagi dalam %.1f detik...", sink.name, error, delay)
+        time.sleep(delay)
+
+
+def _start_sink(sink: Sink, payload, deadline: float, slots: threading.Semaphore):
+    """
+    Menjalankan sink di daemon thread dan mengembalikan (Future, thread).
+    Daemon thread tidak ditunggu saat proses keluar, sehingga sink yang macet tidak menahan exit.
+    """
+    future = Future()
+
+    def target():
+        with slots:
+            if future.set_running_or_notify_cancel():
+                future.set_result(_run_sink(sink, payload, deadline))
+
+    thread = threading.Thread(target=target, name=f"sink-{sink.name}", daemon=True)
+    thread.start()
+    return future, thread
+
+
+def _still_running(name: str) -> bool:
+    """True jika penulisan sink `name` dari run sebelumnya yang melewati timeout masih berjalan."""
+    with _lingering_lock:
+        thread = _lingering.get(name)
+        if thread is not None and not thread.is_alive():
+            del _lingering[name]
+            thread = None
+    return thread is not None
+
+
+def run_sinks(payload, sinks: List[Sink], max_workers: int = None) -> List[SinkResult]:
+    """
+    Memuat payload (DataFrame atau ChangeSet) ke semua sink secara paralel, masing-masing di daemon thread
+    (paling banyak `max_workers` sink sekaligus).
+    Setiap sink terisolasi: error, retry, dan timeout satu sink tidak memblokir atau mengubah hasil sink lain.
+    Sink yang melewati timeout dilaporkan gagal; thread-nya dibiarkan selesai di latar belakang tanpa menahan
+    exit proses, dan selama masih berjalan sink yang sama pada run berikutnya langsung dilaporkan gagal
+    agar dua penulisan ke tujuan yang sama tidak tumpang tindih.
+    Mengembalikan SinkResult untuk setiap sink, sesuai urutan `sinks`.
+    """
+    if not sinks:
+        return []
+    if isinstance(payload, pd.DataFrame):
+        # Salinan dangkal per sink: data tidak diduplikasi, tetapi penambahan/penghapusan kolom
+        # oleh satu sink tidak terlihat oleh sink lain
+        payloads = [payload.copy(deep=False) for _ in sinks]
+    else:
+        payloads = [payload for _ in sinks]
+
+    max_workers = max_workers or config.LOAD_CONCURRENCY or len(sinks)
+    slots = threading.Semaphore(max_workers)
+    started = time.monotonic()
+    running = {}
+    for sink, sink_payload in zip(sinks, payloads):
+        if _still_running(sink.name):
+            logger.warning("Penulisan sink '%s' dari run sebelumnya masih berjalan; sink ini dilewati.", sink.name)
+            continue
+        running[sink.name] = _start_sink(sink, sink_payload, started + sink.timeout, slots)
+
+    results = []
+    for sink in sinks:
+        if sink.name not in running:
+            metrics.inc("sink_failures", sink=sink.name)
+            results.append(SinkResult(sink.name, False, 0, None, 0.0, 0, "penulisan sebelumnya masih berjalan"))
+            continue
+        future, thread = running[sink.name]
+        remaining = max(0.0, started + sink.timeout - time.monotonic())
+        try:
+            results.append(future.result(timeout=remaining))
+        except FutureTimeoutError:
+            if not future.cancel():
+                # Sink sudah mulai menulis; thread-nya tetap berjalan sampai selesai sendiri
+                with _lingering_lock:
+                    _lingering[sink.name] = thread
+            metrics.inc("sink_failures", sink=sink.name)
+            results.append(SinkResult(
+                sink.name, False, 0, None, time.monotonic() - started, 0, f"timeout setelah {sink.timeout:.0f} detik"
+            ))
+    return results
+
+
+def run_sink(sink: Sink, payload) -> SinkResult:
+    """
+    Menjalankan satu sink secara sinkron di thread pemanggil, dengan retry dan backoff dalam batas timeout-nya.
+    Dipakai pipeline streaming yang memuat chunk satu per satu ke setiap sink.
+    """
+    return _run_sink(sink, payload, time.monotonic() + sink.timeout)
+
+
+def merge_results(results: List[SinkResult]) -> SinkResult:
+    """
+    Menggabungkan hasil beberapa penulisan ke sink yang sama (misal per chunk pada mode streaming):
+    berhasil jika semuanya berhasil; baris, latensi, dan percobaan dijumlahkan; ukuran dan error dari hasil terakhir.
+    """
+    last = results[-1]
+    return SinkResult(
+        name=last.name,
+        success=all(result.success for result in results),
+        rows=sum(result.rows for result in results),
+        bytes_written=last.bytes_written,
+        latency=sum(result.latency for result in results),
+        attempts=sum(result.attempts for result in results),
+        error=last.error,
+    )
+
+
+def print_results(results: List[SinkResult]):
+    """Mencatat ringkasan hasil pemuatan per sink sebagai tabel di log."""
+    lines = [f"{'sink':<10}{'status':<8}{'baris':>9}{'byte':>12}{'detik':>9}{'coba':>6}  keterangan"]
+    for result in results:
+        status = "OK" if result.success else "GAGAL"
+        size = f"{result.bytes_written:,}" if result.bytes_written is not None else "-"
+        lines.append(
+            f"{result.name:<10}{status:<8}{result.rows:>9}{size:>12}{result.latency:>9.2f}"
+            f"{result.attempts:>6}  {result.error or ''}"
+        )
+    logger.info("Hasil pemuatan:\n%s", "\n".join(lines))
+
+
+def exit_code(results: List[SinkResult], policy: str = None) -> int:
+    """
+    Menentukan exit code run berdasarkan kebijakan kegagalan (default config.LOAD_FAILURE_POLICY):
+    "any" gagal jika ada sink yang gagal, "all" gagal hanya jika semua sink gagal, "never" selalu sukses.
+    """
+    policy = policy or config.LOAD_FAILURE_POLICY
+    failures = [result for result in results if not result.success]
+    if policy == "never" or not failures:
+        return 0
+    if policy == "all":
+        return 1 if len(failures) == len(results) else 0
+    return 1
@@ -0,0 +1,249 @@
+import abc
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import utils.config as config
+import utils.metrics as metrics
+
+logger = logging.getLogger(__name__)
+
+# Mata uang harga di sumber data; kursnya selalu 1.0 sehingga tidak perlu ada di provider
+SOURCE_CURRENCY = "USD"
+# Kolom tabel kurs berversi waktu: mulai berlaku, kode mata uang, dan nilai 1 USD dalam mata uang itu
+RATE_COLUMNS = ("effective_at", "currency", "rate")
+
+# Cache tabel kurs dalam proses: kunci sumber kurs -> (waktu kedaluwarsa, tabel kurs lebar)
+_cache: Dict[tuple, Tuple[float, pd.DataFrame]] = {}
+_lock = threading.Lock()
+
+
+class RateProvider(abc.ABC):
+    """
+    Sumber kurs USD ke mata uang lain. Subclass wajib mengimplementasikan load(), yang mengembalikan
+    tabel kurs berversi waktu dengan kolom RATE_COLUMNS; `cache_key` membedakan sumber satu dengan
+    lainnya di cache proses.
+    """
+    name = "base"
+
+    @property
+    def cache_key(self) -> tuple:
+        return (self.name,)
+
+    @abc.abstractmethod
+    def load(self) -> pd.DataFrame:
+        """Membaca seluruh tabel kurs dari sumbernya."""
+
+
+class StaticRateProvider(RateProvider):
+    """Kurs tetap dari config: EXCHANGE_RATE_USD_TO_IDR ditambah EXCHANGE_RATES_STATIC, berlaku untuk semua waktu."""
+    name = "static"
+
+    @property
+    def cache_key(self) -> tuple:
+        return (self.name, config.EXCHANGE_RATE_USD_TO_IDR, config.EXCHANGE_RATES_STATIC)
+
+    def load(self) -> pd.DataFrame:
+        rates = {"IDR": config.EXCHANGE_RATE_USD_TO_IDR}
+        for item in config.EXCHANGE_RATES_STATIC.split(","):
+            currency, _, value = item.partition("=")
+            if currency.strip() and value.strip():
+                rates[currency.strip().upper()] = float(value)
+        return pd.DataFrame({
+            "effective_at": pd.Timestamp.min,
+            "currency": list(rates),
+            "rate": list(rates.values()),
+        })
+
+
+class FileRateProvider(RateProvider):
+    """Tabel kurs dari file CSV (default EXCHANGE_RATE_FILE) dengan kolom effective_at, currency, rate."""
+    name = "file"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.EXCHANGE_RATE_FILE
+
+    @property
+    def cache_key(self) -> tuple:
+        return (self.name, os.path.abspath(self.path))
+
+    def load(self) -> pd.DataFrame:
+        return pd.read_csv(self.path, usecols=list(RATE_COLUMNS))
+
+
+class SqliteRateProvider(RateProvider):
+    """
+    Tabel kurs di SQLite (default EXCHANGE_RATE_DB_PATH), tabel `exchange_rates`.
+    store() dipakai untuk menambahkan atau memperbarui kurs, misal dari job terpisah yang mengambil kurs harian.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.EXCHANGE_RATE_DB_PATH
+
+    @property
+    def cache_key(self) -> tuple:
+        return (self.name, os.path.abspath(self.path))
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS exchange_rates (
+                effective_at TEXT NOT NULL,
+                currency TEXT NOT NULL,
+                rate REAL NOT NULL,
+                PRIMARY KEY (currency, effective_at)
+            )
+            """
+        )
+        return conn
+
+    def load(self) -> pd.DataFrame:
+        conn = self._connect()
+        try:
+            return pd.read_sql_query("SELECT effective_at, currency, rate FROM exchange_rates", conn)
+        finally:
+            conn.close()
+
+    def store(self, rates: pd.DataFrame):
+        """Menyimpan kurs (kolom RATE_COLUMNS); kurs dengan mata uang dan waktu berlaku yang sama ditimpa."""
+        records = [
+            (pd.Timestamp(effective_at).isoformat(), str(currency).upper(), float(rate))
+            for effective_at, currency, rate in rates[list(RATE_COLUMNS)].itertuples(index=False)
+        ]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO exchange_rates VALUES (?, ?, ?)", records)
+        finally:
+            conn.close()
+
+
+PROVIDERS = {
+    "static": StaticRateProvider,
+    "file": FileRateProvider,
+    "sqlite": SqliteRateProvider,
+}
+
+
+def get_provider(name: Optional[str] = None) -> RateProvider:
+    """Membuat provider kurs sesuai nama (default config.EXCHANGE_RATE_PROVIDER)."""
+    name = name or config.EXCHANGE_RATE_PROVIDER
+    if name not in PROVIDERS:
+        raise ValueError(f"Provider kurs tidak dikenal: {name}")
+    return PROVIDERS[name]()
+
+
+def _wide_table(rates: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mengubah tabel kurs panjang menjadi tabel lebar: satu baris per waktu berlaku (terurut),
+    satu kolom per mata uang. Nilai diisi maju sehingga setiap baris memuat kurs terakhir yang berlaku.
+    """
+    rates = rates.assign(
+        effective_at=pd.to_datetime(rates["effective_at"]).astype("datetime64[ns]"),
+        currency=rates["currency"].str.upper(),
+    )
+    wide = rates.pivot_table(index="effective_at", columns="currency", values="rate", aggfunc="last")
+    return wide.sort_index().ffill()
+
+
+def rate_table(provider: Optional[RateProvider] = None) -> pd.DataFrame:
+    """
+    Tabel kurs lebar dari provider (default sesuai config), disimpan di cache proses
+    selama EXCHANGE_RATE_CACHE_TTL detik agar sumber kurs tidak dibaca ulang di setiap run atau batch.
+    """
+    provider = provider or get_provider()
+    key = provider.cache_key
+    now = time.monotonic()
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] > now:
+            metrics.inc("exchange_rate_cache_hits")
+            return cached[1]
+
+    metrics.inc("exchange_rate_cache_misses")
+    table = _wide_table(provider.load())
+    logger.info("Tabel kurs dimuat dari provider %s (%s mata uang, %s versi).", provider.name, len(table.columns), len(table))
+    with _lock:
+        _cache[key] = (now + config.EXCHANGE_RATE_CACHE_TTL, table)
+    return table
+
+
+def clear_cache():
+    """Mengosongkan cache tabel kurs, misal setelah tabel kurs diperbarui."""
+    with _lock:
+        _cache.clear()
+
+
+def target_currencies() -> List[str]:
+    """Mata uang kolom price (PRICE_CURRENCY) diikuti mata uang tambahan dari EXTRA_CURRENCIES."""
+    currencies = [config.PRICE_CURRENCY] + config.EXTRA_CURRENCIES.split(",")
+    return list(dict.fromkeys(currency.strip().upper() for currency in currencies if currency.strip()))
+
+
+def price_column(currency: str) -> str:
+    """Nama kolom harga untuk suatu mata uang: 'price' untuk PRICE_CURRENCY, selain itu 'price_<kode>'."""
+    if currency.upper() == config.PRICE_CURRENCY.upper():
+        return "price"
+    return f"price_{currency.lower()}"
+
+
+def rates_as_of(timestamps: Union[pd.Series, datetime], currencies: Optional[List[str]] = None,
+                provider: Optional[RateProvider] = None) -> pd.DataFrame:
+    """
+    Kurs yang berlaku pada setiap timestamp (as-of join: versi terakhir dengan effective_at <= timestamp),
+    satu kolom per mata uang. `timestamps` berupa Series atau satu nilai waktu (hasilnya satu baris).
+    Setiap timestamp unik hanya dicari sekali, lalu hasilnya disebar ke semua baris.
+    Kurs SOURCE_CURRENCY (USD) selalu 1.0, sehingga PRICE_CURRENCY/EXTRA_CURRENCIES boleh berisi USD.
+    Melempar ValueError jika ada mata uang yang belum memiliki kurs pada timestamp tersebut.
+    """
+    currencies = currencies or target_currencies()
+    timestamps = pd.Series([timestamps]) if not isinstance(timestamps, pd.Series) else timestamps
+    looked_up = [currency for currency in currencies if currency != SOURCE_CURRENCY]
+    found = pd.DataFrame(index=timestamps.index)
+    if looked_up:
+        table = rate_table(provider)
+        missing = [currency for currency in looked_up if currency not in table.columns]
+        if missing:
+            raise ValueError(f"Kurs USD ke {', '.join(missing)} tidak tersedia di provider kurs.")
+
+        codes, uniques = pd.factorize(pd.to_datetime(timestamps).astype("datetime64[ns]"), sort=True)
+        unique_rates = pd.merge_asof(
+            pd.DataFrame({"timestamp": uniques}),
+            table[looked_up].rename_axis("timestamp").reset_index(),
+            on="timestamp",
+            direction="backward",
+        )
+        unavailable = unique_rates[looked_up].isna().any(axis=1)
+        if unavailable.any():
+            first = unique_rates.loc[unavailable, "timestamp"].iloc[0]
+            raise ValueError(f"Kurs belum tersedia untuk timestamp {first}.")
+        found = pd.DataFrame(unique_rates[looked_up].to_numpy()[codes], columns=looked_up, index=timestamps.index)
+    if SOURCE_CURRENCY in currencies:
+        found[SOURCE_CURRENCY] = 1.0
+    return found[currencies]
+
+
+def convert_prices(price_usd, timestamps: Union[pd.Series, datetime],
+                   currencies: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Mengonversi harga USD ke semua mata uang target dalam satu lintasan.
+    Mengembalikan DataFrame dengan kolom 'price' (PRICE_CURRENCY) dan 'price_<kode>' untuk mata uang tambahan.
+    Jika `timestamps` berupa satu nilai waktu, satu kurs dipakai untuk semua harga.
+    Index Series `price_usd` dipertahankan pada hasil.
+    """
+    currencies = currencies or target_currencies()
+    index = price_usd.index if isinstance(price_usd, pd.Series) else None
+    rates = rates_as_of(timestamps, currencies).to_numpy(dtype="float64")
+    converted = np.asarray(price_usd, dtype="float64")[:, np.newaxis] * rates
+    return pd.DataFrame(converted, columns=[price_column(currency) for currency in currencies], index=index)
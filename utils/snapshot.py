@@ -0,0 +1,234 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Iterator, List, NamedTuple, Optional, Sequence
+
+import utils.config as config
+from utils.fields import RAW_FIELDS, SOURCE_PAGE_FIELD
+
+logger = logging.getLogger(__name__)
+
+# pyarrow baru diimpor saat snapshot benar-benar ditulis atau dibaca, sehingga modul yang hanya
+# membutuhkan open_snapshot_store (misal extract) tidak membayar waktu impornya di setiap run.
+
+def raw_schema():
+    """Skema snapshot: kolom data mentah ditambah nomor halaman asal setiap produk."""
+    import pyarrow as pa
+    return pa.schema([(field, pa.string()) for field in RAW_FIELDS] + [(SOURCE_PAGE_FIELD, pa.int32())])
+
+
+class SnapshotRun(NamedTuple):
+    """Satu entri indeks snapshot: satu run ekstraksi."""
+    run_id: str
+    path: str
+    base_url: str
+    # "writing" selama run berjalan, "complete" jika semua halaman selesai, "partial" jika run terhenti
+    status: str
+    rows: int
+    batches: int
+    created_at: float
+    finished_at: Optional[float]
+
+
+class RawSnapshotWriter:
+    """
+    Penulis snapshot data mentah satu run dalam format Arrow IPC stream terkompresi.
+    Produk ditampung per kolom dan ditulis sebagai satu record batch setiap RAW_SNAPSHOT_BATCH_ROWS baris,
+    sehingga file hanya bertambah di akhir dan batch yang sudah ditulis tetap terbaca walau run terhenti.
+    """
+
+    def __init__(self, store: "RawSnapshotStore", run_id: str, path: str, batch_rows: Optional[int] = None):
+        self.store = store
+        self.run_id = run_id
+        self.path = path
+        self.batch_rows = batch_rows or config.RAW_SNAPSHOT_BATCH_ROWS
+        import pyarrow as pa
+        self.rows = 0
+        self.batches = 0
+        self._schema = raw_schema()
+        self._columns = {name: [] for name in self._schema.names}
+        options = pa.ipc.IpcWriteOptions(compression=config.RAW_SNAPSHOT_COMPRESSION or None)
+        self._sink = pa.OSFile(path, "wb")
+        self._writer = pa.ipc.new_stream(self._sink, self._schema, options=options)
+        self._closed = False
+
+    def write(self, products: List[dict], page: Optional[int] = None):
+        """Menambahkan produk mentah dari satu halaman; batch ditulis ke disk begitu penuh."""
+        for product in products:
+            for field in RAW_FIELDS:
+                self._columns[field].append(product.get(field))
+            self._columns[SOURCE_PAGE_FIELD].append(page)
+        if len(self._columns[SOURCE_PAGE_FIELD]) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        """Menulis produk yang masih ditampung sebagai satu record batch."""
+        import pyarrow as pa
+        pending = len(self._columns[SOURCE_PAGE_FIELD])
+        if not pending:
+            return
+        self._writer.write_batch(pa.RecordBatch.from_pydict(self._columns, schema=self._schema))
+        self._sink.flush()
+        self._columns = {name: [] for name in self._schema.names}
+        self.rows += pending
+        self.batches += 1
+        self.store._update_run(self.run_id, rows=self.rows, batches=self.batches)
+
+    def close(self, complete: bool = True):
+        """Menutup file snapshot dan mencatat statusnya di indeks ("complete" atau "partial")."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.flush()
+        finally:
+            self._writer.close()
+            self._sink.close()
+            status = "complete" if complete else "partial"
+            self.store._update_run(self.run_id, status=status, finished_at=time.time())
+            logger.info("Snapshot data mentah %s disimpan (%s, %s baris): %s", self.run_id, status, self.rows, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
+        return False
+
+
+class RawSnapshotStore:
+    """
+    Penyimpanan snapshot data mentah per run di RAW_SNAPSHOT_DIR.
+    Setiap run ditulis ke file `<run_id>.arrow`, dan indeks run (status, jumlah baris, waktu)
+    disimpan di `index.sqlite` sehingga run lama bisa dicari dan ditransformasi ulang tanpa scraping.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or config.RAW_SNAPSHOT_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                base_url TEXT,
+                status TEXT NOT NULL,
+                rows INTEGER NOT NULL DEFAULT 0,
+                batches INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                finished_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def new_run_id() -> str:
+        """ID run yang terurut menurut waktu, misal '20240101T100000-1a2b3c'."""
+        return f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+    def open_writer(self, run_id: Optional[str] = None) -> RawSnapshotWriter:
+        """Mendaftarkan run baru di indeks dan mengembalikan penulis snapshot-nya."""
+        run_id = run_id or self.new_run_id()
+        path = os.path.join(self.directory, f"{run_id}.arrow")
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, path, base_url, status, created_at) VALUES (?, ?, ?, 'writing', ?)",
+                (run_id, os.path.basename(path), config.BASE_URL, time.time()),
+            )
+            self._conn.commit()
+        return RawSnapshotWriter(self, run_id, path)
+
+    def _update_run(self, run_id: str, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE runs SET {assignments} WHERE run_id = ?", (*fields.values(), run_id))
+            self._conn.commit()
+
+    def runs(self) -> List[SnapshotRun]:
+        """Semua run di indeks, dari yang terbaru."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, path, base_url, status, rows, batches, created_at, finished_at "
+                "FROM runs ORDER BY created_at DESC, run_id DESC"
+            ).fetchall()
+        return [SnapshotRun(run_id, os.path.join(self.directory, path), *rest) for run_id, path, *rest in rows]
+
+    def resolve(self, run_id: Optional[str] = None) -> SnapshotRun:
+        """
+        Mencari run di indeks. Tanpa `run_id` (atau "latest"), yang dipakai run lengkap terbaru.
+        Melempar ValueError jika run tidak ditemukan.
+        """
+        for run in self.runs():
+            if run_id in (None, "latest"):
+                if run.status == "complete":
+                    return run
+            elif run.run_id == run_id:
+                return run
+        raise ValueError(f"Snapshot data mentah tidak ditemukan: {run_id or 'latest'}")
+
+    def iter_batches(self, run_id: Optional[str] = None, batch_rows: Optional[int] = None,
+                     columns: Sequence[str] = RAW_FIELDS) -> Iterator[List[dict]]:
+        """
+        Membaca snapshot run `run_id` lewat memory-map dan menghasilkan (yield) daftar produk mentah
+        per batch (paling banyak `batch_rows` baris), dengan kolom `columns`.
+        Run yang terhenti di tengah penulisan dibaca sampai batch utuh terakhir.
+        """
+        import pyarrow as pa
+        run = self.resolve(run_id)
+        batch_rows = batch_rows or config.RAW_SNAPSHOT_BATCH_ROWS
+        with pa.memory_map(run.path) as source:
+            reader = pa.ipc.open_stream(source)
+            while True:
+                try:
+                    batch = reader.read_next_batch()
+                except StopIteration:
+                    break
+                except pa.ArrowInvalid as e:
+                    logger.warning("Snapshot %s terpotong, pembacaan berhenti di batch utuh terakhir: %s", run.run_id, e)
+                    break
+                batch = batch.select(list(columns))
+                for offset in range(0, batch.num_rows, batch_rows):
+                    yield batch.slice(offset, batch_rows).to_pylist()
+
+    def read_table(self, run_id: Optional[str] = None) -> "pyarrow.Table":
+        """Membaca seluruh snapshot run `run_id` sebagai satu tabel Arrow (termasuk kolom source_page)."""
+        import pyarrow as pa
+        run = self.resolve(run_id)
+        with pa.memory_map(run.path) as source:
+            return pa.ipc.open_stream(source).read_all()
+
+    def prune(self, keep: Optional[int] = None) -> List[str]:
+        """
+        Menghapus snapshot selain `keep` run terbaru (default RAW_SNAPSHOT_KEEP_RUNS; 0 berarti simpan semua).
+        Mengembalikan run_id yang dihapus.
+        """
+        keep = config.RAW_SNAPSHOT_KEEP_RUNS if keep is None else keep
+        if keep <= 0:
+            return []
+        removed = [run for run in self.runs() if run.status != "writing"][keep:]
+        for run in removed:
+            if os.path.exists(run.path):
+                os.remove(run.path)
+            with self._lock:
+                self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run.run_id,))
+                self._conn.commit()
+        if removed:
+            logger.info("%s snapshot data mentah lama dihapus.", len(removed))
+        return [run.run_id for run in removed]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_snapshot_store(directory: Optional[str] = None) -> RawSnapshotStore:
+    """Membuka penyimpanan snapshot data mentah di `directory` (default config.RAW_SNAPSHOT_DIR)."""
+    return RawSnapshotStore(directory)
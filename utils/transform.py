@@ -1,36 +1,78 @@
+import logging
 import pandas as pd
 from datetime import datetime
 import utils.config as config
+import utils.metrics as metrics
+import utils.rates as rates
+import utils.validate as validate
+from utils.fields import SOURCE_PAGE_FIELD
 import re
+from itertools import chain
+import numpy as np
+from typing import Callable, Iterable, Iterator, Optional
 
-def transform_and_clean_data(raw_data: list) -> pd.DataFrame:
+logger = logging.getLogger(__name__)
+
+# Pola data tidak valid yang dibuang pada tahap transformasi
+INVALID_PATTERNS = {
+    "title": ["Unknown Product"],
+    "price": ["Price Unavailable"],
+    "rating": ["Invalid Rating / 5", "Not Rated"]
+}
+
+# Regex dikompilasi sekali dan dipakai oleh jalur transformasi cepat
+_PRICE_CLEAN_RE = re.compile(r'[$,]')
+_RATING_RE = re.compile(r'(\d+\.?\d*)')
+_COLORS_RE = re.compile(r'(\d+)')
+
+def _quarantine_drops(raw_data: list, positions, rules, timestamp):
+    """
+    Mengirim baris mentah yang dibuang transformasi ke karantina validasi (hanya jika VALIDATION_ENABLED),
+    dengan nama aturan penyebabnya sebagai failed_rules dan source_page dari data mentah.
+    """
+    if not config.VALIDATION_ENABLED or len(positions) == 0:
+        return
+    dropped = pd.DataFrame([raw_data[position] for position in positions])
+    validate.quarantine_dropped_rows(dropped.assign(timestamp=timestamp, **{validate.FAILED_RULES_COLUMN: rules}))
+
+def transform_and_clean_data(raw_data: list, run_timestamp: Optional[datetime] = None) -> pd.DataFrame:
     """
     Membersihkan, mentransformasi, dan memformat data produk mentah.
+    `run_timestamp` dipakai untuk kolom timestamp; jika kosong memakai waktu saat ini.
+    Harga dikonversi dari USD dengan kurs yang berlaku pada timestamp run (utils.rates);
+    mata uang tambahan (EXTRA_CURRENCIES) menjadi kolom price_<kode> setelah timestamp.
+    Jika data mentah membawa nomor halaman asal (source_page), kolom itu disertakan di akhir
+    tanpa ikut dibersihkan atau dipakai untuk deduplikasi.
+    Jika VALIDATION_ENABLED, baris yang dibuang karena pola tidak valid atau nilai kosong setelah konversi
+    ditulis ke karantina validasi beserta aturan dan halaman asalnya (duplikat tidak dikarantina).
     Mengembalikan DataFrame Pandas yang sudah bersih.
     """
     if not raw_data:
-        print("Tidak ada data mentah untuk diproses.")
+        logger.warning("Tidak ada data mentah untuk diproses.")
         return pd.DataFrame()
 
-    print("Memulai proses transformasi data...")
+    logger.info("Memulai proses transformasi data...")
     # Mengubah list of dict menjadi DataFrame Pandas
     df = pd.DataFrame(raw_data)
+    source_page = df.pop(SOURCE_PAGE_FIELD) if SOURCE_PAGE_FIELD in df.columns else None
+
+    metrics.inc("transform_rows_in", len(df))
 
     # 1. Hapus data yang tidak valid atau tidak diinginkan
-    invalid_patterns = {
-        "title": ["Unknown Product"],
-        "price": ["Price Unavailable"],
-        "rating": ["Invalid Rating / 5", "Not Rated"]
-    }
-    df = df[~df['title'].isin(invalid_patterns["title"])]
-    df = df[~df['price'].isin(invalid_patterns["price"])]
-    df = df[~df['rating'].isin(invalid_patterns["rating"])]
+    invalid_patterns = INVALID_PATTERNS
+    # Indeks baris mentah yang dibuang -> aturan penyebabnya, untuk karantina
+    dropped = {}
+    for column in ('title', 'price', 'rating'):
+        rows_before = len(df)
+        invalid = df[column].isin(invalid_patterns[column])
+        dropped.update(dict.fromkeys(df.index[invalid], f"invalid_{column}"))
+        df = df[~invalid]
+        metrics.inc("transform_rows_dropped", rows_before - len(df), rule=f"invalid_{column}")
 
     # 2. Bersihkan dan konversi setiap kolom
-    # Kolom 'price': hapus '$', koma, konversi ke float, dan kalikan dengan kurs
+    # Kolom 'price': hapus '$', koma, dan konversi ke float (masih dalam USD, dikonversi setelah timestamp ada)
     df['price'] = df['price'].str.replace(r'[$,]', '', regex=True)
     df['price'] = pd.to_numeric(df['price'], errors='coerce')
-    df['price'] = df['price'] * config.EXCHANGE_RATE_USD_TO_IDR
 
     # Kolom 'rating': ekstrak angka rating menggunakan regex
     df['rating'] = df['rating'].str.extract(r'(\d+\.?\d*)').astype(float)
@@ -43,7 +85,10 @@ def transform_and_clean_data(raw_data: list) -> pd.DataFrame:
     df['gender'] = df['gender'].str.replace('Gender: ', '', regex=False).str.strip()
 
     # 3. Hapus baris dengan nilai null setelah konversi
+    rows_before = len(df)
+    dropped.update(dict.fromkeys(df.index[df.isna().any(axis=1)], "null_after_conversion"))
     df.dropna(inplace=True)
+    metrics.inc("transform_rows_dropped", rows_before - len(df), rule="null_after_conversion")
 
     # 4. Konversi tipe data untuk memastikan konsistensi
     df = df.astype({
@@ -55,14 +100,196 @@ def transform_and_clean_data(raw_data: list) -> pd.DataFrame:
         'gender': 'object'
     })
 
-    # 5. Tambahkan kolom timestamp
-    df['timestamp'] = datetime.now()
+    # 5. Tambahkan kolom timestamp, lalu konversi harga dengan kurs yang berlaku pada timestamp tersebut
+    timestamp = run_timestamp or datetime.now()
+    df['timestamp'] = timestamp
+    prices = rates.convert_prices(df['price'], df['timestamp'])
+    df[prices.columns] = prices
+    _quarantine_drops(raw_data, list(dropped), list(dropped.values()), timestamp)
 
     # 6. Hapus data duplikat
+    rows_before = len(df)
     df.drop_duplicates(inplace=True)
+    metrics.inc("transform_rows_dropped", rows_before - len(df), rule="duplicate")
+
+    if source_page is not None:
+        df[SOURCE_PAGE_FIELD] = source_page.loc[df.index].astype('Int32')
     
     # 7. Reset index DataFrame
     df.reset_index(drop=True, inplace=True)
     
-    print(f"Transformasi selesai. Jumlah data bersih: {len(df)}")
-    return df
\ No newline at end of file
+    logger.info("Transformasi selesai. Jumlah data bersih: %s", len(df))
+    return df
+
+def _first_number(pattern: re.Pattern) -> Callable[[str], float]:
+    """Membuat fungsi parser yang mengambil angka pertama yang cocok dengan pola, atau NaN."""
+    def parse(value) -> float:
+        match = pattern.search(value) if isinstance(value, str) else None
+        return float(match.group(1)) if match else np.nan
+    return parse
+
+def _parse_price(value) -> float:
+    """Menghapus '$' dan koma lalu mengubah harga menjadi float (NaN jika tidak valid)."""
+    if not isinstance(value, str):
+        return np.nan
+    cleaned = _PRICE_CLEAN_RE.sub('', value)
+    # float() menerima '1_000', sedangkan pd.to_numeric pada jalur standar tidak
+    if '_' in cleaned:
+        return np.nan
+    try:
+        return float(cleaned)
+    except ValueError:
+        return np.nan
+
+def _strip_prefix(prefix: str) -> Callable[[str], object]:
+    """Membuat fungsi yang menghapus prefiks teks seperti 'Size: ' lalu melakukan strip."""
+    def parse(value):
+        return value.replace(prefix, '').strip() if isinstance(value, str) else None
+    return parse
+
+# Parser per nilai unik dan tipe data ringkas hasilnya untuk jalur transformasi cepat
+_FAST_PARSERS = {
+    'price': (_parse_price, 'float64'),
+    'rating': (_first_number(_RATING_RE), 'float64'),
+    'colors': (_first_number(_COLORS_RE), 'float32'),
+    'size': (_strip_prefix('Size: '), 'object'),
+    'gender': (_strip_prefix('Gender: '), 'object'),
+}
+
+def _with_missing_slot(values: np.ndarray) -> np.ndarray:
+    """Menambahkan slot kosong di akhir array agar kode faktor -1 (nilai NaN) bisa dipetakan lewat indexing."""
+    missing = np.nan if np.issubdtype(values.dtype, np.floating) else None
+    return np.append(values, np.array([missing], dtype=values.dtype))
+
+def transform_and_clean_data_fast(raw_data: list, run_timestamp: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Versi cepat dan hemat memori dari transform_and_clean_data dengan aturan pembersihan yang sama.
+    - Setiap kolom di-faktorisasi (hash) sekali; duplikat mentah dibuang lewat kode faktor sebelum konversi.
+    - Semua pola tidak valid digabung menjadi satu mask filter.
+    - Setiap nilai unik di-parsing sekali dengan regex yang sudah dikompilasi.
+    - Tipe data ringkas: size/gender 'category', colors 'int16'. Rating tetap 'float64' agar nilainya
+      sama persis dengan jalur standar (float32 mengubah 3.9 menjadi 3.9000000953674316).
+    - Timestamp run dihitung sekali dan dipakai untuk semua baris; kurs dicari sekali untuk timestamp itu
+      dan dikalikan pada harga unik saja.
+    Nomor halaman asal (source_page) dan karantina baris yang dibuang diperlakukan sama seperti pada
+    transform_and_clean_data.
+    Mengembalikan DataFrame Pandas yang sudah bersih.
+    """
+    if not raw_data:
+        logger.warning("Tidak ada data mentah untuk diproses.")
+        return pd.DataFrame()
+
+    logger.info("Memulai proses transformasi data (jalur cepat)...")
+    # Urutan kolom mengikuti kemunculan kunci pertama kali, sama seperti pd.DataFrame(raw_data)
+    columns = list(dict.fromkeys(chain.from_iterable(raw_data)))
+    source_page = None
+    if SOURCE_PAGE_FIELD in columns:
+        columns.remove(SOURCE_PAGE_FIELD)
+        source_page = np.array([row.get(SOURCE_PAGE_FIELD) for row in raw_data], dtype=object)
+    factorized = {}
+    for column in columns:
+        # NaN/None mendapat kode -1
+        codes, uniques = pd.factorize(np.array([row.get(column) for row in raw_data], dtype=object))
+        factorized[column] = (codes, np.asarray(uniques, dtype=object))
+
+    metrics.inc("transform_rows_in", len(raw_data))
+    timestamp = pd.Timestamp(run_timestamp or datetime.now())
+
+    # 1. Buang duplikat mentah dan data tidak valid dengan satu mask gabungan
+    keep = ~pd.DataFrame({column: codes for column, (codes, _) in factorized.items()}).duplicated().to_numpy()
+    raw_duplicates = len(raw_data) - int(keep.sum())
+    # Posisi baris mentah yang dibuang dan aturan penyebabnya, untuk karantina
+    dropped_positions, dropped_rules = [], []
+    for column, patterns in INVALID_PATTERNS.items():
+        codes, uniques = factorized[column]
+        is_invalid = np.append(pd.Index(uniques).isin(patterns), False)
+        invalid_rows = np.flatnonzero(keep & is_invalid[codes])
+        keep[invalid_rows] = False
+        dropped_positions.append(invalid_rows)
+        dropped_rules.append(np.full(len(invalid_rows), f"invalid_{column}", dtype=object))
+        metrics.inc("transform_rows_dropped", len(invalid_rows), rule=f"invalid_{column}")
+    rows = np.flatnonzero(keep)
+
+    # 2. Parsing setiap nilai unik sekali, lalu sebarkan ke baris lewat kode faktor.
+    #    Kode nilai hasil konversi dipakai untuk dropna dan deduplikasi tanpa membandingkan string.
+    values, converted_codes, extra_prices = {}, {}, {}
+    for column in columns:
+        codes, uniques = factorized[column]
+        if column in _FAST_PARSERS:
+            parse, dtype = _FAST_PARSERS[column]
+            parsed = np.array([parse(value) for value in uniques], dtype=dtype)
+        else:
+            parsed = uniques
+        if column == 'price':
+            # Kolom 'price' ikut deduplikasi; kolom mata uang tambahan hanya turunan darinya
+            prices = rates.convert_prices(parsed, timestamp)
+            parsed = prices.pop('price').to_numpy()
+            for name, price_values in prices.items():
+                extra_prices[name] = _with_missing_slot(price_values.to_numpy())[codes[rows]]
+        parsed_codes, _ = pd.factorize(parsed)
+        values[column] = _with_missing_slot(parsed)[codes[rows]]
+        converted_codes[column] = np.append(parsed_codes, -1)[codes[rows]]
+
+    # 3. Hapus baris dengan nilai null setelah konversi, lalu duplikat yang baru muncul setelah konversi
+    converted = pd.DataFrame(converted_codes)
+    not_null = (converted.to_numpy() >= 0).all(axis=1)
+    valid = not_null & ~converted.duplicated().to_numpy()
+    metrics.inc("transform_rows_dropped", len(not_null) - int(not_null.sum()), rule="null_after_conversion")
+    metrics.inc("transform_rows_dropped", raw_duplicates + int(not_null.sum() - valid.sum()), rule="duplicate")
+    null_rows = rows[~not_null]
+    dropped_positions.append(null_rows)
+    dropped_rules.append(np.full(len(null_rows), "null_after_conversion", dtype=object))
+    _quarantine_drops(raw_data, np.concatenate(dropped_positions), np.concatenate(dropped_rules), timestamp)
+
+    # 4. Susun DataFrame dengan tipe data ringkas
+    cleaned = pd.DataFrame({column: column_values[valid] for column, column_values in values.items()})
+    cleaned = cleaned.astype({'colors': 'int16', 'size': 'category', 'gender': 'category'})
+
+    # 5. Tambahkan kolom timestamp (satu nilai untuk seluruh run) dan harga dalam mata uang tambahan
+    cleaned['timestamp'] = timestamp
+    for name, price_values in extra_prices.items():
+        cleaned[name] = price_values[valid]
+    if source_page is not None:
+        cleaned[SOURCE_PAGE_FIELD] = pd.array(source_page[rows][valid], dtype='Int32')
+
+    logger.info("Transformasi selesai. Jumlah data bersih: %s", len(cleaned))
+    return cleaned
+
+def run_transform(raw_data: list, run_timestamp: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Menjalankan transformasi sesuai config.TRANSFORM_MODE:
+    "fast" memakai transform_and_clean_data_fast, selain itu transform_and_clean_data.
+    """
+    if config.TRANSFORM_MODE == "fast":
+        return transform_and_clean_data_fast(raw_data, run_timestamp=run_timestamp)
+    return transform_and_clean_data(raw_data, run_timestamp=run_timestamp)
+
+def transform_batches(raw_batches: Iterable[list], run_timestamp: Optional[datetime] = None) -> Iterator[pd.DataFrame]:
+    """
+    Mentransformasi batch data mentah satu per satu untuk pipeline streaming.
+    Semua batch memakai timestamp yang sama (`run_timestamp`, default waktu saat ini), dan baris yang sudah muncul
+    di batch sebelumnya dibuang agar hasil akhirnya sama dengan mode batch.
+    Memori DataFrame sebesar satu batch, tetapi deduplikasi antar batch harus mengingat setiap baris yang sudah
+    dihasilkan (duplikat bisa muncul di halaman mana pun), sehingga himpunan hash tumbuh O(jumlah baris) per run:
+    disimpan sebagai array uint64 terurut, 8 byte per baris (sekitar 8 MB untuk satu juta baris).
+    """
+    run_timestamp = run_timestamp or datetime.now()
+    # Hash baris yang sudah dihasilkan, terurut agar bisa dicari dengan searchsorted
+    seen_hashes = np.empty(0, dtype=np.uint64)
+    for raw_batch in raw_batches:
+        df = run_transform(raw_batch, run_timestamp=run_timestamp)
+        if df.empty:
+            continue
+
+        # Halaman asal tidak ikut di-hash agar produk yang sama di halaman berbeda tetap dianggap duplikat
+        row_hashes = pd.util.hash_pandas_object(df.drop(columns=SOURCE_PAGE_FIELD, errors='ignore'), index=False).to_numpy()
+        positions = np.minimum(np.searchsorted(seen_hashes, row_hashes), max(len(seen_hashes) - 1, 0))
+        is_duplicate = seen_hashes[positions] == row_hashes if len(seen_hashes) else np.zeros(len(row_hashes), dtype=bool)
+        rows_before = len(df)
+        df = df[~is_duplicate]
+        metrics.inc("transform_rows_dropped", rows_before - len(df), rule="duplicate")
+        seen_hashes = np.union1d(seen_hashes, row_hashes)
+        if df.empty:
+            continue
+
+        yield df.reset_index(drop=True)
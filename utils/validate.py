@@ -0,0 +1,179 @@
+import csv
+import logging
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import utils.config as config
+import utils.metrics as metrics
+from utils.fields import SOURCE_PAGE_FIELD
+
+logger = logging.getLogger(__name__)
+
+# Kolom tambahan di output karantina
+FAILED_RULES_COLUMN = "failed_rules"
+# Kolom file karantina. Skemanya tetap (kolom lain seperti price_<kode> tidak ikut) agar baris dari run dengan
+# config berbeda, maupun baris mentah yang dibuang transformasi, selalu sejajar dengan header file.
+QUARANTINE_COLUMNS = (
+    "title", "price", "rating", "colors", "size", "gender", "timestamp", SOURCE_PAGE_FIELD, FAILED_RULES_COLUMN,
+)
+
+
+class Rule(NamedTuple):
+    """
+    Satu aturan kualitas data secara deklaratif.
+    kind="range": nilai numerik `column` harus di antara `min` dan `max` (inklusif; None berarti tanpa batas).
+    kind="allowed": nilai `column` harus salah satu dari `allowed`.
+    Nilai kosong (NaN/None) selalu dianggap melanggar aturan.
+    """
+    name: str
+    column: str
+    kind: str
+    min: Optional[float] = None
+    max: Optional[float] = None
+    allowed: Tuple[str, ...] = ()
+
+
+class ValidationResult(NamedTuple):
+    """Hasil validasi: baris yang lolos, baris yang dikarantina, dan jumlah pelanggaran per aturan."""
+    valid: pd.DataFrame
+    quarantine: pd.DataFrame
+    counts: Dict[str, int]
+
+
+def _csv_setting(value: str) -> Tuple[str, ...]:
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def default_rules() -> List[Rule]:
+    """Aturan bawaan dari config: rentang harga (Rupiah), rating 0-5, ukuran dan gender yang diizinkan, warna > 0."""
+    return [
+        Rule("price_range", "price", "range", min=config.VALIDATION_PRICE_MIN, max=config.VALIDATION_PRICE_MAX),
+        Rule("rating_range", "rating", "range", min=0, max=5),
+        # Jumlah warna berupa bilangan bulat, sehingga > 0 sama dengan >= 1
+        Rule("colors_positive", "colors", "range", min=1),
+        Rule("allowed_size", "size", "allowed", allowed=_csv_setting(config.VALIDATION_ALLOWED_SIZES)),
+        Rule("allowed_gender", "gender", "allowed", allowed=_csv_setting(config.VALIDATION_ALLOWED_GENDERS)),
+    ]
+
+
+def _failure_mask(rule: Rule, series: pd.Series) -> np.ndarray:
+    """Mask boolean baris yang melanggar satu aturan, dihitung tervektorisasi untuk seluruh kolom."""
+    if rule.kind == "range":
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        failed = np.isnan(values)
+        if rule.min is not None:
+            failed |= values < rule.min
+        if rule.max is not None:
+            failed |= values > rule.max
+        return failed
+    if rule.kind == "allowed":
+        # Pada kolom kategori, isin hanya membandingkan kategori unik lalu memetakan lewat kode
+        return ~series.isin(rule.allowed).to_numpy(dtype=bool)
+    raise ValueError(f"Jenis aturan tidak dikenal: {rule.kind}")
+
+
+def validate(df: pd.DataFrame, rules: Optional[Sequence[Rule]] = None) -> ValidationResult:
+    """
+    Mengevaluasi semua aturan sebagai mask tervektorisasi dalam satu lintasan dan memisahkan baris yang lolos
+    dari baris yang melanggar. Baris karantina membawa kolom `failed_rules` (nama aturan yang dilanggar,
+    dipisah koma) dan source_page jika tersedia. Tidak menulis apa pun ke disk.
+    """
+    rules = default_rules() if rules is None else list(rules)
+    rules = [rule for rule in rules if rule.column in df.columns]
+    if df.empty or not rules:
+        empty = df.iloc[0:0].assign(**{FAILED_RULES_COLUMN: pd.Series(dtype=object)})
+        return ValidationResult(df, empty, {rule.name: 0 for rule in rules})
+
+    # Matriks pelanggaran: satu baris per data, satu kolom per aturan
+    failures = np.column_stack([_failure_mask(rule, df[rule.column]) for rule in rules])
+    rejected = failures.any(axis=1)
+    counts = dict(zip((rule.name for rule in rules), failures.sum(axis=0).tolist()))
+
+    # Kombinasi aturan yang dilanggar dikodekan sebagai bit, sehingga label teks cukup dibuat sekali per kombinasi
+    combination = failures[rejected] @ (1 << np.arange(len(rules)))
+    unique_combinations, inverse = np.unique(combination, return_inverse=True)
+    labels = np.array([
+        ",".join(rule.name for bit, rule in enumerate(rules) if code >> bit & 1) for code in unique_combinations
+    ], dtype=object)
+    quarantine = df[rejected].assign(**{FAILED_RULES_COLUMN: labels[inverse]})
+    return ValidationResult(df[~rejected].reset_index(drop=True), quarantine.reset_index(drop=True), counts)
+
+
+def _csv_header(path: str) -> List[str]:
+    """Baris header file CSV (kosong jika file kosong)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def write_quarantine(quarantine: pd.DataFrame, path: Optional[str] = None) -> bool:
+    """
+    Menambahkan baris karantina ke file CSV (default VALIDATION_QUARANTINE_PATH) dengan kolom QUARANTINE_COLUMNS.
+    Header hanya ditulis saat file baru dibuat, sehingga riwayat karantina antar run terkumpul di satu file.
+    File lama dengan header berbeda (misal dari versi sebelumnya) dipindahkan ke '<nama>.<waktu>.csv'
+    sebelum file baru dibuat, agar baris tidak pernah ditambahkan di bawah header yang tidak cocok.
+    Mengembalikan True jika berhasil.
+    """
+    path = path or config.VALIDATION_QUARANTINE_PATH
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path) and _csv_header(path) != list(QUARANTINE_COLUMNS):
+            root, extension = os.path.splitext(path)
+            rotated = f"{root}.{time.strftime('%Y%m%d%H%M%S')}{extension}"
+            os.replace(path, rotated)
+            logger.warning("Header file karantina %s tidak cocok; file lama dipindahkan ke %s.", path, rotated)
+        quarantine = quarantine.reindex(columns=list(QUARANTINE_COLUMNS))
+        quarantine.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+        logger.info("%s baris dikarantina ke %s", len(quarantine), path)
+        return True
+    except Exception as e:
+        logger.error("Gagal menulis data karantina: %s", e)
+        return False
+
+
+def quarantine_dropped_rows(dropped: pd.DataFrame) -> bool:
+    """
+    Mengarantina baris mentah yang dibuang tahap transformasi (produk tidak dikenal, harga/rating tidak tersedia,
+    nilai kosong setelah konversi). `dropped` berisi nilai mentah, `failed_rules` (nama aturan transformasi),
+    dan source_page jika tersedia. Hanya berjalan jika VALIDATION_ENABLED dan VALIDATION_QUARANTINE_PATH diisi.
+    Mengembalikan True jika ada baris yang ditulis.
+    """
+    if not config.VALIDATION_ENABLED or not config.VALIDATION_QUARANTINE_PATH or dropped.empty:
+        return False
+    summary = dropped[FAILED_RULES_COLUMN].value_counts()
+    logger.warning("Transformasi: %s baris mentah dibuang dan dikarantina (%s).", len(dropped),
+                   ", ".join(f"{rule}={count}" for rule, count in summary.items()))
+    return write_quarantine(dropped)
+
+
+def run_validation(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tahap validasi pipeline. Jika VALIDATION_ENABLED, baris yang melanggar aturan dikeluarkan, dicatat per aturan
+    (metrik `validation_rows_rejected{rule=...}`), dan ditulis ke karantina.
+    Kolom source_page selalu dibuang dari hasil, karena hanya dipakai untuk karantina.
+    Mengembalikan DataFrame yang siap dimuat.
+    """
+    if not config.VALIDATION_ENABLED or df.empty:
+        return df.drop(columns=SOURCE_PAGE_FIELD, errors="ignore")
+
+    result = validate(df)
+    metrics.inc("validation_rows_checked", len(df))
+    for rule, count in result.counts.items():
+        metrics.inc("validation_rows_rejected", count, rule=rule)
+
+    if len(result.quarantine):
+        summary = ", ".join(f"{rule}={count}" for rule, count in result.counts.items() if count)
+        pages = ""
+        if SOURCE_PAGE_FIELD in result.quarantine.columns:
+            top_pages = result.quarantine[SOURCE_PAGE_FIELD].value_counts().head(5)
+            pages = " Halaman asal terbanyak: " + ", ".join(f"{page} ({count})" for page, count in top_pages.items())
+        logger.warning("Validasi: %s dari %s baris dikarantina (%s).%s", len(result.quarantine), len(df), summary, pages)
+        if config.VALIDATION_QUARANTINE_PATH:
+            write_quarantine(result.quarantine)
+    else:
+        logger.info("Validasi: semua %s baris lolos.", len(df))
+    return result.valid.drop(columns=SOURCE_PAGE_FIELD, errors="ignore")